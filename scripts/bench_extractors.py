@@ -0,0 +1,259 @@
+"""
+Benchmark hors-ligne des extracteurs sur le corpus scripts/fixtures/.
+
+Pour chaque source : latence de get_film_links (listing), latence par fiche
+de l'extraction (p50/p95), pages/s, pic RSS (Python + Chromium si psutil est
+installé), et vérification des résultats contre "expected" du manifest.
+Chaque benchmark tourne dans son propre processus : le pic RSS Python est
+celui de ce benchmark seul, pas le plus haut des benchmarks précédents.
+Aucun accès réseau : pages servies par un http.server local (scripts
+requests) ou par une route Playwright (scripts navigateur).
+
+Usage :
+    python bench_extractors.py                         # toutes les sources disponibles
+    python bench_extractors.py torrent9 moviebox_nuxt_http --repeat 20
+    python bench_extractors.py --json bench.json       # sauvegarde les mesures
+    python bench_extractors.py --compare bench.json    # code 1 si régression
+
+Les sources navigateur sont ignorées si Playwright/Chromium n'est pas installé.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scraping import metrics
+from scraping.fixtures import Fixture, FixtureServer, install_replay, replay_client
+
+# Nom du benchmark -> (dossier de fixture, type)
+BENCHES = {
+    "torrent9": ("torrent9", "http"),
+    "moviebox_nuxt_http": ("moviebox_nuxt", "http"),
+    "moviebox_nuxt": ("moviebox_nuxt", "browser"),
+    "moviebox_downloads": ("moviebox_downloads", "browser"),
+    "mirror66": ("mirror66", "browser"),
+}
+
+
+class PeakRss:
+    """
+    Pic RSS en Mo : processus Python (ru_maxrss, pic depuis le démarrage du
+    processus, d'où un processus par benchmark) et enfants Chromium (psutil).
+    """
+
+    def __init__(self):
+        self.browser_mb = 0.0
+        try:
+            import psutil
+            self._proc = psutil.Process()
+        except ImportError:
+            self._proc = None
+
+    def sample(self):
+        if self._proc is None:
+            return
+        total = 0
+        for child in self._proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except Exception:
+                pass
+        self.browser_mb = max(self.browser_mb, total / 1024 / 1024)
+
+    @staticmethod
+    def python_mb():
+        # ru_maxrss est en Ko sous Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _summary(name, listing_s, timings, records, expected, rss):
+    got = {(r.get("title"), r.get("video_url")) for r in records if r}
+    want = {(e["title"], e["video_url"]) for e in expected}
+    total = sum(timings)
+    return {
+        "bench": name,
+        "listing_ms": listing_s * 1000,
+        "pages": len(timings),
+        "p50_ms": metrics.percentile(timings, 50) * 1000,
+        "p95_ms": metrics.percentile(timings, 95) * 1000,
+        "mean_ms": statistics.mean(timings) * 1000 if timings else 0.0,
+        "pages_per_s": len(timings) / total if total else 0.0,
+        "python_peak_mb": rss.python_mb(),
+        "browser_peak_mb": rss.browser_mb,
+        "missing": sorted(map(list, want - got)),
+        "unexpected": sorted(map(list, got - want)),
+    }
+
+
+def bench_torrent9(fixture, repeat, rss):
+    import fetch_torrent9_titles_and_magnets as t9
+    with FixtureServer(fixture) as server:
+        client = replay_client(server)
+        start = time.perf_counter()
+        links = list(t9.get_film_links(client))
+        listing_s = time.perf_counter() - start
+        timings, records = [], []
+        for n in range(repeat):
+            for url in links:
+                start = time.perf_counter()
+                title, video_url = t9.get_title_and_magnet(client, url)
+                timings.append(time.perf_counter() - start)
+                if n == 0 and title and video_url:
+                    records.append({"title": title, "video_url": video_url})
+        client.close()
+    return listing_s, timings, records
+
+
+def bench_moviebox_nuxt_http(fixture, repeat, rss):
+    import fetch_moviebox_nuxt as nuxt
+    with FixtureServer(fixture) as server:
+        client = replay_client(server)
+        # Le listing MovieBox est rendu en JS : on prend les fiches du manifest
+        links = [url for url in fixture.pages if url != fixture.list_url]
+        timings, records = [], []
+        for n in range(repeat):
+            for url in links:
+                start = time.perf_counter()
+                record = asyncio.run(nuxt.fetch_film_http(client, url))
+                timings.append(time.perf_counter() - start)
+                if n == 0:
+                    records.append(record)
+        client.close()
+    return 0.0, timings, records
+
+
+async def _bench_browser(module, fixture, repeat, rss):
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            context = await browser.new_context()
+            await install_replay(context, fixture)
+            page = await context.new_page()
+            start = time.perf_counter()
+            from scraping.engine import iter_film_links
+            links = [film async for film in iter_film_links(module.get_film_links, page)]
+            listing_s = time.perf_counter() - start
+            rss.sample()
+            timings, records = [], []
+            for n in range(repeat):
+                for film in links:
+                    start = time.perf_counter()
+                    record = await module.process_film(page, film)
+                    timings.append(time.perf_counter() - start)
+                    rss.sample()
+                    if n == 0:
+                        records.append(record)
+        finally:
+            await browser.close()
+    return listing_s, timings, records
+
+
+def bench_browser(module_name):
+    def run(fixture, repeat, rss):
+        module = __import__(module_name)
+        return asyncio.run(_bench_browser(module, fixture, repeat, rss))
+    return run
+
+
+RUNNERS = {
+    "torrent9": bench_torrent9,
+    "moviebox_nuxt_http": bench_moviebox_nuxt_http,
+    "moviebox_nuxt": bench_browser("fetch_moviebox_nuxt"),
+    "moviebox_downloads": bench_browser("fetch_moviebox_downloads"),
+    "mirror66": bench_browser("fetch_mirror66_minimal"),
+}
+
+
+def run_bench(name, repeat):
+    """Un benchmark dans le processus courant : ligne de mesures, ou None s'il est ignoré."""
+    source, kind = BENCHES[name]
+    fixture = Fixture(source)
+    rss = PeakRss()
+    try:
+        listing_s, timings, records = RUNNERS[name](fixture, repeat, rss)
+    except ImportError as e:
+        print(f"{name} ignoré : {e}")
+        return None
+    except Exception as e:
+        if kind == "browser":
+            print(f"{name} ignoré (navigateur indisponible ?) : {e}".splitlines()[0])
+            return None
+        raise
+    return _summary(name, listing_s, timings, records, fixture.expected, rss)
+
+
+def print_table(rows):
+    print(f"{'bench':<20} {'listing ms':>10} {'pages':>6} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'pages/s':>8} {'pic py':>7} {'pic nav':>8}  résultat")
+    for r in rows:
+        status = "OK" if not (r["missing"] or r["unexpected"]) else \
+            f"{len(r['missing'])} manquant(s), {len(r['unexpected'])} inattendu(s)"
+        print(f"{r['bench']:<20} {r['listing_ms']:>10.1f} {r['pages']:>6} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['pages_per_s']:>8.1f} {r['python_peak_mb']:>7.0f} "
+              f"{r['browser_peak_mb']:>8.0f}  {status}")
+
+
+def compare(rows, baseline_path, tolerance):
+    """Liste des régressions (p95 ou pages/s dégradés de plus de `tolerance`, ou résultats faux)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["bench"]: r for r in json.load(f)}
+    problems = []
+    for r in rows:
+        if r["missing"] or r["unexpected"]:
+            problems.append(f"{r['bench']} : résultats différents des fixtures")
+        base = baseline.get(r["bench"])
+        if not base:
+            continue
+        if base["p95_ms"] and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{r['bench']} : p95 {r['p95_ms']:.1f} ms (référence {base['p95_ms']:.1f} ms)")
+        if r["pages_per_s"] < base["pages_per_s"] * (1 - tolerance):
+            problems.append(f"{r['bench']} : {r['pages_per_s']:.1f} pages/s "
+                            f"(référence {base['pages_per_s']:.1f})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benches", nargs="*",
+                        help=f"Benchmarks à lancer parmi {', '.join(BENCHES)} (défaut : tous).")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes sur les fiches (défaut : 5).")
+    parser.add_argument("--json", help="Écrit les mesures dans ce fichier.")
+    parser.add_argument("--compare", help="Compare à un fichier --json précédent.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Dégradation tolérée avant régression (défaut : 0.25 = 25%%).")
+    args = parser.parse_args()
+    unknown = [name for name in args.benches if name not in BENCHES]
+    if unknown:
+        parser.error(f"benchmark inconnu : {', '.join(unknown)}")
+
+    rows = []
+    # "spawn" : processus neuf, sans la mémoire du parent (ru_maxrss part de zéro)
+    context = multiprocessing.get_context("spawn")
+    for name in args.benches or list(BENCHES):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            row = executor.submit(run_bench, name, args.repeat).result()
+        if row is not None:
+            rows.append(row)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        problems = compare(rows, args.compare, args.tolerance)
+        for problem in problems:
+            print(f"RÉGRESSION : {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Micro-benchmark des backends HTML de scraping/parsing.py.
+
+Pour chaque backend : temps de parsing + extraction par page (médiane, moyenne)
+et pic mémoire. Chaque backend tourne dans son propre sous-processus pour que
+le pic RSS (qui inclut les allocations C de lxml/selectolax) ne soit pas
+pollué par les autres ; le pic tracemalloc ne couvre que le tas Python.
+
+"bs4-full" reproduit l'ancien comportement (arbre BeautifulSoup complet,
+sans SoupStrainer) comme point de comparaison.
+
+Usage :
+    python bench_parsers.py                      # pages synthétiques
+    python bench_parsers.py page1.html page2.html --repeat 20
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from scraping.parsing import Field, available_backends, extract
+
+LIST_FIELDS = {"hrefs": Field("a[href^='/film/']", attr="href", many=True)}
+DETAIL_FIELDS = {
+    "title": Field("h1"),
+    "magnet": Field("a[href^='magnet:']", attr="href"),
+}
+
+
+def synthetic_pages(cards):
+    """Une page liste de `cards` fiches et une page détail, au format Torrent9."""
+    rows = "\n".join(
+        f'<div class="card"><img src="/p/{i}.jpg" alt="Film {i}">'
+        f'<a href="/film/{i}-film-{i}" title="Film {i}">Film {i}</a>'
+        f'<p class="synopsis">{"Lorem ipsum dolor sit amet. " * 8}</p></div>'
+        for i in range(cards)
+    )
+    listing = f"<html><head><title>Films</title></head><body><nav>{'<a href=/x>x</a>' * 50}</nav>{rows}</body></html>"
+    detail = (
+        "<html><body><header>" + "<a href='/cat'>cat</a>" * 100 + "</header>"
+        "<h1> Film 42 (2024) </h1>"
+        + "<p>" + "Description du film. " * 400 + "</p>"
+        "<table>" + "<tr><td>x</td><td>y</td></tr>" * 300 + "</table>"
+        "<a href='magnet:?xt=urn:btih:0123456789abcdef'>Télécharger</a></body></html>"
+    )
+    return [("liste", listing, LIST_FIELDS), ("detail", detail, DETAIL_FIELDS)]
+
+
+def _extract_full_bs4(html, fields):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return {name: soup.select(f.selector) if f.many else soup.select_one(f.selector)
+            for name, f in fields.items()}
+
+
+def run_child(backend, pages, repeat):
+    """Mesures d'un backend dans le processus courant. Renvoie un dict par page."""
+    fn = _extract_full_bs4 if backend == "bs4-full" else (lambda h, f: extract(h, f, backend))
+    # Imports et caches hors mesure, sur un document minuscule pour ne pas fausser le pic RSS
+    fn("<html><body><h1>x</h1><a href='/film/1'>x</a></body></html>", pages[0][2])
+    results = []
+    for name, html, fields in pages:
+        timings = []
+        tracemalloc.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(html, fields)
+            timings.append(time.perf_counter() - start)
+        _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        results.append({
+            "page": name,
+            "kb": len(html) / 1024,
+            "median_ms": statistics.median(timings) * 1000,
+            "mean_ms": statistics.mean(timings) * 1000,
+            "py_peak_kb": py_peak / 1024,
+            # ru_maxrss est en Ko sous Linux
+            "rss_growth_kb": rss_after - rss_before,
+        })
+    return results
+
+
+def load_pages(paths, cards):
+    if not paths:
+        return synthetic_pages(cards)
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        pages.append((path, html, {**LIST_FIELDS, **DETAIL_FIELDS}))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="Pages HTML enregistrées (défaut : pages synthétiques).")
+    parser.add_argument("--repeat", type=int, default=10, help="Répétitions par page (défaut : 10).")
+    parser.add_argument("--cards", type=int, default=2000,
+                        help="Fiches dans la page liste synthétique (défaut : 2000).")
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        # Sous-processus : un seul backend, résultat en JSON sur stdout
+        print(json.dumps(run_child(args.backend, load_pages(args.files, args.cards), args.repeat)))
+        return
+
+    backends = available_backends()
+    if "bs4" in backends:
+        backends.append("bs4-full")
+    print(f"{'backend':<12} {'page':<20} {'Ko':>8} {'médiane ms':>11} {'moyenne ms':>11} "
+          f"{'pic py Ko':>10} {'+RSS Ko':>9}")
+    for backend in backends:
+        cmd = [sys.executable, __file__, "--backend", backend, "--repeat", str(args.repeat),
+               "--cards", str(args.cards), *args.files]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        for row in json.loads(out):
+            print(f"{backend:<12} {row['page'][-20:]:<20} {row['kb']:>8.0f} {row['median_ms']:>11.2f} "
+                  f"{row['mean_ms']:>11.2f} {row['py_peak_kb']:>10.0f} {row['rss_growth_kb']:>9}")
+
+
+if __name__ == "__main__":
+    main()
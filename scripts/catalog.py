@@ -0,0 +1,126 @@
+"""
+Catalogue Parquet : export depuis le JSONL des scrapers, requêtes et diff entre runs.
+
+- export : import_films.jsonl -> import_films.parquet (voir scraping.catalog ;
+  aussi fait en fin de run par les scrapers avec --parquet)
+- query  : films filtrés par source, hôte, année, statut de lien ; une ligne
+  JSON par film, seules les colonnes demandées sont lues
+- hosts  : nombre de films par hôte vidéo (ou par source, --by source)
+- diff   : films ajoutés / retirés entre deux exports (par video_url)
+
+Usage :
+    cd scripts
+    python catalog.py export
+    python catalog.py query --source mirror66 --host uqload.net --columns title,video_url
+    python catalog.py query --year-min 2020 --status dead --limit 20
+    python catalog.py hosts
+    python catalog.py diff hier.parquet import_films.parquet
+
+Dépendances : pip install pyarrow
+"""
+
+import argparse
+import json
+import time
+
+import pyarrow.dataset as ds
+
+from scraping import catalog
+from scraping.output import DEFAULT_JSON_PATH, iter_unique, jsonl_path_for, parquet_path_for
+
+DEFAULT_PARQUET_PATH = parquet_path_for(DEFAULT_JSON_PATH)
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def _csv(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def cmd_export(args):
+    jsonl = jsonl_path_for(args.output)
+    path = args.parquet or parquet_path_for(args.output)
+    start = time.monotonic()
+    written, rejected = catalog.export(iter_unique(jsonl), path, args.batch_size)
+    log(f"Catalogue {path} généré : {written} films, {rejected} écartés "
+        f"en {time.monotonic() - start:.1f}s.")
+
+
+def cmd_query(args):
+    where = None
+    for condition in (
+        ds.field("year") >= args.year_min if args.year_min else None,
+        ds.field("year") <= args.year_max if args.year_max else None,
+        ds.field("link_status").isin(args.status) if args.status else None,
+    ):
+        if condition is not None:
+            where = condition if where is None else where & condition
+    shown = 0
+    for batch in catalog.scan(args.path, columns=args.columns, source=args.source,
+                              host=args.host, where=where):
+        for row in batch.to_pylist():
+            if args.limit and shown >= args.limit:
+                return
+            print(json.dumps(row, ensure_ascii=False, default=str))
+            shown += 1
+
+
+def cmd_hosts(args):
+    counts = catalog.count_by(args.path, args.by, source=args.source)
+    for value, n in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"{n:>8}  {value or '(aucun)'}")
+
+
+def cmd_diff(args):
+    added, removed = catalog.diff(args.old, args.new)
+    for sign, table in (("+", added), ("-", removed)):
+        for row in table.to_pylist():
+            print(f"{sign} [{row['source'] or '?'}] {row['title']}  {row['video_url']}")
+    log(f"{added.num_rows} films ajoutés, {removed.num_rows} retirés.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="JSONL des scrapers -> Parquet.")
+    export.add_argument("--output", default=DEFAULT_JSON_PATH,
+                        help=f"Fichier JSON du run (défaut : {DEFAULT_JSON_PATH}) ; "
+                             "le JSONL lu est à côté (.jsonl).")
+    export.add_argument("--parquet", default=None,
+                        help="Fichier Parquet écrit (défaut : à côté du JSON, .parquet).")
+    export.add_argument("--batch-size", type=int, default=catalog.DEFAULT_BATCH_SIZE,
+                        help=f"Films par row group (défaut : {catalog.DEFAULT_BATCH_SIZE}).")
+    export.set_defaults(run=cmd_export)
+
+    query = commands.add_parser("query", help="Films filtrés, en JSON lignes.")
+    query.add_argument("path", nargs="?", default=DEFAULT_PARQUET_PATH)
+    query.add_argument("--source", type=_csv, help="Source(s), séparées par des virgules.")
+    query.add_argument("--host", type=_csv, help="Hôte(s) vidéo, séparés par des virgules.")
+    query.add_argument("--year-min", type=int)
+    query.add_argument("--year-max", type=int)
+    query.add_argument("--status", type=_csv, help="Statut(s) check_links.py (ex : dead).")
+    query.add_argument("--columns", type=_csv, help="Colonnes affichées (défaut : toutes).")
+    query.add_argument("--limit", type=int, default=0)
+    query.set_defaults(run=cmd_query)
+
+    hosts = commands.add_parser("hosts", help="Nombre de films par hôte (ou par source).")
+    hosts.add_argument("path", nargs="?", default=DEFAULT_PARQUET_PATH)
+    hosts.add_argument("--by", choices=("host", "source", "link_status", "language"), default="host")
+    hosts.add_argument("--source", type=_csv, help="Source(s), séparées par des virgules.")
+    hosts.set_defaults(run=cmd_hosts)
+
+    diff = commands.add_parser("diff", help="Films ajoutés / retirés entre deux exports.")
+    diff.add_argument("old")
+    diff.add_argument("new", nargs="?", default=DEFAULT_PARQUET_PATH)
+    diff.set_defaults(run=cmd_diff)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Vérifie les video_url de la sortie des scrapers avant l'import.
+
+- Lit le JSONL de travail (import_films.jsonl), sonde chaque video_url une
+  seule fois (HEAD, ou GET d'un octet si HEAD est refusé), en parallèle avec
+  un plafond par hôte
+- Ajoute à chaque film un champ "_link" : statut (alive/dead/error/skipped),
+  code HTTP, Content-Type, taille, latence, date de vérification
+- Régénère import_films.json sans les liens morts (--keep-dead pour les garder) ;
+  load_films.py écarte aussi les films marqués "dead"
+
+Les résultats sont en cache (scripts/.cache/links.sqlite, --ttl) : un lien
+vérifié récemment n'est pas re-sondé.
+
+Usage :
+    cd scripts
+    python check_links.py
+    python check_links.py --output import_films.json --recheck --workers 32
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+
+from scraping import liveness, metrics
+from scraping.http_client import add_http_arguments, open_client
+from scraping.output import DEFAULT_JSON_PATH, compact, iter_jsonl, jsonl_path_for, rewrite_jsonl
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def annotate(results):
+    """Fonction pour rewrite_jsonl : ajoute à chaque film le résultat de vérification de son lien."""
+    def update(record):
+        result = results.get(record.get("video_url"))
+        if result:
+            record["_link"] = {k: v for k, v in result.items() if v is not None}
+    return update
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=DEFAULT_JSON_PATH,
+                        help=f"Fichier JSON final (défaut : {DEFAULT_JSON_PATH}) ; "
+                             "le JSONL lu est à côté (.jsonl).")
+    parser.add_argument("--keep-dead", action="store_true",
+                        help="Garde les liens morts dans le JSON final (marqués dans _link).")
+    parser.add_argument("--recheck", action="store_true", help="Ignore le cache et re-sonde tout.")
+    parser.add_argument("--ttl", type=float, default=liveness.DEFAULT_TTL,
+                        help=f"Validité d'une vérification en secondes (défaut : {liveness.DEFAULT_TTL}).")
+    parser.add_argument("--links-path", default=liveness.DEFAULT_LINKS_PATH,
+                        help="Fichier SQLite du cache des vérifications.")
+    args = add_http_arguments(parser).parse_args()
+
+    jsonl = jsonl_path_for(args.output)
+    if not os.path.exists(jsonl):
+        parser.error(f"{jsonl} introuvable : lance d'abord un scraper")
+    urls = [r["video_url"] for r in iter_jsonl(jsonl) if r.get("video_url")]
+    log(f"{len(set(urls))} liens à vérifier dans {jsonl}")
+
+    cache = liveness.LinkCache(args.links_path, ttl=0 if args.recheck else args.ttl)
+    client = open_client(args)
+    results = {}
+    statuses = Counter()
+    latencies = []
+    cached = 0
+    try:
+        for url, result, from_cache in liveness.check_urls(client, urls, cache):
+            results[url] = result
+            statuses[result["status"]] += 1
+            if from_cache:
+                cached += 1
+            elif result.get("latency_ms") is not None:
+                latencies.append(result["latency_ms"])
+            if result["status"] in (liveness.DEAD, liveness.ERROR):
+                log(f"  {result['status']:<5} {result.get('http_status') or '-'} {url}")
+    finally:
+        client.close()
+        cache.close()
+
+    rewrite_jsonl(jsonl, annotate(results))
+    log(", ".join(f"{count} {status}" for status, count in statuses.most_common())
+        + f" ({cached} depuis le cache)")
+    if latencies:
+        log(f"Latence : p50 {metrics.percentile(latencies, 50):.0f} ms, "
+            f"p95 {metrics.percentile(latencies, 95):.0f} ms")
+    count = compact(jsonl, args.output, keep=None if args.keep_dead else lambda r: not liveness.is_dead(r))
+    log(f"Fichier {args.output} régénéré : {count} films.")
+
+
+if __name__ == "__main__":
+    main()
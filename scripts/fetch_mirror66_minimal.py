@@ -6,14 +6,18 @@
 Script minimal pour Mirror66.lol
 - Récupère tous les liens de films sur https://mirror66.lol/films/
 - Extrait le titre (attribut alt) et le lien (href)
-- Va sur chaque fiche, trouve le lecteur vidéo (iframe, video...) et extrait l'URL vidéo
+- Va sur chaque fiche et lit en une passe les URLs de tous les lecteurs (attributs
+  des onglets, scripts inline) ; les onglets sans URL lisible sont cliqués
 - Génère import_films.json avec {title, video_url}
 """
 
-import json
+import asyncio
 import time
 import random
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from urllib.parse import urljoin
+from playwright.async_api import TimeoutError as PWTimeout
+
+from scraping import backoff, engine, metrics, waits
 
 MIRROR66_LIST_URL = "https://mirror66.lol/films/"
 MIRROR66_PREFIX = "https://mirror66.lol"
@@ -21,6 +25,68 @@ MIRROR66_PREFIX = "https://mirror66.lol"
 # Mode headful par défaut pour voir ce qui bloque (change en True pour invisible)
 HEADLESS = False
 
+# Onglets de lecteurs. Priorité : PREMIUM d'abord, puis les autres
+TAB_NAMES = ["PREMIUM", "VIDZY", "DOOD", "FILMOON", "VOE", "UQLOAD"]
+
+CARD_SELECTOR = 'a.short-poster.img-box.with-mask'
+# Lien vers la page suivante du catalogue (pagination DLE : /films/page/2/)
+NEXT_PAGE_SELECTOR = 'a[rel="next"], .pnext a, .navigation a.next'
+# Garde-fou contre une pagination qui boucle
+MAX_LIST_PAGES = 200
+
+PLAYER_SELECTOR = ", ".join(["iframe"] + [f':text-is("{tab}")' for tab in TAB_NAMES])
+
+# Timeouts des attentes (ms) : on rend la main dès que la condition est remplie
+LIST_TIMEOUT = 15000
+PAGE_TIMEOUT = 10000
+TAB_TIMEOUT = 4000
+
+# Attributs des onglets qui portent l'URL du lecteur (lus sans cliquer)
+PLAYER_ATTRIBUTES = ("data-src", "data-url", "data-embed", "data-link", "data-iframe", "data-player")
+
+# Un seul aller-retour : onglets présents, onglet actif, URLs lues dans les
+# attributs des onglets, puis dans les scripts inline ("VIDZY": "https://...")
+READ_PLAYERS_JS = r"""
+({names, attrs}) => {
+    const tabs = [], sources = {};
+    let active = null;
+    for (const el of document.querySelectorAll('li, a, button, span, div')) {
+        const name = (el.textContent || '').trim().toUpperCase();
+        if (!names.includes(name) || tabs.includes(name)) continue;
+        tabs.push(name);
+        const cls = (el.className || '') + ' ' + ((el.parentElement && el.parentElement.className) || '');
+        if (/\b(active|selected|current)\b/.test(cls) || el.getAttribute('aria-selected') === 'true') {
+            active = name;
+        }
+        for (const node of [el, el.parentElement]) {
+            const value = node && attrs.map(a => node.getAttribute(a)).find(v => v);
+            if (value) {
+                sources[name] = new URL(value, location.href).href;
+                break;
+            }
+        }
+    }
+    const inline = Array.from(document.querySelectorAll('script:not([src])'), s => s.textContent).join('\n');
+    for (const name of tabs) {
+        if (sources[name]) continue;
+        const match = inline.match(new RegExp('["\']?' + name + '["\']?\\s*[:=,]\\s*["\'](https?:[^"\'\\s]+)', 'i'));
+        if (match) sources[name] = match[1].replace(/\\\//g, '/');
+    }
+    return {tabs, active, sources};
+}
+"""
+
+# Onglet marqué comme sélectionné (mêmes indices que READ_PLAYERS_JS pour l'onglet actif)
+TAB_SELECTED_JS = r"""
+el => {
+    const cls = (el.className || '') + ' ' + ((el.parentElement && el.parentElement.className) || '');
+    return /\b(active|selected|current)\b/.test(cls) || el.getAttribute('aria-selected') === 'true';
+}
+"""
+
+# Les onglets de lecteurs sont repérés au texte : on garde le CSS pour qu'ils restent cliquables
+BLOCKED_RESOURCES = ("image", "font", "media")
+
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
@@ -31,108 +97,164 @@ USER_AGENTS = [
 def log(msg):
     print(f"[{time.strftime('%H:%M:%S')}] {msg}")
 
-def get_film_links(p):
+async def get_film_links(page):
+    """
+    Parcourt le catalogue Mirror66 sans connexion, page après page, et génère
+    les fiches films au fur et à mesure (le moteur les traite pendant que la
+    page suivante se charge).
+    """
+    url = MIRROR66_LIST_URL
+    visited = set()
+    count = 0
+    while url and url not in visited and len(visited) < MAX_LIST_PAGES:
+        visited.add(url)
+        # Une mesure par page (chargement et lecture), sans l'attente des workers
+        with metrics.span("listing"):
+            await page.goto(url, wait_until="networkidle")
+            await waits.wait_for_selector(page, CARD_SELECTOR, timeout=LIST_TIMEOUT)
+            # Un seul aller-retour avec le navigateur pour toutes les cartes de la page
+            cards = await page.eval_on_selector_all(
+                CARD_SELECTOR,
+                "els => els.map(a => [a.getAttribute('href'), a.getAttribute('alt') || a.innerText.trim()])",
+            )
+            next_href = await page.eval_on_selector_all(
+                NEXT_PAGE_SELECTOR, "els => els.length ? els[0].getAttribute('href') : null")
+        for href, title in cards:
+            if href and title:
+                full_url = href if href.startswith('http') else MIRROR66_PREFIX + href
+                count += 1
+                yield {"title": title, "url": full_url}
+        url = urljoin(url, next_href) if next_href else None
+    log(f"{count} fiches films trouvées sur {len(visited)} page(s).")
+
+async def read_player_sources(page):
     """
-    Va directement sur la page catalogue Mirror66 sans connexion, et récupère les liens films.
+    Lit en une passe les onglets de lecteurs de la fiche : {"tabs", "active", "sources"}.
+    `sources` ne contient que les URLs trouvées sans cliquer (attributs, scripts).
     """
-    browser = p.chromium.launch(headless=HEADLESS)
-    page = browser.new_page()
-    ua = random.choice(USER_AGENTS)
-    page.set_extra_http_headers({"User-Agent": ua})
-    page.goto(MIRROR66_LIST_URL, wait_until="networkidle")
-    time.sleep(3)
-    links = []
-    for a in page.query_selector_all('a.short-poster.img-box.with-mask'):
-        href = a.get_attribute('href')
-        title = a.get_attribute('alt') or a.inner_text().strip()
-        if href and title:
-            full_url = href if href.startswith('http') else MIRROR66_PREFIX + href
-            links.append({"title": title, "url": full_url})
-    browser.close()
-    log(f"{len(links)} fiches films trouvées.")
-    return links
-
-def extract_video_url_multi(page):
+    return await page.evaluate(READ_PLAYERS_JS, {"names": TAB_NAMES, "attrs": list(PLAYER_ATTRIBUTES)})
+
+async def click_player_tabs(page, tabs, active=None):
     """
-    Clique chaque onglet de lecteur, extrait l'URL de l'iframe pour chaque source.
-    Donne la priorité à PREMIUM si présent.
-    Retourne un dict {nom_source: url}
+    Repli : clique les onglets `tabs` un par un et lit l'iframe après chaque clic
+    (attente du changement de src, pas de délai fixe). L'onglet `active` n'est
+    pas cliqué : l'iframe affichée est déjà la sienne.
+    Renvoie {onglet: url} comme la lecture en une passe : deux onglets peuvent
+    pointer vers la même URL.
     """
     video_links = {}
-    # Priorité : PREMIUM d'abord, puis les autres
-    tab_names = ["PREMIUM", "VIDZY", "DOOD", "FILMOON", "VOE", "UQLOAD"]
-    for tab in tab_names:
+    for tab in tabs:
         try:
-            tab_elem = page.query_selector(f'text="{tab}"')
-            if tab_elem:
-                tab_elem.click()
+            if tab == active:
+                src = await waits.current_iframe_src(page)
+            else:
+                tab_elem = await page.query_selector(f'text="{tab}"')
+                if not tab_elem:
+                    continue
+                previous = await waits.current_iframe_src(page)
+                await tab_elem.click()
                 log(f"  - Onglet {tab} sélectionné")
-                time.sleep(2.5)
-                iframe = page.query_selector('iframe')
-                if iframe:
-                    src = iframe.get_attribute('src')
-                    if src and src.startswith('http'):
-                        video_links[tab] = src
-                        log(f"    > Lien trouvé pour {tab}: {src}")
+                src, _ = await waits.wait_for_iframe_src_change(page, previous, timeout=TAB_TIMEOUT)
+                if not src and previous and await tab_elem.evaluate(TAB_SELECTED_JS):
+                    # Onglet sélectionné mais iframe inchangée : même lecteur que l'onglet précédent
+                    if await waits.current_iframe_src(page) == previous:
+                        src = previous
+            if src:
+                video_links[tab] = src
+                log(f"    > Lien trouvé pour {tab}: {src}")
         except Exception as e:
             log(f"    ! Erreur onglet {tab}: {e}")
     return video_links
 
-def scrape_film(page, url, retries=2):
+async def extract_video_url_multi(page):
+    """
+    URLs de tous les lecteurs de la fiche : lues en une passe dans la page
+    (attributs des onglets, scripts inline) ; seuls les onglets sans URL
+    lisible sont cliqués. Retourne un dict {nom_source: url}, dans l'ordre de
+    priorité de TAB_NAMES.
+    """
+    found = await read_player_sources(page)
+    video_links = dict(found["sources"])
+    if video_links:
+        log(f"  - {len(video_links)} lecteur(s) lus sans clic : {', '.join(video_links)}")
+    missing = [tab for tab in found["tabs"] if tab not in video_links]
+    if missing:
+        video_links.update(await click_player_tabs(page, missing, found["active"]))
+    return {tab: video_links[tab] for tab in TAB_NAMES if tab in video_links}
+
+async def scrape_film(page, url, retries=2):
+    """
+    Ouvre la fiche et lit ses lecteurs. Nouvelle tentative après un backoff
+    exponentiel ; une réponse 404 (ou autre 4xx hors 401/403/429) est
+    abandonnée tout de suite. Si la dernière tentative a levé une erreur, elle
+    remonte au moteur (compte pour le disjoncteur de l'hôte).
+    """
+    error = None
     for attempt in range(retries):
+        if attempt:
+            metrics.incr("retries")
+            await asyncio.sleep(backoff.retry_delay(attempt - 1, base=3))
+        error = None
         try:
             ua = random.choice(USER_AGENTS)
-            page.set_extra_http_headers({"User-Agent": ua})
-            page.goto(url, wait_until="domcontentloaded")
-            time.sleep(random.uniform(2.5, 4))
-            video_urls = extract_video_url_multi(page)
+            await page.set_extra_http_headers({"User-Agent": ua})
+            with metrics.span("goto"):
+                response = await page.goto(url, wait_until="domcontentloaded")
+            status = response.status if response else None
+            kind = backoff.classify(status=status)
+            if kind != backoff.OK:
+                log(f"Tentative {attempt+1}: HTTP {status} sur la fiche.")
+                if backoff.is_retryable(kind):
+                    continue
+                return None, {}
+            # Le lecteur est prêt dès qu'une iframe ou un onglet apparaît
+            await waits.wait_for_selector(page, PLAYER_SELECTOR, timeout=PAGE_TIMEOUT)
+            with metrics.span("extract"):
+                video_urls = await extract_video_url_multi(page)
             if video_urls:
                 # Prend VIDZY par défaut, sinon le premier trouvé
                 preferred = video_urls.get("VIDZY") or next(iter(video_urls.values()))
                 return preferred, video_urls
             else:
                 log(f"Tentative {attempt+1}: pas de vidéo trouvée.")
-        except PWTimeout:
+        except PWTimeout as e:
+            error = e
             log(f"Tentative {attempt+1}: Timeout sur la fiche.")
         except Exception as e:
+            error = e
             log(f"Tentative {attempt+1}: Erreur inattendue: {e}")
-        time.sleep(random.uniform(3, 6))
+    if error is not None:
+        raise error
     return None, {}
 
+async def process_film(page, film):
+    video_url, all_sources = await scrape_film(page, film['url'])
+    # Sélectionne la source avec priorité PREMIUM, puis VIDZY, puis autres
+    preferred = (
+        all_sources.get("PREMIUM") or
+        all_sources.get("VIDZY") or
+        next(iter(all_sources.values()), None)
+    )
+    if not preferred:
+        log("Aucune vidéo trouvée après retries.")
+        return None
+    log(f"OK: {film['title']} | {preferred} (source choisie)")
+    return {
+        "title": film['title'],
+        "video_url": preferred,
+        "all_sources": all_sources
+    }
+
+SOURCE = engine.Source(
+    "mirror66", get_film_links, process_film,
+    # Délai anti-bot fort, par worker
+    delay=(5, 9),
+    user_agents=USER_AGENTS,
+    blocked=BLOCKED_RESOURCES,
+)
+
 def main():
-    with sync_playwright() as p:
-        links = get_film_links(p)
-        if not links:
-            print("Aucun film trouvé.")
-            return
-        browser = p.chromium.launch(headless=HEADLESS)
-        page = browser.new_page()
-        results = []
-        for i, film in enumerate(links):
-            log(f"[{i+1}/{len(links)}] {film['title']}")
-            video_url, all_sources = scrape_film(page, film['url'])
-            # Sélectionne la source avec priorité PREMIUM, puis VIDZY, puis autres
-            preferred = (
-                all_sources.get("PREMIUM") or
-                all_sources.get("VIDZY") or
-                next(iter(all_sources.values()), None)
-            )
-            if preferred:
-                log(f"OK: {film['title']} | {preferred} (source choisie)")
-                results.append({
-                    "title": film['title'],
-                    "video_url": preferred,
-                    "all_sources": all_sources
-                })
-            else:
-                log("Aucune vidéo trouvée après retries.")
-            # Délai anti-bot fort
-            time.sleep(random.uniform(5, 9))
-        browser.close()
-        log(f"{len(results)} films exploitables.")
-        with open("import_films.json", "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        log("Fichier import_films.json généré !")
+    engine.main(__doc__, SOURCE, headless=HEADLESS)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -12,15 +12,21 @@ Dépendances : pip install playwright beautifulsoup4
 
 
 
-import json
 import time
-import random
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+
+from scraping import engine, metrics, waits
 
 MOVIEBOX_LIST_URL = "https://moviebox.ng/fr/web/film"
 MOVIEBOX_PREFIX = "https://moviebox.ng"
+FILM_LINK_SELECTOR = 'a[href*="/fr/movies/"]'
+# Catalogue en défilement infini : attente max de nouvelles fiches après un défilement (ms)
+SCROLL_TIMEOUT = 4000
+MAX_SCROLLS = 500
 HEADLESS = False
 
+# Seul l'attribut src de <video> nous intéresse : le flux lui-même n'est jamais téléchargé
+BLOCKED_RESOURCES = engine.DEFAULT_BLOCKED_RESOURCES
+
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
@@ -31,76 +37,70 @@ USER_AGENTS = [
 def log(msg):
     print(f"[{time.strftime('%H:%M:%S')}] {msg}")
 
-def get_film_links(p):
+async def get_film_links(page):
     """
-    Va sur la page catalogue et récupère tous les liens vers les fiches films + titres.
+    Va sur la page catalogue et génère les liens vers les fiches films + titres,
+    en faisant défiler la page tant que de nouvelles fiches apparaissent.
     """
-    browser = p.chromium.launch(headless=HEADLESS)
-    page = browser.new_page()
-    ua = random.choice(USER_AGENTS)
-    page.set_extra_http_headers({"User-Agent": ua})
-    page.goto(MOVIEBOX_LIST_URL, wait_until="networkidle")
-    time.sleep(3)
-    links = []
-    # Cherche tous les liens fiche films (adapte si MovieBox change son HTML !)
-    for a in page.query_selector_all('a[href*="/fr/movies/"]'):
-        href = a.get_attribute('href')
-        title = a.get_attribute('title') or a.inner_text().strip()
-        if href and title:
-            full_url = href if href.startswith('http') else MOVIEBOX_PREFIX + href
-            links.append({"title": title, "url": full_url})
-    browser.close()
-    log(f"{len(links)} fiches films trouvées.")
-    return links
+    seen = 0  # liens déjà lus : seuls les nouveaux sont relus après chaque défilement
+    count = 0
+    for i in range(MAX_SCROLLS):
+        # Une mesure par lot (chargement ou défilement, puis lecture), sans l'attente des workers
+        with metrics.span("listing"):
+            if not i:
+                await page.goto(MOVIEBOX_LIST_URL, wait_until="networkidle")
+                await waits.wait_for_selector(page, FILM_LINK_SELECTOR, timeout=15000)
+            else:
+                more, _ = await waits.scroll_for_more(page, FILM_LINK_SELECTOR, seen, timeout=SCROLL_TIMEOUT)
+                if not more:
+                    break
+            # Cherche les liens fiche films (adapte si MovieBox change son HTML !)
+            anchors = await page.eval_on_selector_all(
+                FILM_LINK_SELECTOR,
+                "(els, start) => els.slice(start).map(a => [a.getAttribute('href'), a.getAttribute('title') || a.innerText.trim()])",
+                seen,
+            )
+        seen += len(anchors)
+        for href, title in anchors:
+            if href and title:
+                full_url = href if href.startswith('http') else MOVIEBOX_PREFIX + href
+                count += 1
+                yield {"title": title, "url": full_url}
+    log(f"{count} fiches films trouvées.")
 
-def extract_video_download_url(page):
+async def extract_video_download_url(page):
     """
-    Attend et extrait le src de <video class="art-video"> (lien de téléchargement direct)
+    Attend et extrait le src de <video class="art-video"> (lien de téléchargement direct).
+    Rend la main dès que le src est renseigné.
     """
-    try:
-        video = page.wait_for_selector('video.art-video', timeout=9000)
-        src = video.get_attribute('src')
-        if src and src.startswith('http'):
-            return src
-    except Exception as e:
-        log(f"  ! Pas de balise <video> trouvée : {e}")
-    return None
+    src, waited = await waits.wait_for_video_src(page, 'video.art-video', timeout=9000)
+    if not src:
+        log(f"  ! Pas de <video> avec src après {waited:.1f}s")
+    return src
+
+async def process_film(page, film):
+    with metrics.span("goto"):
+        await page.goto(film['url'], wait_until="domcontentloaded")
+    with metrics.span("extract"):
+        video_url = await extract_video_download_url(page)
+    if not video_url:
+        log("Aucun lien vidéo téléchargeable trouvé.")
+        return None
+    log(f"OK: {film['title']} | {video_url}")
+    return {
+        "title": film['title'],
+        "video_url": video_url
+    }
+
+SOURCE = engine.Source(
+    "moviebox_downloads", get_film_links, process_film,
+    delay=(6, 11),
+    user_agents=USER_AGENTS,
+    blocked=BLOCKED_RESOURCES,
+)
 
 def main():
-    with sync_playwright() as p:
-        links = get_film_links(p)
-        if not links:
-            print("Aucun film trouvé.")
-            return
-        browser = p.chromium.launch(headless=HEADLESS)
-        page = browser.new_page()
-        results = []
-        for i, film in enumerate(links):
-            log(f"[{i+1}/{len(links)}] {film['title']}")
-            try:
-                ua = random.choice(USER_AGENTS)
-                page.set_extra_http_headers({"User-Agent": ua})
-                page.goto(film['url'], wait_until="domcontentloaded")
-                time.sleep(random.uniform(2.5, 4))
-                video_url = extract_video_download_url(page)
-                if video_url:
-                    log(f"OK: {film['title']} | {video_url}")
-                    results.append({
-                        "title": film['title'],
-                        "video_url": video_url
-                    })
-                else:
-                    log("Aucun lien vidéo téléchargeable trouvé.")
-            except PWTimeout:
-                log("Timeout sur la fiche, on passe à la suivante.")
-            except Exception as e:
-                log(f"Erreur inattendue: {e}")
-            time.sleep(random.uniform(6, 11))
-        browser.close()
-        log(f"{len(results)} films exploitables.")
-        with open("import_films.json", "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        log("Fichier import_films.json généré !")
+    engine.main(__doc__, SOURCE, headless=HEADLESS)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
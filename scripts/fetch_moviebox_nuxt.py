@@ -2,126 +2,153 @@
 Script MovieBox ultra-robuste : extraction Titre + URL vidéo depuis le JSON NUXT côté client.
 
 - Parcourt la page liste des films MovieBox (https://moviebox.ng/fr/web/film)
-- Ouvre chaque fiche film (avec Playwright, headless)
-- Extrait le script JSON "__NUXT_DATA__" de la fiche
-- Recherche récursive dans la structure imbriquée : "title" et "videoAddress" (ou "url" .mp4)
+- Télécharge d'abord chaque fiche en HTTP simple : le script "__NUXT_DATA__"
+  est dans le HTML rendu côté serveur, pas besoin de navigateur
+- Ouvre la fiche avec Playwright (headless) seulement si le script manque ou si la vidéo est vide
+- Décode le payload (références devalue), lit "title" puis "videoAddress" (ou "url" .mp4) dans
+  l'objet du même film (jamais dans les films "related")
 - Génère un import_films.json minimal pour l'import admin
 
 Dépendances :
-    pip install playwright beautifulsoup4
+    pip install playwright requests beautifulsoup4
     python -m playwright install
 """
 
 # EXECUTER : cd scripts
 #    python fetch_moviebox_nuxt.py
 
-import json
+import asyncio
 import time
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+
+from scraping import engine, metrics, waits
+from scraping.nuxt import NuxtPayload
+from scraping.parsing import Field, extract
 
 MOVIEBOX_LIST_URL = "https://moviebox.ng/fr/web/film"
 MOVIEBOX_PREFIX = "https://moviebox.ng"
+FILM_LINK_SELECTOR = 'a[href*="/fr/movies/"]'
+# Catalogue en défilement infini : attente max de nouvelles fiches après un défilement (ms)
+SCROLL_TIMEOUT = 4000
+MAX_SCROLLS = 500
+
+# Seul le script __NUXT_DATA__ est lu : tout le reste peut être bloqué
+BLOCKED_RESOURCES = engine.DEFAULT_BLOCKED_RESOURCES
 
 def log(msg):
     print(f"[{time.strftime('%H:%M:%S')}] {msg}")
 
-def find_value(obj, key):
+def _is_text(value):
+    return isinstance(value, str) and bool(value.strip())
+
+def _is_mp4(value):
+    return isinstance(value, str) and value.endswith('.mp4')
+
+# La vidéo est cherchée dans l'objet du titre (le film de la fiche), pas dans
+# les films "related" ; "url" sert de repli : la première trouvée, gardée si .mp4
+VIDEO_KEYS = ("videoAddress", "url")
+
+NUXT_SCRIPT = {"nuxt": Field("script#__NUXT_DATA__")}
+
+def parse_title_video(raw):
     """
-    Recherche récursive d'une clé dans un JSON imbriqué (listes/dicos)
-    Renvoie la première valeur trouvée.
+    Décode le texte du script __NUXT_DATA__ et renvoie (titre, vidéo).
+    Les références du format devalue sont résolues (scraping.nuxt).
     """
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            if k == key and v:
-                return v
-            res = find_value(v, key)
-            if res:
-                return res
-    elif isinstance(obj, list):
-        for item in obj:
-            res = find_value(item, key)
-            if res:
-                return res
-    return None
-
-def get_film_links(p):
+    try:
+        payload = NuxtPayload.from_json(raw)
+    except Exception as e:
+        log(f"Erreur parsing JSON NUXT: {e}")
+        return None, None
+    title, title_path = payload.find_values(("title",), {"title": _is_text}).get("title", (None, None))
+    subject = title_path.rpartition(".")[0] if title_path else None
+    found = payload.find_values(VIDEO_KEYS, within=subject)
+    video = found.get("videoAddress", (None, None))[0]
+    # fallback si pas de clé "videoAddress"
+    if not video:
+        video = found.get("url", (None, None))[0]
+        if not _is_mp4(video):
+            video = None
+    return title, video
+
+async def get_film_links(page):
     """
-    Récupère tous les liens vers les fiches films à partir de la page liste MovieBox.
+    Génère les liens vers les fiches films de la page liste MovieBox, en
+    faisant défiler la page tant que de nouvelles fiches apparaissent.
     Adapte ici le sélecteur si besoin !
     """
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-    page.goto(MOVIEBOX_LIST_URL, wait_until="networkidle")
-    time.sleep(2)
-    # Cherche tous les liens vers des fiches films
-    # Adapte le sélecteur si besoin (ex : 'a[href*="/fr/movies/"]')
-    links = []
-    for a in page.query_selector_all('a'):
-        href = a.get_attribute('href')
-        if href and '/fr/movies/' in href:
-            # Pour éviter les doublons
+    seen = 0  # liens déjà lus : seuls les nouveaux sont relus après chaque défilement
+    links = set()  # doublons écartés en O(1)
+    for i in range(MAX_SCROLLS):
+        # Une mesure par lot (chargement ou défilement, puis lecture), sans l'attente des workers
+        with metrics.span("listing"):
+            if not i:
+                await page.goto(MOVIEBOX_LIST_URL, wait_until="networkidle")
+                await waits.wait_for_selector(page, FILM_LINK_SELECTOR, timeout=15000)
+            else:
+                more, _ = await waits.scroll_for_more(page, FILM_LINK_SELECTOR, seen, timeout=SCROLL_TIMEOUT)
+                if not more:
+                    break
+            hrefs = await page.eval_on_selector_all(
+                FILM_LINK_SELECTOR, "(els, start) => els.slice(start).map(a => a.getAttribute('href'))", seen)
+        seen += len(hrefs)
+        for href in hrefs:
             full_url = href if href.startswith('http') else MOVIEBOX_PREFIX + href
             if full_url not in links:
-                links.append(full_url)
-    browser.close()
+                links.add(full_url)
+                yield full_url
     log(f"{len(links)} fiches films trouvées.")
-    return links
 
-def extract_film_title_video(page):
+async def extract_film_title_video(page):
     """
     Sur une fiche film ouverte avec Playwright, extrait le script NUXT et parse le couple (titre, vidéo).
     """
-    # Récupère le script type="application/json" id="__NUXT_DATA__"
-    script = page.query_selector('script#__NUXT_DATA__')
-    if not script:
+    # Récupère le script type="application/json" id="__NUXT_DATA__" dès qu'il est présent
+    raw, _ = await waits.wait_for_nuxt_data(page, timeout=5000)
+    if not raw:
         return None, None
-    try:
-        nuxt_data = json.loads(script.inner_text())
-    except Exception as e:
-        log(f"Erreur parsing JSON NUXT: {e}")
-        return None, None
-    title = find_value(nuxt_data, "title")
-    video = find_value(nuxt_data, "videoAddress")
-    # fallback si pas de clé "videoAddress"
-    if not video:
-        video = find_value(nuxt_data, "url")
-        # Optionnel : ne garder que les .mp4
-        if video and not video.endswith('.mp4'):
-            video = None
-    return title, video
+    return parse_title_video(raw)
+
+async def fetch_film_http(client, url):
+    """
+    Voie rapide : HTML de la fiche en HTTP simple (pool de connexions + cache),
+    puis lecture directe du JSON embarqué. None -> la fiche passe par le navigateur.
+    """
+    with metrics.span("goto"):
+        html = await asyncio.to_thread(client.get_text, url)
+    with metrics.span("extract"):
+        raw = extract(html, NUXT_SCRIPT)["nuxt"]
+        title, video_url = parse_title_video(raw) if raw else (None, None)
+    if not raw:
+        log(f"  ~ Pas de __NUXT_DATA__ dans le HTML de {url}")
+        return None
+    if not (title and video_url):
+        log(f"  ~ Vidéo absente du payload HTTP de {url}")
+        return None
+    log(f"OK (HTTP): {title} | {video_url}")
+    return {"title": title, "video_url": video_url}
+
+async def process_film(page, url):
+    log(f"Ouverture de {url}")
+    with metrics.span("goto"):
+        await page.goto(url, wait_until="domcontentloaded")
+    with metrics.span("extract"):
+        title, video_url = await extract_film_title_video(page)
+    if not (title and video_url):
+        log("Aucune vidéo trouvée sur cette fiche.")
+        return None
+    log(f"OK: {title} | {video_url}")
+    return {"title": title, "video_url": video_url}
+
+SOURCE = engine.Source(
+    "moviebox_nuxt", get_film_links, process_film,
+    # Délai pour ne pas spammer
+    delay=(1.3, 1.3),
+    blocked=BLOCKED_RESOURCES,
+    fast_path=fetch_film_http,
+)
 
 def main():
-    with sync_playwright() as p:
-        # 1. Récupère tous les liens fiches films
-        links = get_film_links(p)
-        if not links:
-            print("Aucun film trouvé.")
-            return
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        results = []
-        for i, url in enumerate(links):
-            log(f"[{i+1}/{len(links)}] Ouverture de {url}")
-            try:
-                page.goto(url, wait_until="domcontentloaded")
-                time.sleep(1.5)
-                title, video_url = extract_film_title_video(page)
-                if title and video_url:
-                    log(f"OK: {title} | {video_url}")
-                    results.append({"title": title, "video_url": video_url})
-                else:
-                    log("Aucune vidéo trouvée sur cette fiche.")
-            except PWTimeout:
-                log("Timeout sur la fiche, on passe à la suivante.")
-            except Exception as e:
-                log(f"Erreur inattendue: {e}")
-            # Délai pour ne pas spammer
-            time.sleep(1.3)
-        browser.close()
-        log(f"{len(results)} films exploitables.")
-        with open("import_films.json", "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        log("Fichier import_films.json généré !")
+    engine.main(__doc__, SOURCE)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
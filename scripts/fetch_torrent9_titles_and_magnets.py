@@ -1,55 +1,131 @@
 """
 Script minimal : scrape Torrent9 pour récupérer {title, video_url (magnet)} pour chaque film.
 À utiliser si tu as l'autorisation Torrent9.
-Dépendances : pip install requests beautifulsoup4
+Dépendances : pip install requests beautifulsoup4 (optionnel, plus rapide : selectolax)
 """
 #EXECUTE : python fetch_torrent9_titles_and_magnets.py
-import requests
-from bs4 import BeautifulSoup
-import json
+import argparse
+from urllib.parse import urljoin
+
+from scraping import backoff, metrics, output, profiling
+from scraping.cache import add_cache_arguments, open_cache
+from scraping.dedup import add_dedup_arguments, open_dedup
+from scraping.http_client import add_http_arguments, open_client
+from scraping.parsing import Field, add_parser_arguments, extract
 
 BASE_URL = "https://www.torrent9.to"
 FILM_LIST_URL = BASE_URL + "/films"
 
+# Seuls ces éléments sont lus : le reste de la page n'est pas construit
+LIST_FIELDS = {
+    "hrefs": Field("a[href^='/film/']", attr="href", many=True),
+    # Lien vers la page suivante du catalogue (adapte le sélecteur si besoin)
+    "next": Field("a[rel='next']", attr="href"),
+}
+# Garde-fou contre une pagination qui boucle
+MAX_LIST_PAGES = 200
+DETAIL_FIELDS = {
+    "title": Field("h1"),
+    "magnet": Field("a[href^='magnet:']", attr="href"),
+}
+
 def log(msg):
     print(msg)
 
-def get_film_links():
-    res = requests.get(FILM_LIST_URL)
-    soup = BeautifulSoup(res.text, "html.parser")
-    links = []
-    for a in soup.select("a[href^='/film/']"):
-        href = a["href"]
-        if href.startswith("/film/"):
-            links.append(BASE_URL + href)
-    return list(set(links))  # supprime les doublons
-
-def get_title_and_magnet(detail_url):
-    detail_res = requests.get(detail_url)
-    soup = BeautifulSoup(detail_res.text, "html.parser")
-    title = soup.select_one("h1").text.strip() if soup.select_one("h1") else ""
-    magnet = soup.find("a", href=lambda x: x and x.startswith("magnet:"))
-    video_url = magnet["href"] if magnet else ""
-    return title, video_url
+def get_film_links(client, backend=None, max_pages=MAX_LIST_PAGES):
+    """
+    Générateur des liens de fiches, page après page du catalogue (lien "next"),
+    sans doublons. Chaque page n'est chargée que quand les liens précédents
+    ont été consommés.
+    """
+    seen = set()
+    visited = set()
+    url = FILM_LIST_URL
+    while url and url not in visited and len(visited) < max_pages:
+        visited.add(url)
+        # Mesure du chargement et de la lecture de la page seuls, pas du temps passé à consommer ses liens
+        with metrics.span("listing"):
+            fields = extract(client.get_text(url), LIST_FIELDS, backend)
+        for href in fields["hrefs"]:
+            full_url = BASE_URL + href
+            if href.startswith("/film/") and full_url not in seen:
+                seen.add(full_url)
+                yield full_url
+        url = urljoin(url, fields["next"]) if fields["next"] else None
+    log(f"{len(seen)} films trouvés sur {len(visited)} page(s) de catalogue.")
+
+def get_title_and_magnet(client, detail_url, backend=None):
+    with metrics.span("goto"):
+        html = client.get_text(detail_url)
+    with metrics.span("extract"):
+        fields = extract(html, DETAIL_FIELDS, backend)
+    return fields["title"] or "", fields["magnet"] or ""
+
+def ingest(client, sink, backend=None, dedup=None):
+    """
+    Listing et fiches en pipeline : les fiches d'une page du catalogue sont
+    téléchargées en parallèle pendant que la page suivante se charge.
+    Chaque film exploitable est écrit dans `sink` (output.JsonlWriter) au fil
+    de l'eau. Appelé par main() et ingest.py.
+    Les fiches déjà ingérées (`dedup`, scraping.dedup) ne sont pas téléchargées.
+    """
+    todo = (
+        url for url in get_film_links(client, backend)
+        if url not in sink.done_urls and (dedup is None or dedup.filter([url], "torrent9"))
+    )
+    results = client.map(lambda url: get_title_and_magnet(client, url, backend), todo)
+    for i, (url, result, error) in enumerate(results):
+        log(f"[{i+1}] {url}")
+        if isinstance(error, backoff.HostUnavailable):
+            log(f"  -> Sautée : {error}")
+            metrics.incr("skipped")
+            continue
+        if error:
+            log(f"  -> Erreur: {error}")
+            metrics.incr("failure")
+            continue
+        title, video_url = result
+        if title and video_url:
+            log(f"  -> OK: {title}")
+            with metrics.span("write"):
+                sink.write({"title": title, "video_url": video_url, "_url": url})
+            metrics.incr("success")
+        else:
+            log("  -> Pas de magnet ou de titre trouvé.")
+            metrics.incr("failure")
 
 def main():
-    links = get_film_links()
-    log(f"{len(links)} films trouvés.")
-    results = []
-    for i, url in enumerate(links):
-        log(f"[{i+1}/{len(links)}] {url}")
-        try:
-            title, video_url = get_title_and_magnet(url)
-            if title and video_url:
-                log(f"  -> OK: {title}")
-                results.append({"title": title, "video_url": video_url})
-            else:
-                log("  -> Pas de magnet ou de titre trouvé.")
-        except Exception as e:
-            log(f"  -> Erreur: {e}")
-    with open("import_films.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    log("import_films.json généré.")
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    output.add_output_arguments(parser)
+    add_cache_arguments(parser)
+    add_dedup_arguments(parser)
+    backoff.add_backoff_arguments(parser)
+    add_parser_arguments(parser)
+    metrics.add_metrics_arguments(parser)
+    profiling.add_profile_arguments(parser)
+    args = add_http_arguments(parser).parse_args()
+    metrics.configure("torrent9", args.metrics, args.prom)
+    profiler = profiling.open_profiler(args, "torrent9", {"torrent9": __name__})
+    if profiler:
+        profiler.start()
+    cache = open_cache(args)
+    dedup = open_dedup(args)
+    scheduler = backoff.open_scheduler(args)
+    with open_client(args, cache, scheduler) as client, output.open_writer(args) as writer:
+        ingest(client, writer, args.parser, dedup)
+    if cache:
+        log(cache.stats())
+        cache.close()
+    if scheduler:
+        log(scheduler.stats())
+    with metrics.span("finalize"):
+        output.finalize(args, dedup, "torrent9")
+    if profiler:
+        profiler.stop()
+    metrics.finish()
+    if dedup:
+        dedup.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
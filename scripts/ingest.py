@@ -0,0 +1,179 @@
+"""
+Point d'entrée unique : lance plusieurs sources en même temps dans un seul processus.
+
+- Un seul navigateur Chromium partagé par les sources Playwright (chacune a
+  son pool de pages et ses réglages : délais, user-agents, ressources bloquées)
+- Un seul client HTTP (pool de connexions + cache disque) pour les sources
+  requests et les voies HTTP directes
+- Une seule sortie fusionnée (JSONL puis import_films.json), chaque film
+  portant le champ "source"
+- Avec --frontier, les sources navigateur se répartissent entre plusieurs
+  processus ingest.py (scraping.frontier) : chacun écrit sa propre --output
+
+Les dépendances lourdes ne sont chargées que pour les sources choisies :
+Playwright n'est importé que si une source navigateur est sélectionnée.
+
+Usage :
+    cd scripts
+    python ingest.py --list
+    python ingest.py torrent9 moviebox_nuxt
+    python ingest.py                      # toutes les sources
+
+Plusieurs workers sur une frontière partagée (un --output par worker) :
+    python ingest.py mirror66 --frontier --frontier-reset --output w1.json
+    python ingest.py mirror66 --frontier --output w2.json
+    python ingest.py mirror66 --frontier "$DATABASE_URL" --output w3.json   # autre machine
+"""
+
+import argparse
+import asyncio
+import time
+
+from scraping import backoff, memory, metrics, output, profiling, sources
+from scraping.cache import add_cache_arguments, open_cache
+from scraping.dedup import add_dedup_arguments, open_dedup
+from scraping.frontier import add_frontier_arguments, check_frontier_arguments, open_frontier
+from scraping.http_client import add_http_arguments, open_client
+from scraping.parsing import add_parser_arguments
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_QUEUE_SIZE = 32
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+async def run_source(name, module, browser, args, client, sink, cache, dedup, scheduler=None,
+                     watchdog=None, frontier=None):
+    """Une source, dans sa propre tâche (les mesures sont étiquetées à son nom)."""
+    metrics.set_source(name)
+    tagged = output.TaggedSink(sink, name)
+    start = time.monotonic()
+    log(f"=== {name} : démarrage")
+    if sources.SOURCES[name].kind == "http":
+        await asyncio.to_thread(module.ingest, client, tagged, args.parser, dedup)
+    else:
+        from scraping import engine
+        await engine.run_source(browser, module.SOURCE, args.concurrency, args.per_host,
+                                args.block, tagged, cache, client if args.http else None, dedup,
+                                args.queue_size, scheduler, args.recycle_after, watchdog, frontier)
+    log(f"=== {name} : {tagged.count} films en {time.monotonic() - start:.0f}s")
+
+
+async def run_all(modules, browser, args, client, sink, cache, dedup, scheduler=None,
+                  watchdog=None, frontier=None):
+    names = list(modules)
+    results = await asyncio.gather(
+        *(run_source(name, modules[name], browser, args, client, sink, cache, dedup, scheduler,
+                     watchdog, frontier)
+          for name in names),
+        return_exceptions=True,
+    )
+    # Une source en échec n'arrête pas les autres
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            log(f"Source {name} en échec : {result}")
+
+
+async def run(names, args, client, sink, cache, dedup=None, scheduler=None, frontier=None):
+    modules = {name: sources.load(name) for name in names}
+    if not any(sources.SOURCES[name].kind == "browser" for name in names):
+        await run_all(modules, None, args, client, sink, cache, dedup, scheduler)
+        return
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=args.headless)
+        # Un seul relevé pour tout le processus : le seuil porte sur le navigateur partagé
+        watchdog = memory.open_watchdog(args).start()
+        try:
+            await run_all(modules, browser, args, client, sink, cache, dedup, scheduler, watchdog,
+                          frontier)
+        finally:
+            await watchdog.stop()
+            await browser.close()
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*",
+                        help=f"Sources à lancer parmi {', '.join(sources.SOURCES)} (défaut : toutes).")
+    parser.add_argument("--list", action="store_true", help="Affiche les sources disponibles.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Pages navigateur par source Playwright (défaut : {DEFAULT_CONCURRENCY}).")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Liens d'avance maximum du listing sur les fiches (défaut : {DEFAULT_QUEUE_SIZE}).")
+    parser.add_argument("--headful", dest="headless", action="store_false",
+                        help="Affiche le navigateur (debug).")
+    parser.add_argument("--no-block", dest="block", action="store_false",
+                        help="Ne bloque pas les images/polices/médias/CSS (debug).")
+    parser.add_argument("--no-http", dest="http", action="store_false",
+                        help="Désactive les voies HTTP directes des sources navigateur.")
+    output.add_output_arguments(parser)
+    add_cache_arguments(parser)
+    add_dedup_arguments(parser)
+    backoff.add_backoff_arguments(parser)
+    memory.add_memory_arguments(parser)
+    add_frontier_arguments(parser)
+    add_parser_arguments(parser)
+    add_http_arguments(parser)
+    metrics.add_metrics_arguments(parser)
+    profiling.add_profile_arguments(parser)
+    return parser
+
+
+def main():
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    if args.list:
+        print(sources.describe())
+        return
+    unknown = [name for name in args.sources if name not in sources.SOURCES]
+    if unknown:
+        parser.error(f"source inconnue : {', '.join(unknown)}")
+    check_frontier_arguments(parser, args)
+    # Ordre de la ligne de commande, sans doublons
+    names = list(dict.fromkeys(args.sources)) or list(sources.SOURCES)
+
+    metrics.configure("ingest", args.metrics, args.prom)
+    # Piles découpées par source d'après le module de l'adaptateur
+    profiler = profiling.open_profiler(args, "ingest",
+                                       {name: sources.SOURCES[name].module for name in names})
+    cache = open_cache(args)
+    dedup = open_dedup(args)
+    # Partagé par toutes les sources : un hôte suspendu l'est pour tout le run
+    scheduler = backoff.open_scheduler(args)
+    frontier = open_frontier(args)
+    if frontier is not None:
+        http_names = [name for name in names if sources.SOURCES[name].kind == "http"]
+        if http_names:
+            log(f"Frontière : {', '.join(http_names)} (sources HTTP) ne sont pas réparties entre workers.")
+        if args.frontier_reset:
+            for name in names:
+                log(f"Frontière {name} vidée ({frontier.reset(name)} tâches).")
+    if profiler:
+        profiler.start()
+    try:
+        with open_client(args, cache, scheduler) as client, output.open_writer(args) as writer:
+            asyncio.run(run(names, args, client, writer, cache, dedup, scheduler, frontier))
+        # Dans le run mesuré : compaction, index dedup et export Parquet comptent dans ses durées
+        with metrics.span("finalize"):
+            output.finalize(args, dedup)
+    finally:
+        if frontier:
+            frontier.close()
+        if cache:
+            log(cache.stats())
+            cache.close()
+        if scheduler:
+            log(scheduler.stats())
+        if profiler:
+            profiler.stop()
+        metrics.finish()
+    if dedup:
+        dedup.close()
+
+
+if __name__ == "__main__":
+    main()
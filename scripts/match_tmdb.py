@@ -0,0 +1,124 @@
+"""
+Associe les films scrapés à TMDB avant l'import (tmdb_id, affiche, résumé, année...).
+
+- Lit le JSONL de travail (import_films.jsonl) ; une seule recherche TMDB par
+  titre normalisé + année, en parallèle et au rythme de --rate requêtes/s
+- Cache local (scripts/.cache/tmdb.sqlite) : un titre déjà cherché ne coûte
+  plus aucune requête, d'un run à l'autre
+- Ajoute aux films les champs de la table films (tmdb_id, poster, backdrop,
+  description, year, release_date, vote_average...) sans écraser ceux déjà
+  remplis, puis régénère import_films.json, prêt pour load_films.py
+- "_tmdb" garde le titre TMDB retenu et son score (retiré à la compaction)
+
+Clé API : --api-key, ou $TMDB_API_KEY / $NEXT_PUBLIC_TMDB_API_KEY (comme l'app).
+Clé v3, ou jeton de lecture v4 (envoyé en en-tête Authorization, jamais dans
+l'URL) ; la clé v3 est masquée dans les erreurs journalisées.
+
+Usage :
+    cd scripts
+    export TMDB_API_KEY=...
+    python match_tmdb.py
+    python match_tmdb.py --rate 20 --per-host 8 --min-score 0.9
+
+Serveur de test local (aucune requête vers TMDB) :
+    python match_tmdb.py --base-url http://127.0.0.1:8000/3 --api-key test
+"""
+
+import argparse
+import os
+import time
+
+from scraping import liveness, tmdb
+from scraping.backoff import HostScheduler
+from scraping.http_client import add_http_arguments, open_client
+from scraping.output import DEFAULT_JSON_PATH, compact, iter_jsonl, jsonl_path_for, rewrite_jsonl
+
+DEFAULT_RATE = 30  # requêtes/s, sous la limite de l'API TMDB
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def enrich(matches):
+    """Fonction pour rewrite_jsonl : ajoute la correspondance TMDB du titre de chaque film."""
+    def update(record):
+        key = tmdb.search_key(record.get("title"))
+        match = matches.get(key[1:]) if key else None
+        if not match:
+            return
+        for field, value in match.items():
+            if field in ("tmdb_id", "_tmdb") or record.get(field) in (None, ""):
+                record[field] = value
+    return update
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=DEFAULT_JSON_PATH,
+                        help=f"Fichier JSON final (défaut : {DEFAULT_JSON_PATH}) ; "
+                             "le JSONL lu est à côté (.jsonl).")
+    parser.add_argument("--api-key",
+                        default=os.environ.get("TMDB_API_KEY") or os.environ.get("NEXT_PUBLIC_TMDB_API_KEY"),
+                        help="Clé API TMDB v3 ou jeton de lecture v4 "
+                             "(défaut : $TMDB_API_KEY ou $NEXT_PUBLIC_TMDB_API_KEY).")
+    parser.add_argument("--base-url", default=tmdb.TMDB_BASE_URL,
+                        help=f"URL de l'API (défaut : {tmdb.TMDB_BASE_URL}) ; un serveur local pour les tests.")
+    parser.add_argument("--language", default=tmdb.DEFAULT_LANGUAGE,
+                        help=f"Langue des titres et résumés (défaut : {tmdb.DEFAULT_LANGUAGE}).")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Requêtes par seconde maximum (défaut : {DEFAULT_RATE}).")
+    parser.add_argument("--min-score", type=float, default=tmdb.DEFAULT_MIN_SCORE,
+                        help=f"Proximité minimale des titres, de 0 à 1 (défaut : {tmdb.DEFAULT_MIN_SCORE}).")
+    parser.add_argument("--tmdb-path", default=tmdb.DEFAULT_TMDB_PATH,
+                        help="Fichier SQLite du cache des correspondances.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore le cache et relance toutes les recherches.")
+    parser.add_argument("--keep-dead", action="store_true",
+                        help="Garde dans le JSON final les liens marqués morts par check_links.py.")
+    args = add_http_arguments(parser).parse_args()
+    if not args.api_key:
+        parser.error("clé API TMDB manquante : --api-key ou TMDB_API_KEY")
+
+    jsonl = jsonl_path_for(args.output)
+    if not os.path.exists(jsonl):
+        parser.error(f"{jsonl} introuvable : lance d'abord un scraper")
+    keys = [key for key in (tmdb.search_key(r.get("title")) for r in iter_jsonl(jsonl)) if key]
+    unique = {key[1:] for key in keys}
+    log(f"{len(keys)} films, {len(unique)} titres distincts à associer.")
+
+    cache = tmdb.TmdbCache(args.tmdb_path)
+    # Un seul hôte (l'API) : l'intervalle minimal entre deux requêtes fixe le débit
+    scheduler = HostScheduler(min_interval=1 / args.rate if args.rate > 0 else 0)
+    matches = {}
+    found = missing = cached = errors = 0
+    start = time.monotonic()
+    try:
+        with open_client(args, scheduler=scheduler) as client:
+            results = tmdb.match_keys(client, keys, cache, refresh=args.refresh,
+                                      api_key=args.api_key, base_url=args.base_url,
+                                      language=args.language, min_score=args.min_score)
+            for key, match, from_cache, error in results:
+                cached += from_cache
+                if error is not None:
+                    errors += 1
+                    log(f"  ! {key[0]} : {tmdb.redact(error, args.api_key)}")
+                elif match:
+                    found += 1
+                    matches[key[1:]] = match
+                else:
+                    missing += 1
+                    log(f"  ? {key[0]}" + (f" ({key[2]})" if key[2] else "") + " : aucun résultat TMDB proche")
+    finally:
+        cache.close()
+
+    log(f"{found} titres associés, {missing} sans correspondance, {errors} en erreur "
+        f"({cached} depuis le cache, {len(unique) - cached} requêtes en {time.monotonic() - start:.1f}s).")
+    rewrite_jsonl(jsonl, enrich(matches))
+    count = compact(jsonl, args.output, keep=None if args.keep_dead else lambda r: not liveness.is_dead(r))
+    log(f"Fichier {args.output} régénéré : {count} films.")
+
+
+if __name__ == "__main__":
+    main()
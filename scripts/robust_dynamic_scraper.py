@@ -3,16 +3,37 @@
 """
 Script de scraping "1000% robuste" pour extraire dynamiquement les liens vidéo depuis une page.
 Usage : python robust_dynamic_scraper.py --url "https://exemple.com/film-page" [--proxy "ip:port"] [--user-agent "Your User Agent"]
+
+Mode batch : une URL par ligne dans un fichier (ou "-" pour stdin), réparties
+sur --processes processus ; chaque processus garde son Chrome ouvert d'une page
+à l'autre et le relance toutes les --recycle-after pages. Les résultats sont
+écrits au fil de l'eau en JSONL ({"_url", "links", "attempts", "seconds", "error"}),
+--resume saute les URLs déjà présentes. Chaque processus ralentit, puis
+suspend, un hôte qui enchaîne les échecs (scraping.backoff).
+    python robust_dynamic_scraper.py --urls urls.txt --processes 4 --jsonl video_links.jsonl
+    cat urls.txt | python robust_dynamic_scraper.py --urls -
 """
+import os
+import sys
 import time
 import random
 import argparse
+import multiprocessing
+import multiprocessing.util
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from scraping import backoff, profiling
+from scraping.output import JsonlWriter
+
+DEFAULT_PROCESSES = 2
+DEFAULT_RECYCLE_AFTER = 50  # pages servies par un même Chrome avant relance
+DEFAULT_BATCH_OUTPUT = "video_links.jsonl"
 
 # Liste de user-agents pour la rotation
 USER_AGENTS = [
@@ -82,92 +103,247 @@ def initialize_driver(proxy=None, user_agent=None):
 # 10. Ajoutez un mode "headful" pour le debug (options.headless=False)
 
 # EXEMPLE D'OPTIMISATION POUR UQLOAD/DOODSTREAM :
-def extract_video_links(url, max_retries=3, wait_time=10):
+def collect_links(driver, url, wait_time=10):
+    """
+    Charge `url` dans un driver déjà lancé et renvoie les liens vidéo trouvés.
+    1. Attend la présence d'au moins un <iframe> ou <video>.
+    2. Récupère les attributs 'src' de tous les iframes et balises video.
+    """
+    driver.get(url)
+
+    # Attendre la présence d'un <iframe> OU d'une balise <video> (maximum wait_time secondes)
+    wait = WebDriverWait(driver, wait_time)
+    wait.until(
+        EC.any_of(
+            EC.presence_of_element_located((By.TAG_NAME, "iframe")),
+            EC.presence_of_element_located((By.TAG_NAME, "video"))
+        )
+    )
+
+    video_links = set()
+
+    # Rechercher tous les <iframe>
+    iframes = driver.find_elements(By.TAG_NAME, "iframe")
+    for iframe in iframes:
+        src = iframe.get_attribute("src")
+        if src:
+            # Ajoutez ici d'autres hébergeurs si besoin
+            if any(host in src for host in [
+                "uqload.io", "dood.", "doodstream", "streamtape.com", "vidmoly.to", "mycloud.to", "upstream.to", "voe.sx", "filelions.to"
+            ]):
+                video_links.add(src)
+            else:
+                video_links.add(src)
+
+    # Rechercher toutes les balises <video>
+    videos = driver.find_elements(By.TAG_NAME, "video")
+    for video in videos:
+        src = video.get_attribute("src")
+        if src:
+            video_links.add(src)
+        sources = video.find_elements(By.TAG_NAME, "source")
+        for source in sources:
+            src2 = source.get_attribute("src")
+            if src2:
+                video_links.add(src2)
+
+    return list(video_links)
+
+def extract_video_links(url, max_retries=3, wait_time=10, proxy=None, user_agent=None):
     """
     Extrait dynamiquement les liens vidéo (.mp4, .m3u8, etc.) depuis l'URL donnée.
-    1. Lance Selenium en headless.
-    2. Attend la présence d'au moins un <iframe> ou <video>.
-    3. Récupère les attributs 'src' de tous les iframes et balises video.
-    4. Retourne une liste de liens.
+    Lance un Chrome headless par tentative (user-agent / proxy aléatoires si non
+    fournis) et retourne une liste de liens. Pour plusieurs URLs, voir run_batch().
     """
     for attempt in range(1, max_retries + 1):
+        driver = None
         try:
-            user_agent = get_random_user_agent()
-            proxy = get_random_proxy()
-            print(f"[Tentative {attempt}] Utilisation du user-agent : {user_agent}")
-            if proxy:
-                print(f"[Tentative {attempt}] Utilisation du proxy : {proxy}")
-            driver = initialize_driver(proxy=proxy, user_agent=user_agent)
-            driver.get(url)
-
-            # Attendre la présence d'un <iframe> OU d'une balise <video> (maximum wait_time secondes)
-            wait = WebDriverWait(driver, wait_time)
-            wait.until(
-                EC.presence_of_any_elements_located([
-                    (By.TAG_NAME, "iframe"),
-                    (By.TAG_NAME, "video")
-                ])
-            )
-
-            video_links = set()
-
-            # Rechercher tous les <iframe>
-            iframes = driver.find_elements(By.TAG_NAME, "iframe")
-            for iframe in iframes:
-                src = iframe.get_attribute("src")
-                if src:
-                    # Ajoutez ici d'autres hébergeurs si besoin
-                    if any(host in src for host in [
-                        "uqload.io", "dood.", "doodstream", "streamtape.com", "vidmoly.to", "mycloud.to", "upstream.to", "voe.sx", "filelions.to"
-                    ]):
-                        video_links.add(src)
-                    else:
-                        video_links.add(src)
-
-            # Rechercher toutes les balises <video>
-            videos = driver.find_elements(By.TAG_NAME, "video")
-            for video in videos:
-                src = video.get_attribute("src")
-                if src:
-                    video_links.add(src)
-                sources = video.find_elements(By.TAG_NAME, "source")
-                for source in sources:
-                    src2 = source.get_attribute("src")
-                    if src2:
-                        video_links.add(src2)
-
+            attempt_user_agent = user_agent or get_random_user_agent()
+            attempt_proxy = proxy or get_random_proxy()
+            print(f"[Tentative {attempt}] Utilisation du user-agent : {attempt_user_agent}")
+            if attempt_proxy:
+                print(f"[Tentative {attempt}] Utilisation du proxy : {attempt_proxy}")
+            driver = initialize_driver(proxy=attempt_proxy, user_agent=attempt_user_agent)
+            video_links = collect_links(driver, url, wait_time)
             driver.quit()
-            return list(video_links)
+            return video_links
 
         except Exception as e:
             print(f"[Erreur tentative {attempt}] {e}")
             try:
-                driver.quit()
-            except:
+                if driver:
+                    driver.quit()
+            except Exception:
                 pass
             if attempt < max_retries:
-                sleep_time = random.uniform(2, 5)
+                sleep_time = backoff.retry_delay(attempt - 1)
                 print(f"Nouvelle tentative après {sleep_time:.2f} secondes...")
                 time.sleep(sleep_time)
             else:
                 print("Nombre maximum de tentatives atteint. Abandon.")
                 return []
 
+# MODE BATCH : UN CHROME PERSISTANT PAR PROCESSUS
+
+# État propre à chaque processus du pool (driver courant, pages servies, réglages)
+_worker = {}
+
+def _init_batch_worker(proxy, user_agent, recycle_after, max_retries, wait_time,
+                       profile_dir=None, profiler="sample", profile_interval=profiling.DEFAULT_INTERVAL):
+    _worker.update(driver=None, pages=0, proxy=proxy, user_agent=user_agent,
+                   recycle_after=max(1, recycle_after), max_retries=max_retries,
+                   wait_time=wait_time, scheduler=backoff.HostScheduler())
+    # Chrome fermé à la sortie normale du processus (pool.close() puis join())
+    multiprocessing.util.Finalize(None, _quit_worker_driver, exitpriority=10)
+    if profile_dir:
+        # Un profil par processus, dans le dossier du run
+        worker_profiler = profiling.Profiler(os.path.join(profile_dir, f"worker-{os.getpid()}"),
+                                             {"robust": __name__}, profiler, profile_interval).start()
+        multiprocessing.util.Finalize(None, worker_profiler.stop, exitpriority=5)
+
+def _quit_worker_driver():
+    driver, _worker["driver"] = _worker.get("driver"), None
+    if driver:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+def _worker_driver():
+    """Driver du processus, relancé toutes les `recycle_after` pages (mémoire de Chrome)."""
+    if _worker["driver"] is not None and _worker["pages"] >= _worker["recycle_after"]:
+        _quit_worker_driver()
+    if _worker["driver"] is None:
+        _worker["driver"] = initialize_driver(proxy=_worker["proxy"] or get_random_proxy(),
+                                              user_agent=_worker["user_agent"] or get_random_user_agent())
+        _worker["pages"] = 0
+    _worker["pages"] += 1
+    return _worker["driver"]
+
+def scrape_batch_url(url):
+    """Traite une URL dans un processus du pool. Renvoie l'enregistrement JSONL."""
+    start = time.monotonic()
+    scheduler = _worker["scheduler"]
+    error = None
+    attempt = 0
+    while attempt < _worker["max_retries"]:
+        attempt += 1
+        try:
+            time.sleep(scheduler.reserve(url))
+        except backoff.HostUnavailable as e:
+            error = f"HostUnavailable: {e}"
+            break
+        try:
+            links = collect_links(_worker_driver(), url, _worker["wait_time"])
+            scheduler.record(url, backoff.OK)
+            return {"_url": url, "links": links, "attempts": attempt,
+                    "seconds": round(time.monotonic() - start, 2), "error": None}
+        except TimeoutException as e:
+            # Page lente ou sans lecteur : le driver reste utilisable. Seul le
+            # chargement trop long (message du driver) compte contre l'hôte
+            error = f"TimeoutException: {e.msg or 'aucun iframe/video'}"
+            scheduler.record(url, backoff.TIMEOUT if e.msg else backoff.OK)
+        except Exception as e:
+            # Driver dans un état inconnu : Chrome neuf (autre user-agent / proxy)
+            error = f"{type(e).__name__}: {e}"
+            scheduler.record(url, backoff.classify(e))
+            _quit_worker_driver()
+        if attempt < _worker["max_retries"]:
+            time.sleep(backoff.retry_delay(attempt - 1))
+    return {"_url": url, "links": [], "attempts": attempt,
+            "seconds": round(time.monotonic() - start, 2), "error": error}
+
+def read_urls(path):
+    """URLs d'un fichier (ou de stdin pour "-"), une par ligne ; lignes vides et # ignorées."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        lines = [line.strip() for line in f]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return list(dict.fromkeys(line for line in lines if line and not line.startswith("#")))
+
+def run_batch(urls, jsonl_path=DEFAULT_BATCH_OUTPUT, processes=DEFAULT_PROCESSES,
+              recycle_after=DEFAULT_RECYCLE_AFTER, resume=False, proxy=None, user_agent=None,
+              max_retries=3, wait_time=10, profile_dir=None, profiler="sample",
+              profile_interval=profiling.DEFAULT_INTERVAL):
+    """
+    Répartit `urls` sur `processes` processus ayant chacun un Chrome persistant.
+    Chaque résultat est écrit dans `jsonl_path` dès qu'il arrive. Renvoie (avec liens, sans).
+    Avec `profile_dir`, chaque processus écrit son profil dans profile_dir/worker-<pid>.
+    """
+    with JsonlWriter(jsonl_path, resume=resume) as writer:
+        todo = [url for url in urls if url not in writer.done_urls]
+        if len(todo) < len(urls):
+            print(f"Reprise : {len(urls) - len(todo)} URLs déjà traitées dans {jsonl_path}")
+        found = empty = 0
+        start = time.monotonic()
+        pool = multiprocessing.Pool(
+            max(1, min(processes, len(todo) or 1)), initializer=_init_batch_worker,
+            initargs=(proxy, user_agent, recycle_after, max_retries, wait_time, profile_dir,
+                      profiler, profile_interval))
+        try:
+            for n, result in enumerate(pool.imap_unordered(scrape_batch_url, todo), 1):
+                writer.write(result)
+                if result["links"]:
+                    found += 1
+                else:
+                    empty += 1
+                status = f"{len(result['links'])} liens" if result["links"] else (result["error"] or "aucun lien")
+                print(f"[{n}/{len(todo)}] {result['_url']} : {status} ({result['seconds']:.1f}s)")
+        except BaseException:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
+    elapsed = time.monotonic() - start
+    print(f"{found + empty} pages en {elapsed:.0f}s : {found} avec liens, {empty} sans. Résultats : {jsonl_path}")
+    return found, empty
+
 def main():
     parser = argparse.ArgumentParser(
         description="Scraping dynamique pour extraire des liens vidéo depuis une page."
     )
-    parser.add_argument("--url", required=True, help="URL de la page à scraper.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="URL de la page à scraper.")
+    target.add_argument("--urls", help='Fichier d\'URLs, une par ligne ("-" pour stdin) : mode batch.')
     parser.add_argument("--proxy", help="Proxy à utiliser (format ip:port).")
     parser.add_argument("--user-agent", help="User-Agent à utiliser.")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES,
+                        help=f"Mode batch : processus, un Chrome chacun (défaut : {DEFAULT_PROCESSES}).")
+    parser.add_argument("--recycle-after", type=int, default=DEFAULT_RECYCLE_AFTER,
+                        help=f"Mode batch : pages avant relance de Chrome (défaut : {DEFAULT_RECYCLE_AFTER}).")
+    parser.add_argument("--jsonl", default=DEFAULT_BATCH_OUTPUT,
+                        help=f"Mode batch : fichier de résultats (défaut : {DEFAULT_BATCH_OUTPUT}).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Mode batch : saute les URLs déjà présentes dans le JSONL.")
+    profiling.add_profile_arguments(parser)
 
     args = parser.parse_args()
-    url = args.url
-    proxy = args.proxy
-    user_agent = args.user_agent
+    profiler = profiling.open_profiler(args, "robust", {"robust": __name__})
+    if profiler:
+        profiler.start()
+    try:
+        run(args, profiler)
+    finally:
+        if profiler:
+            profiler.stop()
 
+def run(args, profiler=None):
+    if args.urls:
+        urls = read_urls(args.urls)
+        print(f"Mode batch : {len(urls)} URLs, {args.processes} processus")
+        run_batch(urls, args.jsonl, args.processes, args.recycle_after, args.resume,
+                  args.proxy, args.user_agent,
+                  profile_dir=profiler.directory if profiler else None,
+                  profiler=args.profiler, profile_interval=args.profile_interval)
+        return
+
+    url = args.url
     print(f"Début du scraping pour l'URL : {url}")
-    links = extract_video_links(url)
+    links = extract_video_links(url, proxy=args.proxy, user_agent=args.user_agent)
     if links:
         print("Liens vidéo trouvés :")
         for link in links:
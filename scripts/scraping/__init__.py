@@ -0,0 +1,6 @@
+"""
+Briques partagées par les scripts d'ingestion (scripts/fetch_*.py).
+
+Chaque module est importé à la demande par les scripts : rien n'est importé ici
+pour que Playwright, Selenium ou bs4 ne soient chargés que si nécessaire.
+"""
@@ -0,0 +1,250 @@
+"""
+Ordonnancement par hôte : backoff exponentiel, ralentissement adaptatif et disjoncteur.
+
+Chaque réponse ou erreur est classée (classify) :
+- "ok"        : 2xx / 3xx, ou pas de statut connu
+- "not_found" : 404 / 410 ; la fiche n'existe pas mais l'hôte répond
+- "client"    : autre 4xx ; la requête est refusée telle quelle
+- "blocked"   : 401 / 403 / 429 ; anti-bot ou quota
+- "server"    : 5xx
+- "timeout"   : délai dépassé (requests, Playwright, Selenium)
+- "network"   : connexion impossible, DNS, connexion coupée
+Les quatre dernières sont des échecs de l'hôte (HOST_FAILURES) : elles valent
+une nouvelle tentative après retry_delay(), et comptent pour l'hôte.
+
+HostScheduler garde, pour chaque hôte :
+- un intervalle minimal entre deux requêtes, doublé à chaque échec (plafonné
+  à max_interval) et divisé par deux à chaque succès : un hôte qui commence à
+  refuser est ralenti sans freiner les autres
+- un disjoncteur : après `max_failures` échecs consécutifs, les requêtes vers
+  l'hôte sont refusées tout de suite (HostUnavailable) pendant `cooldown`
+  secondes, puis une seule requête d'essai passe ; si elle échoue, il se
+  rouvre pour une durée doublée. Une requête d'essai sans résultat (annulée,
+  interrompue : release(), ou jamais rapportée) ne bloque pas l'hôte : passé
+  `probe_timeout` secondes, une autre peut partir
+- après `max_trips` ouvertures sans succès entre-temps, l'hôte est abandonné
+  pour le reste du run
+
+Les méthodes ne bloquent jamais : reserve() renvoie l'attente à respecter,
+à faire avec time.sleep (threads de HttpClient) ou asyncio.sleep (engine).
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_MAX_FAILURES = 5
+DEFAULT_COOLDOWN = 60.0  # secondes
+DEFAULT_MAX_TRIPS = 3
+DEFAULT_MAX_INTERVAL = 30.0  # secondes entre deux requêtes vers un hôte ralenti
+DEFAULT_PROBE_TIMEOUT = 120.0  # secondes avant d'abandonner une requête d'essai sans résultat
+# Premier palier de ralentissement d'un hôte qui n'en avait pas
+_FIRST_INTERVAL = 0.5
+
+OK, NOT_FOUND, CLIENT, BLOCKED, SERVER, TIMEOUT, NETWORK = (
+    "ok", "not_found", "client", "blocked", "server", "timeout", "network")
+HOST_FAILURES = frozenset((BLOCKED, SERVER, TIMEOUT, NETWORK))
+
+_NETWORK_MARKERS = ("net::ERR_", "ConnectionError", "Connection refused", "Connection reset",
+                    "Failed to resolve", "Name or service not known", "RemoteDisconnected")
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+class HostUnavailable(Exception):
+    """
+    Hôte coupé par le disjoncteur : la requête n'est pas envoyée.
+    `retry_in` : secondes avant que l'hôte accepte de nouveau une requête
+    (None s'il est abandonné pour le run).
+    """
+
+    def __init__(self, message, retry_in=None):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+def classify(error=None, status=None):
+    """Catégorie d'un résultat : `error` (exception) prime sur `status` (code HTTP)."""
+    if error is not None:
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) is not None:
+            return classify(status=response.status_code)
+        # Par le nom : pas besoin d'importer requests, Playwright ou Selenium ici
+        if any("Timeout" in cls.__name__ for cls in type(error).__mro__):
+            return TIMEOUT
+        text = f"{type(error).__name__}: {error}"
+        if any(marker in text for marker in _NETWORK_MARKERS):
+            return NETWORK
+        return SERVER if isinstance(error, OSError) else CLIENT
+    if status is None or status < 400:
+        return OK
+    if status in (404, 410):
+        return NOT_FOUND
+    if status in (401, 403, 429):
+        return BLOCKED
+    return SERVER if status >= 500 else CLIENT
+
+
+def is_retryable(kind):
+    return kind in HOST_FAILURES
+
+
+def retry_delay(attempt, base=2.0, cap=60.0):
+    """
+    Attente avant la tentative `attempt` + 1 (attempt à partir de 0) : backoff
+    exponentiel plafonné à `cap`, avec une moitié aléatoire pour que les
+    workers ne repartent pas tous en même temps.
+    """
+    ceiling = min(cap, base * 2 ** attempt)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _retry_after(response):
+    """Valeur numérique de l'en-tête Retry-After (secondes), sinon None."""
+    value = (getattr(response, "headers", None) or {}).get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+def host_of(url):
+    return urlparse(url).netloc
+
+
+class _HostState:
+    def __init__(self, min_interval):
+        self.interval = min_interval
+        self.next_at = 0.0       # prochaine requête autorisée (time.monotonic)
+        self.failures = 0        # échecs consécutifs
+        self.trips = 0           # ouvertures du disjoncteur depuis le dernier succès
+        self.open_until = None   # disjoncteur ouvert jusqu'à cette date
+        self.probe_until = None  # requête d'essai en cours jusqu'à cette date (disjoncteur entrouvert)
+        self.dead = False        # abandonné pour le run
+
+
+class HostScheduler:
+    """Rythme et disjoncteur par hôte. Sûr entre threads (un verrou)."""
+
+    def __init__(self, max_failures=DEFAULT_MAX_FAILURES, cooldown=DEFAULT_COOLDOWN,
+                 max_trips=DEFAULT_MAX_TRIPS, min_interval=0.0, max_interval=DEFAULT_MAX_INTERVAL,
+                 probe_timeout=DEFAULT_PROBE_TIMEOUT):
+        self.max_failures = max(1, max_failures)
+        self.cooldown = cooldown
+        self.max_trips = max(1, max_trips)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.probe_timeout = probe_timeout
+        self.refused = 0
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.min_interval)
+        return self._hosts[host]
+
+    def reserve(self, url):
+        """
+        Réserve un créneau pour une requête vers l'hôte de `url` et renvoie le
+        nombre de secondes à attendre avant de l'envoyer.
+        Lève HostUnavailable si le disjoncteur de l'hôte est ouvert.
+        Chaque créneau réservé doit finir par record(), ou release() si la
+        requête n'a pas de résultat (annulée, interrompue).
+        """
+        host = host_of(url)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            if state.dead:
+                self.refused += 1
+                raise HostUnavailable(f"{host} abandonné pour ce run")
+            if state.open_until is not None:
+                probing = state.probe_until is not None and now < state.probe_until
+                if now < state.open_until or probing:
+                    self.refused += 1
+                    reopen_at = max(state.open_until, state.probe_until if probing else 0.0)
+                    raise HostUnavailable(f"{host} coupé ({state.failures or self.max_failures} échecs)",
+                                          retry_in=reopen_at - now)
+            start = max(now, state.next_at)
+            state.next_at = start + state.interval
+            if state.open_until is not None:
+                state.probe_until = start + self.probe_timeout
+            return start - now
+
+    def record(self, url, kind, retry_after=None):
+        """Résultat d'une requête vers l'hôte de `url` (catégorie de classify())."""
+        host = host_of(url)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            if kind not in HOST_FAILURES:
+                state.failures = 0
+                state.trips = 0
+                state.open_until = None
+                state.probe_until = None
+                state.interval = max(self.min_interval, state.interval / 2)
+                if state.interval < _FIRST_INTERVAL:
+                    state.interval = self.min_interval
+                return
+            state.failures += 1
+            state.interval = min(self.max_interval, max(state.interval * 2, _FIRST_INTERVAL))
+            if retry_after:
+                state.next_at = max(state.next_at, now + retry_after)
+            # Les requêtes parties avant l'ouverture ne rouvrent pas le disjoncteur
+            if state.probe_until is not None or (state.open_until is None and state.failures >= self.max_failures):
+                self._trip(host, state, now)
+
+    def _trip(self, host, state, now):
+        state.trips += 1
+        state.probe_until = None
+        if state.trips >= self.max_trips:
+            state.dead = True
+            log(f"  !! {host} : échecs persistants, hôte abandonné pour ce run.")
+            return
+        pause = self.cooldown * 2 ** (state.trips - 1)
+        state.open_until = now + pause
+        state.failures = 0
+        log(f"  !! {host} : trop d'échecs, requêtes suspendues {pause:.0f}s.")
+
+    def release(self, url):
+        """
+        Créneau réservé sans résultat (annulation, interruption, erreur locale) :
+        ni succès ni échec, mais la requête d'essai éventuelle est rendue.
+        """
+        with self._lock:
+            self._state(host_of(url)).probe_until = None
+
+    def record_response(self, url, response):
+        """record() depuis une réponse requests (tient compte de Retry-After)."""
+        self.record(url, classify(status=response.status_code), _retry_after(response))
+
+    def stats(self):
+        slowed = sorted(h for h, s in self._hosts.items() if s.interval > self.min_interval and not s.dead)
+        dead = sorted(h for h, s in self._hosts.items() if s.dead)
+        parts = [f"Hôtes : {len(self._hosts)} contactés", f"{self.refused} requêtes refusées"]
+        if slowed:
+            parts.append(f"ralentis : {', '.join(slowed)}")
+        if dead:
+            parts.append(f"abandonnés : {', '.join(dead)}")
+        return ", ".join(parts) + "."
+
+
+def add_backoff_arguments(parser):
+    """Options du disjoncteur par hôte (--max-failures, --cooldown, --no-breaker)."""
+    parser.add_argument("--max-failures", type=int, default=DEFAULT_MAX_FAILURES,
+                        help=f"Échecs consécutifs avant de suspendre un hôte (défaut : {DEFAULT_MAX_FAILURES}).")
+    parser.add_argument("--cooldown", type=float, default=DEFAULT_COOLDOWN,
+                        help=f"Suspension d'un hôte en secondes, doublée à chaque récidive (défaut : {DEFAULT_COOLDOWN:.0f}).")
+    parser.add_argument("--max-trips", type=int, default=DEFAULT_MAX_TRIPS,
+                        help=f"Suspensions avant d'abandonner un hôte pour le run (défaut : {DEFAULT_MAX_TRIPS}).")
+    parser.add_argument("--no-breaker", dest="breaker", action="store_false",
+                        help="Désactive le ralentissement et le disjoncteur par hôte.")
+    return parser
+
+
+def open_scheduler(args):
+    """HostScheduler configuré depuis les options de add_backoff_arguments() (None si désactivé)."""
+    if not args.breaker:
+        return None
+    return HostScheduler(args.max_failures, args.cooldown, args.max_trips)
@@ -0,0 +1,233 @@
+"""
+Cache disque des pages (SQLite, contenu compressé zlib), indexé par URL.
+
+- Revalidation conditionnelle : ETag / Last-Modified renvoyés en
+  If-None-Match / If-Modified-Since ; une réponse 304 réutilise le contenu en cache
+- TTL : dans le TTL, l'entrée est servie sans aucune requête. Il est court
+  par défaut : les fiches portent des URLs de lecteurs qui expirent et le
+  listing change d'un run à l'autre ; passé le TTL, la revalidation (304)
+  évite quand même de retélécharger une page inchangée
+- Seules les réponses 2xx avec un contenu complet sont mises en cache (pas
+  les pages d'erreur 4xx/5xx, ni 204 / 206)
+- Éviction par taille : au-delà de `max_bytes`, les entrées les moins
+  récemment utilisées sont supprimées. La taille totale est tenue à jour à
+  chaque écriture et recalculée (SUM) avant d'évincer et toutes les
+  `RESYNC_EVERY` écritures (autres processus sur le même fichier)
+- Mode hors-ligne : toute entrée en cache est servie quel que soit son âge,
+  ce qui permet de rejouer les extracteurs sans réseau
+
+Utilisé par le client HTTP (scripts requests) et par les scripts Playwright
+pour le HTML rendu.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  ".cache", "pages.sqlite")
+DEFAULT_TTL = 15 * 60  # secondes
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+RESYNC_EVERY = 1000  # écritures entre deux recalculs de la taille totale
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+def is_cacheable(status):
+    """Réponse à garder : 2xx avec un contenu complet."""
+    return 200 <= status < 300 and status not in (204, 206)
+
+
+class CacheEntry:
+    __slots__ = ("url", "text", "status", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, url, text, status, etag, last_modified, fetched_at):
+        self.url = url
+        self.text = text
+        self.status = status
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def validators(self):
+        """En-têtes de revalidation conditionnelle pour cette entrée."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Cache de pages persistant. Sûr entre threads : une seule connexion,
+    protégée par un verrou.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._total = self._total_bytes()
+        self._puts = 0
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, status, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        body, status, etag, last_modified, fetched_at = row
+        return CacheEntry(url, zlib.decompress(body).decode("utf-8"), status, etag,
+                          last_modified, fetched_at)
+
+    def is_fresh(self, entry):
+        return self.offline or entry.age() < self.ttl
+
+    def put(self, url, text, status=200, etag=None, last_modified=None):
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, body, size, status, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, len(body), status, etag, last_modified, now, now),
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            self._puts += 1
+            if self._puts % RESYNC_EVERY == 0:
+                self._total = self._total_bytes()
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def touch(self, url):
+        """Réponse 304 : le contenu est inchangé, on repart pour un TTL."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                             (now, now, url))
+
+    def total_bytes(self):
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def evict(self):
+        with self._lock:
+            return self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment lues jusqu'à repasser sous max_bytes."""
+        # Total exact : d'autres processus ont pu écrire ou évincer depuis le dernier recalcul
+        self._total = self._total_bytes()
+        excess = self._total - self.max_bytes
+        if excess <= 0:
+            return 0
+        victims = []
+        for url, size in self._db.execute("SELECT url, size FROM pages ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            victims.append((url,))
+            excess -= size
+            self._total -= size
+        self._db.executemany("DELETE FROM pages WHERE url = ?", victims)
+        return len(victims)
+
+    def stats(self):
+        return f"cache : {self.hits} hits, {self.revalidated} revalidés (304), {self.misses} téléchargés"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def fetch_text(url, cache=None, get=None, **kwargs):
+    """
+    GET avec cache : `get` est une fonction compatible requests.get
+    (requests.get ou Session.get). Seules les réponses 2xx sont mises en cache
+    (is_cacheable) ; une page d'erreur est renvoyée sans être gardée.
+    """
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        cache.hits += 1
+        return entry.text
+    if cache and cache.offline:
+        raise LookupError(f"Hors-ligne : {url} absent du cache")
+    if get is None:
+        import requests
+        get = requests.get
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry:
+        headers.update(entry.validators())
+    res = get(url, headers=headers, **kwargs)
+    if res.status_code == 304 and entry:
+        cache.touch(url)
+        cache.revalidated += 1
+        return entry.text
+    if cache and is_cacheable(res.status_code):
+        cache.misses += 1
+        cache.put(url, res.text, res.status_code,
+                  res.headers.get("ETag"), res.headers.get("Last-Modified"))
+    return res.text
+
+
+def add_cache_arguments(parser):
+    """Options de cache communes (--cache, --cache-ttl, --offline...)."""
+    parser.add_argument("--cache", dest="cache", action="store_true", default=True,
+                        help="Active le cache disque des pages (défaut).")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="Désactive le cache disque des pages.")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH,
+                        help="Fichier SQLite du cache.")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL,
+                        help=f"Durée pendant laquelle une page est servie sans requête, en secondes "
+                             f"(défaut : {DEFAULT_TTL} ; au-delà, revalidation ETag / Last-Modified).")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024,
+                        help="Taille maximale du cache en Mo (éviction LRU au-delà).")
+    parser.add_argument("--offline", action="store_true",
+                        help="Sert uniquement depuis le cache, sans réseau.")
+    return parser
+
+
+def open_cache(args):
+    """PageCache configuré depuis les options de add_cache_arguments() (None si désactivé)."""
+    if not args.cache and not args.offline:
+        return None
+    return PageCache(args.cache_path, ttl=args.cache_ttl,
+                     max_bytes=int(args.cache_max_mb * 1024 * 1024), offline=args.offline)
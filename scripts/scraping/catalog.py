@@ -0,0 +1,290 @@
+"""
+Export colonnaire du catalogue (Parquet), à côté de import_films.json.
+
+- FilmRecord : un film typé et validé (titre, URL vidéo, source, lecteurs,
+  champs TMDB...) ; un enregistrement invalide (titre vide, URL non http(s) /
+  magnet, année ou date impossibles) est écarté à l'export, avec un log
+- Colonnes source, host (hôte de video_url), link_status, language et, pour
+  chaque lecteur de "all_sources", player et host : encodées en dictionnaire
+  (chaque nom d'hôte n'est stocké qu'une fois par row group)
+- Écriture en flux par lots de `batch_size` films (CatalogWriter), fichier
+  temporaire puis rename comme compact()
+- Lecture sans tout charger : scan() ne lit que les colonnes demandées et
+  pousse les filtres (source, hôte, expression pyarrow.dataset) jusqu'aux
+  row groups ; diff() compare deux exports sur la seule colonne video_url
+
+Dépendances : pip install pyarrow
+"""
+
+import datetime
+import os
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_BATCH_SIZE = 10000  # films par row group
+
+_URL_SCHEMES = ("http", "https", "magnet")
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+PLAYER_TYPE = pa.struct([
+    pa.field("player", _DICT),
+    pa.field("host", _DICT),
+    pa.field("url", pa.string()),
+])
+SCHEMA = pa.schema([
+    pa.field("title", pa.string(), nullable=False),
+    pa.field("video_url", pa.string(), nullable=False),
+    pa.field("host", _DICT),
+    pa.field("source", _DICT),
+    pa.field("page_url", pa.string()),
+    pa.field("link_status", _DICT),
+    # "element" : nom des listes Parquet, pour relire exactement ce schéma
+    pa.field("players", pa.list_(pa.field("element", PLAYER_TYPE))),
+    pa.field("tmdb_id", pa.int64()),
+    pa.field("year", pa.int16()),
+    pa.field("release_date", pa.date32()),
+    pa.field("description", pa.string()),
+    pa.field("poster", pa.string()),
+    pa.field("backdrop", pa.string()),
+    pa.field("vote_average", pa.float32()),
+    pa.field("vote_count", pa.int32()),
+    pa.field("popularity", pa.float32()),
+    pa.field("language", _DICT),
+])
+
+# Un lecteur de "all_sources" (onglet mirror66) : nom, hôte et URL de l'iframe
+Player = namedtuple("Player", ["player", "host", "url"])
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def _text(record, field, required=False):
+    value = record.get(field)
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"{field} manquant")
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} : texte attendu, pas {type(value).__name__}")
+    value = value.strip()
+    if required and not value:
+        raise ValueError(f"{field} vide")
+    return value or None
+
+
+def _url(value, field):
+    if not isinstance(value, str) or urlsplit(value).scheme.lower() not in _URL_SCHEMES:
+        raise ValueError(f"{field} : URL http(s) ou magnet attendue ({value!r})")
+    return value
+
+
+def _host(url):
+    return urlsplit(url).hostname
+
+
+def _number(record, field, kind, low=None, high=None):
+    value = record.get(field)
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{field} : nombre attendu")
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} : nombre attendu ({value!r})") from None
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ValueError(f"{field} hors bornes ({number})")
+    return number
+
+
+def _date(record, field):
+    value = record.get(field)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f"{field} : date AAAA-MM-JJ attendue ({value!r})") from None
+
+
+def _players(record):
+    sources = record.get("all_sources") or {}
+    if not isinstance(sources, dict):
+        raise ValueError("all_sources : objet {lecteur: url} attendu")
+    return tuple(Player(str(name), _host(url), _url(url, f"all_sources.{name}"))
+                 for name, url in sources.items() if url)
+
+
+class FilmRecord(namedtuple("FilmRecord", [field.name for field in SCHEMA])):
+    """
+    Film du catalogue, une colonne de SCHEMA par champ. Construit depuis un
+    enregistrement des scrapers avec from_dict() (validé), ou relu depuis un
+    export avec from_row().
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, record):
+        """Enregistrement JSONL (champs des scrapers, de match_tmdb et de check_links) ; ValueError si invalide."""
+        video_url = _url(_text(record, "video_url", required=True), "video_url")
+        link = record.get("_link") or {}
+        return cls(
+            title=_text(record, "title", required=True),
+            video_url=video_url,
+            host=_host(video_url),
+            source=_text(record, "source"),
+            page_url=_text(record, "_url"),
+            link_status=link.get("status") if isinstance(link, dict) else None,
+            players=_players(record),
+            tmdb_id=_number(record, "tmdb_id", int, low=1),
+            year=_number(record, "year", int, low=1870, high=2100),
+            release_date=_date(record, "release_date"),
+            description=_text(record, "description"),
+            poster=_text(record, "poster"),
+            backdrop=_text(record, "backdrop"),
+            vote_average=_number(record, "vote_average", float, low=0, high=10),
+            vote_count=_number(record, "vote_count", int, low=0),
+            popularity=_number(record, "popularity", float, low=0),
+            language=_text(record, "language"),
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """Ligne relue par scan() (dict) ; les colonnes non lues valent None."""
+        values = {field: row.get(field) for field in cls._fields}
+        if values["players"] is not None:
+            values["players"] = tuple(Player(**p) for p in values["players"])
+        return cls(**values)
+
+    def to_row(self):
+        row = self._asdict()
+        row["players"] = [p._asdict() for p in self.players or ()]
+        return row
+
+
+class CatalogWriter:
+    """Écrit des FilmRecord dans un fichier Parquet, par row groups de `batch_size`. Context manager."""
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._rows = []
+        self._writer = None
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._writer = pq.ParquetWriter(self.path + ".tmp", SCHEMA, compression="zstd")
+        return self
+
+    def write(self, film):
+        self._rows.append(film.to_row())
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_batch(pa.RecordBatch.from_pylist(self._rows, schema=SCHEMA))
+            self._rows = []
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        os.replace(self.path + ".tmp", self.path)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            # Export interrompu : l'ancien fichier reste en place
+            self._writer.close()
+            self._writer = None
+            os.remove(self.path + ".tmp")
+
+
+def export(records, path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Exporte des enregistrements JSONL (itérable, lu en flux) vers `path`.
+    Renvoie (films écrits, enregistrements écartés).
+    """
+    rejected = 0
+    with CatalogWriter(path, batch_size) as writer:
+        for record in records:
+            try:
+                film = FilmRecord.from_dict(record)
+            except ValueError as e:
+                rejected += 1
+                log(f"  ! Écarté de {path} : {record.get('title') or record.get('_url')!r} ({e})")
+                continue
+            writer.write(film)
+    return writer.count, rejected
+
+
+def scan(path, columns=None, source=None, host=None, where=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Lots Arrow (RecordBatch) d'un export, lus au fil de l'eau.
+    `columns` limite les colonnes lues ; `source` et `host` (valeur ou liste)
+    et `where` (expression pyarrow.dataset, ex : ds.field("year") >= 2020)
+    filtrent avant décodage, row group par row group.
+    """
+    expression = where
+    for field, value in (("source", source), ("host", host)):
+        if value is None:
+            continue
+        values = [value] if isinstance(value, str) else list(value)
+        condition = ds.field(field).isin(values)
+        expression = condition if expression is None else expression & condition
+    dataset = ds.dataset(path, format="parquet")
+    yield from dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size)
+
+
+def read_films(path, **kwargs):
+    """FilmRecord d'un export, avec les filtres de scan()."""
+    for batch in scan(path, **kwargs):
+        for row in batch.to_pylist():
+            yield FilmRecord.from_row(row)
+
+
+def _urls(path):
+    return ds.dataset(path, format="parquet").to_table(columns=["video_url"]).column("video_url")
+
+
+def diff(old_path, new_path, columns=("title", "video_url", "source")):
+    """
+    (ajoutés, retirés) entre deux exports : tables Arrow des films dont
+    video_url n'est que dans le nouveau, ou que dans l'ancien.
+    Seule la colonne video_url est lue en entier, puis `columns` des films retenus.
+    """
+    old_urls, new_urls = _urls(old_path), _urls(new_path)
+    added = ds.dataset(new_path, format="parquet").to_table(
+        columns=list(columns), filter=~ds.field("video_url").isin(old_urls))
+    removed = ds.dataset(old_path, format="parquet").to_table(
+        columns=list(columns), filter=~ds.field("video_url").isin(new_urls))
+    return added, removed
+
+
+def count_by(path, column, **kwargs):
+    """{valeur: nombre de films} sur une colonne (ex : "host", "source"), sans lire les autres."""
+    counts = {}
+    for batch in scan(path, columns=[column], **kwargs):
+        for item in pc.value_counts(batch.column(column).cast(pa.string())).to_pylist():
+            counts[item["values"]] = counts.get(item["values"], 0) + item["counts"]
+    return counts
@@ -0,0 +1,182 @@
+"""
+Index persistant des films déjà ingérés (SQLite), consulté AVANT d'ouvrir les fiches.
+
+Les films du fichier final sont enregistrés à la compaction (output.finalize),
+pas au fil du run : un run interrompu puis relancé sans --resume retraite ses
+fiches au lieu de les croire déjà importées. Chaque film est enregistré avec :
+- son URL normalisée (schéma/hôte en minuscules, sans fragment, sans
+  paramètres de suivi utm_*, sans "/" final, paramètres triés)
+- son titre normalisé (sans accents, minuscules, ponctuation réduite) et
+  l'année extraite d'un suffixe "(2023)" / "- 2023"
+
+Un film du listing est sauté si son URL est connue, ou si son titre normalisé
+est déjà connu pour la même source (année identique, ou absente d'un côté).
+Les runs quotidiens ne traitent ainsi que les nouveautés ; --no-dedup ignore
+l'index, --dedup-path en choisit un autre.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_DEDUP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  ".cache", "seen.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    url_key TEXT PRIMARY KEY,
+    title_key TEXT,
+    year INTEGER,
+    source TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_title ON seen (source, title_key);
+"""
+
+# "Titre (2023)", "Titre [2023]", "Titre - 2023" ; pas "Blade Runner 2049"
+_YEAR_SUFFIX_RE = re.compile(r"\s*(?:[(\[]((?:19|20)\d{2})[)\]]|[-–:]\s*((?:19|20)\d{2}))\s*$")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_"))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def split_year(title):
+    """"Dune (2021)" -> ("Dune", 2021) ; le titre est rendu tel quel sans suffixe d'année."""
+    match = _YEAR_SUFFIX_RE.search(title)
+    if match and match.start() > 0:
+        return title[:match.start()], int(match.group(1) or match.group(2))
+    return title, None
+
+
+def normalize_title(title):
+    """
+    "Le Comte de Monte-Cristo (2024)" -> ("le comte de monte cristo", 2024)
+    "Anatomie d'une chute"            -> ("anatomie d une chute", None)
+    """
+    if not title:
+        return None, None
+    title, year = split_year(title)
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    key = _NON_ALNUM_RE.sub(" ", text).strip()
+    return key or None, year
+
+
+class DedupIndex:
+    """Index des films ingérés. Sûr entre threads (une connexion, un verrou)."""
+
+    def __init__(self, path=DEFAULT_DEDUP_PATH):
+        self.path = path
+        self.skipped = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def _known(self, url, title=None, source=None):
+        if self._db.execute("SELECT 1 FROM seen WHERE url_key = ?", (normalize_url(url),)).fetchone():
+            return True
+        title_key, year = normalize_title(title)
+        if not title_key:
+            return False
+        return self._db.execute(
+            "SELECT 1 FROM seen WHERE source IS ? AND title_key = ?"
+            " AND (year IS NULL OR ? IS NULL OR year = ?) LIMIT 1",
+            (source, title_key, year, year),
+        ).fetchone() is not None
+
+    def contains(self, url, title=None, source=None):
+        with self._lock:
+            return self._known(url, title, source)
+
+    def filter(self, films, source=None):
+        """
+        Films du listing pas encore ingérés. `films` : URLs ou dicts {"title", "url"}.
+        Dédoublonne aussi le listing lui-même (même URL normalisée), dans l'ordre.
+        """
+        fresh, batch = [], set()
+        with self._lock:
+            for film in films:
+                url, title = (film["url"], film.get("title")) if isinstance(film, dict) else (film, None)
+                key = normalize_url(url)
+                if key in batch or self._known(url, title, source):
+                    self.skipped += 1
+                    continue
+                batch.add(key)
+                fresh.append(film)
+        return fresh
+
+    def add(self, url, title=None, source=None):
+        title_key, year = normalize_title(title)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO seen (url_key, title_key, year, source, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (url_key) DO UPDATE SET last_seen = excluded.last_seen",
+                (normalize_url(url), title_key, year, source, now, now),
+            )
+
+    def add_records(self, records, source=None):
+        """
+        Enregistre des films du JSONL (dicts avec "_url", "title" et, dans la
+        sortie d'ingest.py, "source") en une transaction ; renvoie leur nombre.
+        """
+        now = time.time()
+        rows = []
+        for record in records:
+            if not record.get("_url"):
+                continue
+            title_key, year = normalize_title(record.get("title"))
+            rows.append((normalize_url(record["_url"]), title_key, year,
+                         record.get("source") or source, now, now))
+        # BEGIN explicite : connexion en autocommit ; `with` valide ou annule
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO seen (url_key, title_key, year, source, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (url_key) DO UPDATE SET last_seen = excluded.last_seen",
+                rows,
+            )
+        return len(rows)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def add_dedup_arguments(parser):
+    """Options de l'index des films déjà ingérés (--no-dedup, --dedup-path)."""
+    parser.add_argument("--dedup", dest="dedup", action="store_true", default=True,
+                        help="Saute les films déjà ingérés par un run précédent (défaut).")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                        help="Traite toutes les fiches, même déjà ingérées.")
+    parser.add_argument("--dedup-path", default=DEFAULT_DEDUP_PATH,
+                        help="Fichier SQLite de l'index des films ingérés.")
+    return parser
+
+
+def open_dedup(args):
+    """DedupIndex configuré depuis les options de add_dedup_arguments() (None si désactivé)."""
+    if not args.dedup:
+        return None
+    return DedupIndex(args.dedup_path)
@@ -0,0 +1,716 @@
+"""
+Moteur d'ingestion asynchrone partagé par les scripts Playwright.
+
+- Un pool borné de pages (une page par contexte navigateur)
+- Un plafond de requêtes simultanées par hôte
+- Les fiches d'une même source sont traitées N à la fois au lieu d'une par une
+- Un seul navigateur pour tout le run (listing + fiches)
+- Listing et fiches en pipeline : les fiches partent dès les premiers liens,
+  pendant que les pages suivantes du catalogue se chargent (file bornée)
+- Blocage des ressources lourdes (images, polices, médias, CSS) via route(),
+  avec une liste d'URL toujours autorisées propre à chaque source
+- Durées par étape et compteurs succès/échecs (scraping.metrics, --metrics/--prom)
+- Rythme et disjoncteur par hôte (scraping.backoff) : un hôte qui renvoie des
+  403/5xx ou des timeouts est ralenti, puis ses fiches sont sautées
+- Contextes recyclés après N navigations ou au-delà d'un seuil mémoire, avec
+  relevés RSS dans le log (scraping.memory)
+- Profilage optionnel (scraping.profiling, --profile) : piles par source
+  au format flamegraph, appels Playwright par page
+- Frontière durable optionnelle (scraping.frontier, --frontier) : listing et
+  fiches deviennent des tâches à baux, partagées par plusieurs workers
+
+Chaque script ne fournit que :
+    async def get_film_links(page)        -> films ({"title", "url"} ou url), en
+                                             générateur asynchrone (pagination) ou en liste
+    async def process_film(page, film)    -> dict à exporter, ou None
+et les déclare avec ses réglages dans un engine.Source (SOURCE au niveau du
+module), utilisé par son main() et par ingest.py (plusieurs sources à la fois).
+
+Dépendances : pip install playwright
+"""
+
+import argparse
+import asyncio
+import inspect
+import random
+import time
+from collections import namedtuple
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, TimeoutError as PWTimeout
+
+from scraping import backoff, memory, metrics, output, profiling
+from scraping.cache import add_cache_arguments, is_cacheable, open_cache
+from scraping.dedup import add_dedup_arguments, open_dedup
+from scraping.frontier import (DEFAULT_POLL, LISTING, add_frontier_arguments, check_frontier_arguments,
+                               open_frontier)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PER_HOST = 4
+# Liens d'avance maximum entre le listing et les fiches
+DEFAULT_QUEUE_SIZE = 32
+
+# Types de ressources Playwright jamais utilisés par les extracteurs
+DEFAULT_BLOCKED_RESOURCES = ("image", "font", "media", "stylesheet")
+
+
+# Une source Playwright : ses deux fonctions et ses réglages propres
+Source = namedtuple(
+    "Source",
+    ["name", "get_film_links", "process_film", "delay", "user_agents", "blocked", "allow_urls",
+     "fast_path"],
+    defaults=(None, None, DEFAULT_BLOCKED_RESOURCES, (), None),
+)
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def film_url(film):
+    """Les scripts renvoient soit un dict {"title", "url"}, soit directement l'URL."""
+    return film["url"] if isinstance(film, dict) else film
+
+
+def film_label(film):
+    return film.get("title") or film["url"] if isinstance(film, dict) else film
+
+
+async def iter_film_links(get_film_links, page):
+    """Liens d'un get_film_links, qu'il soit un générateur asynchrone ou renvoie une liste."""
+    result = get_film_links(page)
+    if inspect.isasyncgen(result):
+        async for film in result:
+            yield film
+    else:
+        for film in await result or []:
+            yield film
+
+
+async def _aiter(films):
+    for film in films:
+        yield film
+
+
+class Progress:
+    """Fiches listées ; le total n'est connu qu'une fois le listing terminé."""
+
+    def __init__(self):
+        self.listed = 0
+        self.done = False
+
+    def total(self):
+        return str(self.listed) if self.done else f"{self.listed}+"
+
+
+class HostLimiter:
+    """
+    Un sémaphore par hôte : limite le nombre de fiches ouvertes en même temps
+    sur un même domaine, quel que soit le nombre de pages du pool.
+    """
+
+    def __init__(self, per_host=DEFAULT_PER_HOST):
+        self.per_host = per_host
+        self._semaphores = {}
+
+    def for_url(self, url):
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._semaphores[host]
+
+
+async def _serve_document(route, cache):
+    """
+    Sert une navigation (document HTML) depuis le cache disque : entrée fraîche
+    servie telle quelle, sinon requête conditionnelle (ETag/Last-Modified).
+    Si la requête échoue depuis le routeur, le navigateur la fait lui-même.
+    """
+    request = route.request
+    entry = cache.get(request.url)
+    if entry and cache.is_fresh(entry):
+        cache.hits += 1
+        await route.fulfill(status=entry.status, body=entry.text,
+                            content_type="text/html; charset=utf-8")
+        return
+    if cache.offline:
+        await route.abort()
+        return
+    headers = dict(request.headers)
+    if entry:
+        headers.update(entry.validators())
+    try:
+        response = await route.fetch(headers=headers)
+        revalidated = response.status == 304 and entry is not None
+        body = entry.text if revalidated else await response.text()
+    except Exception as e:
+        # Réseau, corps illisible... : erreur de navigation normale pour process_film
+        log(f"  ~ Cache : requête impossible pour {request.url} ({e}), passage au navigateur.")
+        await route.continue_()
+        return
+    if revalidated:
+        cache.touch(request.url)
+        cache.revalidated += 1
+        await route.fulfill(status=entry.status, body=entry.text,
+                            content_type="text/html; charset=utf-8")
+        return
+    if is_cacheable(response.status):
+        cache.misses += 1
+        cache.put(request.url, body, response.status,
+                  response.headers.get("etag"), response.headers.get("last-modified"))
+    await route.fulfill(response=response, body=body)
+
+
+async def install_routes(context, blocked=DEFAULT_BLOCKED_RESOURCES, allow_urls=(), cache=None):
+    """
+    Intercepte les requêtes du contexte :
+    - annule celles dont le type est dans `blocked` (équivalent Playwright de
+      "profile.managed_default_content_settings.images" côté Selenium) ;
+      les URL contenant un des motifs de `allow_urls` passent toujours ;
+    - sert les documents HTML depuis `cache` (scraping.cache.PageCache) si fourni ;
+      en mode hors-ligne, tout ce qui n'est pas en cache est annulé.
+    """
+    blocked = frozenset(blocked)
+    if not blocked and cache is None:
+        return
+
+    async def handler(route):
+        request = route.request
+        if request.resource_type in blocked and not any(a in request.url for a in allow_urls):
+            await route.abort()
+        elif cache is not None and request.resource_type == "document" and request.method == "GET":
+            await _serve_document(route, cache)
+        elif cache is not None and cache.offline:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    # Sur le contexte plutôt que sur chaque page : couvre aussi les popups ouverts par les onglets
+    await context.route("**/*", handler)
+
+
+class PagePool:
+    """
+    Pool borné de pages Playwright. Chaque page vit dans son propre contexte
+    (cookies et cache isolés) et n'est utilisée que par un worker à la fois.
+    Une page est remplacée (contexte fermé, contexte neuf) à sa prochaine
+    utilisation après `recycle_after` navigations, ou quand le `watchdog`
+    (scraping.memory.Watchdog) a relevé un dépassement du seuil mémoire
+    depuis sa création : la mémoire de Chromium reste stable sur les longs runs.
+    """
+
+    def __init__(self, browser, size=DEFAULT_CONCURRENCY, user_agents=None,
+                 blocked=DEFAULT_BLOCKED_RESOURCES, allow_urls=(), cache=None,
+                 recycle_after=0, watchdog=None):
+        self.browser = browser
+        self.size = size
+        self.user_agents = user_agents or []
+        self.blocked = blocked
+        self.allow_urls = allow_urls
+        self.cache = cache
+        self.recycle_after = recycle_after
+        self.watchdog = watchdog
+        self.recycled = 0
+        self._contexts = {}     # page -> contexte
+        self._generation = {}   # page -> watchdog.generation à sa création
+        self._navigations = {}  # page -> navigations depuis sa création
+        self._free = asyncio.Queue()
+        self._statuses = {}
+
+    def _watch_status(self, page):
+        def on_response(response):
+            if response.frame == page.main_frame and response.request.is_navigation_request():
+                self._statuses[page] = response.status
+                self._navigations[page] = self._navigations.get(page, 0) + 1
+        page.on("response", on_response)
+
+    def last_status(self, page):
+        """Code HTTP de la dernière navigation de `page` (None si inconnu), remis à zéro."""
+        return self._statuses.pop(page, None)
+
+    async def _new_page(self):
+        context = await self.browser.new_context()
+        await install_routes(context, self.blocked, self.allow_urls, self.cache)
+        page = await context.new_page()
+        self._watch_status(page)
+        self._contexts[page] = context
+        self._generation[page] = self.watchdog.generation if self.watchdog else 0
+        return page
+
+    def _needs_recycling(self, page):
+        if self.recycle_after and self._navigations.get(page, 0) >= self.recycle_after:
+            return True
+        return self.watchdog is not None and self._generation[page] < self.watchdog.generation
+
+    async def _recycle(self, page):
+        context = self._contexts.pop(page)
+        for state in (self._generation, self._navigations, self._statuses):
+            state.pop(page, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+        self.recycled += 1
+        metrics.incr("recycled")
+        return await self._new_page()
+
+    async def start(self):
+        for _ in range(self.size):
+            self._free.put_nowait(await self._new_page())
+        return self
+
+    async def acquire(self):
+        page = await self._free.get()
+        if self._needs_recycling(page):
+            page = await self._recycle(page)
+        if self.user_agents:
+            await page.set_extra_http_headers({"User-Agent": random.choice(self.user_agents)})
+        return page
+
+    def release(self, page):
+        self._free.put_nowait(page)
+
+    async def close(self):
+        for context in self._contexts.values():
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts = {}
+
+
+async def _try_fast_path(fast_path, client, film, url):
+    """Voie HTTP sans navigateur ; None si la fiche a besoin du rendu JS."""
+    try:
+        return await fast_path(client, film)
+    except Exception as e:
+        log(f"  ~ Voie HTTP en échec sur {url} ({e}), passage au navigateur.")
+        return None
+
+
+async def _browse(pool, limiter, process_film, film, url, scheduler=None):
+    """Fiche dans le navigateur ; son résultat (statut HTTP, erreur) est compté pour l'hôte."""
+    wait_s = scheduler.reserve(url) if scheduler is not None else 0
+    try:
+        if wait_s:
+            await asyncio.sleep(wait_s)
+        page = await pool.acquire()
+    except BaseException:
+        if scheduler is not None:
+            scheduler.release(url)
+        raise
+    try:
+        async with limiter.for_url(url):
+            with metrics.span("detail"):
+                record = await process_film(page, film)
+        if scheduler is not None:
+            scheduler.record(url, backoff.classify(status=pool.last_status(page)))
+        return record
+    except Exception as e:
+        if scheduler is not None:
+            scheduler.record(url, backoff.classify(e))
+        raise
+    except BaseException:
+        # Fiche annulée (CancelledError, Ctrl-C) : pas de résultat pour l'hôte, requête d'essai rendue
+        if scheduler is not None:
+            scheduler.release(url)
+        raise
+    finally:
+        pool.release(page)
+
+
+async def _worker(queue, pool, limiter, process_film, progress, emit, delay, fast_path=None,
+                  client=None, scheduler=None, ack=None, renew=None):
+    while True:
+        item = await queue.get()
+        if item is None:
+            queue.task_done()
+            return
+        i, film = item
+        url = film_url(film)
+        log(f"[{i+1}/{progress.total()}] {film_label(film)}")
+        record = None
+        skipped = False
+        ok = False
+        retry_in = None
+        renewer = asyncio.create_task(renew(film)) if renew is not None else None
+        try:
+            if fast_path is not None:
+                async with limiter.for_url(url):
+                    with metrics.span("http"):
+                        record = await _try_fast_path(fast_path, client, film, url)
+            if not record:
+                record = await _browse(pool, limiter, process_film, film, url, scheduler)
+            if record:
+                # URL de la fiche, utilisée par --resume (retirée à la compaction)
+                record.setdefault("_url", url)
+                with metrics.span("write"):
+                    emit(i, record)
+                metrics.incr("success")
+            else:
+                metrics.incr("failure")
+            ok = True
+        except backoff.HostUnavailable as e:
+            skipped = True
+            retry_in = e.retry_in
+            metrics.incr("skipped")
+            log(f"Fiche {url} sautée : {e}")
+        except PWTimeout:
+            metrics.incr("timeout")
+            log(f"Timeout sur la fiche {url}, on passe à la suivante.")
+        except Exception as e:
+            metrics.incr("failure")
+            log(f"Erreur inattendue sur {url}: {e}")
+        finally:
+            if renewer is not None:
+                renewer.cancel()
+            if ack is not None:
+                try:
+                    await ack(film, ok, retry_in)
+                except Exception as e:
+                    # Base verrouillée, connexion perdue... : le bail expirera et la fiche repartira
+                    log(f"Fiche {url} non acquittée dans la frontière : {e}")
+            queue.task_done()
+        if delay and not skipped:
+            # Délai anti-bot propre à chaque worker
+            await asyncio.sleep(random.uniform(*delay))
+
+
+async def process_films(pool, films, process_film, per_host=DEFAULT_PER_HOST, delay=None,
+                        sink=None, fast_path=None, client=None, source_name=None,
+                        workers=None, queue_size=DEFAULT_QUEUE_SIZE, scheduler=None, ack=None,
+                        renew=None):
+    """
+    Traite les fiches `films` (liste ou itérable asynchrone) avec les pages du pool.
+    Les fiches passent par une file bornée à `queue_size` : avec un itérable
+    asynchrone, les workers démarrent dès les premiers liens et le listing
+    attend quand il a trop d'avance.
+    Si `fast_path(client, film)` est fourni, il est essayé d'abord (HTTP simple) ;
+    le navigateur n'est utilisé que s'il renvoie None.
+    Si `sink` est fourni (ex : output.JsonlWriter), chaque enregistrement y est
+    écrit dès qu'il est produit et la liste renvoyée est vide. Sinon, renvoie
+    les enregistrements produits par `process_film`, dans l'ordre des fiches.
+    `scheduler` (scraping.backoff.HostScheduler) rythme les fiches par hôte et
+    saute celles des hôtes suspendus.
+    Si `ack` est fourni, `await ack(film, ok, retry_in)` est appelé après chaque
+    fiche ; `ok` est faux si elle a échoué sur une erreur (timeout, hôte
+    suspendu...). `retry_in` n'est renseigné que pour une fiche sautée parce
+    que son hôte est suspendu : secondes avant sa réouverture.
+    Si `renew` est fourni, `renew(film)` (coroutine) tourne pendant le
+    traitement de chaque fiche et est annulée avant `ack` : elle prolonge le
+    bail de la fiche dans la frontière.
+    """
+    if isinstance(films, (list, tuple)):
+        concurrency = max(1, min(workers or pool.size, len(films)))
+        films = _aiter(films)
+    else:
+        concurrency = max(1, workers or pool.size)
+    limiter = HostLimiter(per_host)
+    queue = asyncio.Queue(maxsize=max(1, queue_size))
+    progress = Progress()
+
+    async def produce():
+        try:
+            async for film in films:
+                await queue.put((progress.listed, film))
+                progress.listed += 1
+        except Exception as e:
+            # Les fiches déjà listées sont traitées quand même
+            log(f"Listing interrompu après {progress.listed} fiches : {e}")
+        finally:
+            progress.done = True
+            for _ in range(concurrency):
+                await queue.put(None)
+
+    results = []
+    if sink is not None:
+        def emit(i, record):
+            sink.write(record)
+    else:
+        def emit(i, record):
+            results.append((i, record))
+    await asyncio.gather(produce(), *(
+        _worker(queue, pool, limiter, process_film, progress, emit, delay, fast_path, client,
+                scheduler, ack, renew)
+        for _ in range(concurrency)
+    ))
+    if not progress.listed:
+        log(f"{source_name or 'Source'} : aucun film à traiter.")
+    return [record for _, record in sorted(results, key=lambda r: r[0])]
+
+
+async def _listing(pool, source):
+    """
+    Liens du catalogue, sur une page du pool gardée pendant tout le listing.
+    L'étape "listing" est mesurée par les sources, page par page : ici, le
+    générateur attend aussi que les workers libèrent de la place dans la file.
+    """
+    page = await pool.acquire()
+    try:
+        async for film in iter_film_links(source.get_film_links, page):
+            yield film
+    finally:
+        pool.release(page)
+
+
+async def _new_links(links, name, sink=None, dedup=None):
+    """Écarte au fil de l'eau les doublons du listing, les fiches --resume et celles déjà ingérées."""
+    seen = set()
+    resumed = known = 0
+    async for film in links:
+        url = film_url(film)
+        if url in seen:
+            continue
+        seen.add(url)
+        if sink is not None and url in sink.done_urls:
+            resumed += 1
+        elif dedup is not None and not dedup.filter([film], name):
+            known += 1
+        else:
+            yield film
+    log(f"{name} : {len(seen)} fiches listées, {resumed} déjà traitées (--resume), "
+        f"{known} déjà ingérées.")
+
+
+async def _renew_lease(frontier, source_name, url):
+    """Prolonge le bail d'une tâche toutes les lease / 3 secondes, jusqu'à annulation."""
+    lost = False
+    while True:
+        await asyncio.sleep(frontier.lease / 3)
+        renewed = await asyncio.to_thread(frontier.renew, source_name, url)
+        if not renewed and not lost:
+            log(f"Bail de {source_name} {url or 'listing'} perdu (expiré et repris par un autre worker).")
+        lost = not renewed
+
+
+async def _frontier_listing(pool, source, frontier, sink=None, dedup=None):
+    """
+    Tâche "listing" réservée dans la frontière : chaque nouveau lien du
+    catalogue y devient une fiche, pour tous les workers. Le bail est prolongé
+    sur un minuteur pendant tout le listing, même quand les pages ne
+    contiennent que des fiches déjà connues ou que la file des workers est pleine.
+    """
+    added = 0
+    renewer = asyncio.create_task(_renew_lease(frontier, source.name, ""))
+    try:
+        async for film in _new_links(_listing(pool, source), source.name, sink, dedup):
+            added += await asyncio.to_thread(frontier.add, source.name, film_url(film), film)
+    except Exception as e:
+        log(f"Listing {source.name} interrompu après {added} fiches : {e}")
+        await asyncio.to_thread(frontier.fail, source.name, "")
+        return
+    finally:
+        renewer.cancel()
+    await asyncio.to_thread(frontier.complete, source.name, "")
+    log(f"{source.name} : {added} nouvelles fiches dans la frontière.")
+
+
+async def _frontier_films(pool, source, frontier, batch, sink=None, dedup=None,
+                          poll=DEFAULT_POLL):
+    """
+    Fiches réservées dans la frontière, `batch` à la fois. Le listing, s'il est
+    réservé par ce worker, tourne à côté et remplit la frontière. S'arrête
+    quand plus aucune tâche de la source n'est en attente ni réservée.
+    """
+    listing = None
+    try:
+        while True:
+            tasks = await asyncio.to_thread(frontier.claim, source.name, batch)
+            for task in tasks:
+                if task.kind == LISTING:
+                    listing = asyncio.create_task(_frontier_listing(pool, source, frontier, sink, dedup))
+                else:
+                    yield task.film
+            if tasks:
+                continue
+            # Rien à réserver : attendre le listing, ou les tâches réservées par d'autres
+            # (un bail expiré repart au prochain claim)
+            if (listing is not None and not listing.done()) or \
+                    await asyncio.to_thread(frontier.remaining, source.name):
+                await asyncio.sleep(poll)
+                continue
+            return
+    finally:
+        if listing is not None and not listing.done():
+            listing.cancel()
+
+
+def _frontier_ack(frontier, source_name):
+    """
+    `ack` de process_films pour une frontière : fiche terminée, rendue sans
+    tentative (hôte suspendu, elle repart après la suspension) ou en échec.
+    Une fiche d'un hôte abandonné pour le run compte comme un échec : les
+    autres workers peuvent encore la tenter.
+    """
+    async def ack(film, ok, retry_in=None):
+        url = film_url(film)
+        if ok:
+            await asyncio.to_thread(frontier.complete, source_name, url)
+        elif retry_in is not None:
+            await asyncio.to_thread(frontier.release, source_name, url, retry_in)
+        else:
+            await asyncio.to_thread(frontier.fail, source_name, url)
+    return ack
+
+
+async def run_source(browser, source, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                     block=True, sink=None, cache=None, client=None, dedup=None,
+                     queue_size=DEFAULT_QUEUE_SIZE, scheduler=None,
+                     recycle_after=memory.DEFAULT_RECYCLE_AFTER, watchdog=None, frontier=None):
+    """
+    Traite une source sur un navigateur déjà lancé (partagé entre sources par ingest.py).
+    Le listing tourne sur sa propre page du pool pendant que `concurrency`
+    workers traitent les fiches déjà trouvées.
+    Les fiches dont l'URL est déjà dans `sink.done_urls` (--resume) ou déjà
+    ingérées par un run précédent (`dedup`) sont sautées avant toute navigation.
+    Les pages des fiches sont recyclées selon `recycle_after` et `watchdog`
+    (voir PagePool) ; la page du listing est gardée, elle porte sa position.
+    Avec `frontier` (scraping.frontier.Frontier), listing et fiches passent par
+    la frontière partagée : ce worker ne traite que les tâches qu'il réserve,
+    d'autres processus peuvent travailler sur la même source.
+    Renvoie la liste des enregistrements exploitables (vide si `sink` est fourni).
+    """
+    concurrency = max(1, concurrency)
+    pool = await PagePool(browser, concurrency + 1, source.user_agents,
+                          source.blocked if block else (), source.allow_urls, cache,
+                          recycle_after, watchdog).start()
+    try:
+        ack = renew = None
+        if frontier is None:
+            links = _new_links(_listing(pool, source), source.name, sink, dedup)
+        else:
+            await asyncio.to_thread(frontier.seed, source.name)
+            links = _frontier_films(pool, source, frontier, concurrency, sink, dedup)
+            # File courte : une fiche réservée attend peu avant d'être ouverte, son bail court
+            queue_size = concurrency
+            ack = _frontier_ack(frontier, source.name)
+
+            def renew(film):
+                # Retries et délais d'une fiche lente peuvent dépasser le bail
+                return _renew_lease(frontier, source.name, film_url(film))
+        fast_path = source.fast_path if client is not None else None
+        return await process_films(pool, links, source.process_film, per_host, source.delay, sink,
+                                   fast_path, client, source.name, concurrency, queue_size,
+                                   scheduler, ack, renew)
+    finally:
+        if frontier is not None:
+            log(frontier.stats(source.name))
+        if pool.recycled:
+            log(f"{source.name} : {pool.recycled} contextes recyclés.")
+        await pool.close()
+
+
+async def run(source, headless=True, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+              block=True, sink=None, cache=None, client=None, dedup=None,
+              queue_size=DEFAULT_QUEUE_SIZE, scheduler=None,
+              recycle_after=memory.DEFAULT_RECYCLE_AFTER, watchdog=None, frontier=None):
+    """
+    Un seul navigateur pour tout le run d'une source (voir run_source).
+    `watchdog` (scraping.memory.Watchdog) relève la mémoire pendant le run.
+    """
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        if watchdog is not None:
+            watchdog.start()
+        try:
+            return await run_source(browser, source, concurrency, per_host, block, sink, cache,
+                                    client, dedup, queue_size, scheduler, recycle_after, watchdog,
+                                    frontier)
+        finally:
+            if watchdog is not None:
+                await watchdog.stop()
+            await browser.close()
+
+
+def build_arg_parser(description, headless=True):
+    """Options communes à tous les scripts d'ingestion."""
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Nombre de fiches traitées en parallèle (défaut : {DEFAULT_CONCURRENCY}).")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"Fiches simultanées maximum par hôte (défaut : {DEFAULT_PER_HOST}).")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Liens d'avance maximum du listing sur les fiches (défaut : {DEFAULT_QUEUE_SIZE}).")
+    parser.add_argument("--headful", dest="headless", action="store_false",
+                        help="Affiche le navigateur (debug).")
+    parser.add_argument("--headless", dest="headless", action="store_true",
+                        help="Navigateur invisible.")
+    parser.add_argument("--no-block", dest="block", action="store_false",
+                        help="Ne bloque pas les images/polices/médias/CSS (debug).")
+    parser.add_argument("--no-http", dest="http", action="store_false",
+                        help="Désactive la voie HTTP directe : toutes les fiches passent par le navigateur.")
+    parser.set_defaults(headless=headless)
+    output.add_output_arguments(parser)
+    add_cache_arguments(parser)
+    add_dedup_arguments(parser)
+    backoff.add_backoff_arguments(parser)
+    memory.add_memory_arguments(parser)
+    add_frontier_arguments(parser)
+    metrics.add_metrics_arguments(parser)
+    profiling.add_profile_arguments(parser)
+    return parser
+
+
+def main(description, source, headless=True):
+    """
+    main() des scripts Playwright : options CLI, sortie JSONL, cache, puis compaction.
+    `source` (engine.Source) porte les réglages propres au site ; sa voie HTTP
+    directe optionnelle (fast_path) est décrite dans process_films.
+    """
+    parser = build_arg_parser(description, headless=headless)
+    args = parser.parse_args()
+    check_frontier_arguments(parser, args)
+    metrics.configure(source.name, args.metrics, args.prom)
+    profiler = profiling.open_profiler(args, source.name, {source.name: source.process_film.__module__})
+    page_cache = open_cache(args)
+    dedup = open_dedup(args)
+    scheduler = backoff.open_scheduler(args)
+    frontier = open_frontier(args)
+    if frontier is not None and args.frontier_reset:
+        log(f"Frontière {source.name} vidée ({frontier.reset(source.name)} tâches).")
+    client = None
+    if source.fast_path is not None and args.http:
+        # Import ici : requests n'est chargé que pour les sources qui ont une voie HTTP
+        from scraping.http_client import HttpClient
+        ua = {"user_agent": random.choice(source.user_agents)} if source.user_agents else {}
+        client = HttpClient(page_cache, workers=args.concurrency, per_host=args.per_host,
+                            scheduler=scheduler, **ua)
+    if profiler:
+        profiler.start()
+    try:
+        with output.open_writer(args) as writer:
+            asyncio.run(run(
+                source,
+                headless=args.headless,
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+                block=args.block,
+                sink=writer,
+                cache=page_cache,
+                client=client,
+                dedup=dedup,
+                queue_size=args.queue_size,
+                scheduler=scheduler,
+                recycle_after=args.recycle_after,
+                watchdog=memory.open_watchdog(args),
+                frontier=frontier,
+            ))
+        # Dans le run mesuré : compaction, index dedup et export Parquet comptent dans ses durées
+        with metrics.span("finalize"):
+            output.finalize(args, dedup, source.name)
+    finally:
+        if client:
+            client.close()
+        if frontier:
+            frontier.close()
+        if page_cache:
+            log(page_cache.stats())
+            page_cache.close()
+        if scheduler:
+            log(scheduler.stats())
+        if profiler:
+            profiler.stop()
+        metrics.finish()
+    if dedup:
+        dedup.close()
@@ -0,0 +1,160 @@
+"""
+Corpus de fixtures hors-ligne pour les extracteurs (scripts/fixtures/<source>/).
+
+Chaque source a un manifest.json :
+    {
+      "source": "torrent9",
+      "list_url": "https://www.torrent9.to/films",
+      "pages": {"<url d'origine>": "<fichier html>", ...},
+      "expected": [{"title": ..., "video_url": ...}, ...]
+    }
+
+Rejeu sans réseau :
+- FixtureServer : http.server local qui sert le dossier de la source ;
+  ReplayHttpClient réécrit les URLs d'origine vers ce serveur (vraies
+  sockets, keep-alive, parsing : seul le site distant est remplacé)
+- install_replay() : route Playwright qui répond depuis les fichiers et
+  annule tout le reste
+
+Enregistrement : `python -m scraping.fixtures --record SOURCE --list-url URL`
+exporte les pages d'un run réel depuis le cache disque (scraping.cache).
+"""
+
+import argparse
+import functools
+import json
+import os
+import threading
+import zlib
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+class Fixture:
+    def __init__(self, source, root=FIXTURES_DIR):
+        self.source = source
+        self.dir = os.path.join(root, source)
+        with open(os.path.join(self.dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.list_url = manifest["list_url"]
+        self.pages = manifest["pages"]
+        self.expected = manifest.get("expected", [])
+
+    def path_for(self, url):
+        name = self.pages.get(url)
+        return os.path.join(self.dir, name) if name else None
+
+
+def available_sources(root=FIXTURES_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root) if os.path.exists(os.path.join(root, d, "manifest.json")))
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    """Sert le dossier d'une fixture sur 127.0.0.1 (port libre) dans un thread."""
+
+    def __init__(self, fixture):
+        self.fixture = fixture
+        handler = functools.partial(_QuietHandler, directory=fixture.dir)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, url):
+        name = self.fixture.pages.get(url)
+        if not name:
+            raise LookupError(f"Fixture {self.fixture.source} : pas de page pour {url}")
+        return f"{self.base_url}/{quote(name)}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def replay_client(server, **kwargs):
+    """HttpClient dont get_text() lit les URLs d'origine sur le FixtureServer."""
+    from scraping.http_client import HttpClient
+
+    class ReplayHttpClient(HttpClient):
+        def get_text(self, url):
+            return super().get_text(server.url_for(url))
+
+    return ReplayHttpClient(**kwargs)
+
+
+async def install_replay(context, fixture):
+    """Route Playwright : pages du manifest servies depuis les fichiers, le reste annulé."""
+
+    async def handler(route):
+        path = fixture.path_for(route.request.url)
+        if path:
+            await route.fulfill(path=path, content_type="text/html; charset=utf-8")
+        else:
+            await route.abort()
+
+    await context.route("**/*", handler)
+
+
+def record_from_cache(source, list_url, cache_path, root=FIXTURES_DIR):
+    """
+    Exporte depuis le cache disque toutes les pages du domaine de `list_url`
+    vers fixtures/<source>/ avec un manifest ("expected" est à compléter à la main).
+    """
+    import sqlite3
+    host = urlparse(list_url).netloc
+    out_dir = os.path.join(root, source)
+    os.makedirs(out_dir, exist_ok=True)
+    pages = {}
+    db = sqlite3.connect(cache_path)
+    try:
+        for url, body in db.execute("SELECT url, body FROM pages WHERE status = 200"):
+            if urlparse(url).netloc != host:
+                continue
+            name = "listing.html" if url == list_url else \
+                (urlparse(url).path.strip("/").replace("/", "_") or "index") + ".html"
+            with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+                f.write(zlib.decompress(body).decode("utf-8"))
+            pages[url] = name
+    finally:
+        db.close()
+    manifest = {"source": source, "list_url": list_url, "pages": pages, "expected": []}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return len(pages)
+
+
+def main():
+    from scraping.cache import DEFAULT_CACHE_PATH
+    parser = argparse.ArgumentParser(description="Enregistre une fixture depuis le cache disque.")
+    parser.add_argument("--record", required=True, metavar="SOURCE", help="Nom de la source (dossier).")
+    parser.add_argument("--list-url", required=True, help="URL de la page catalogue.")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH)
+    args = parser.parse_args()
+    count = record_from_cache(args.record, args.list_url, args.cache_path)
+    print(f"{count} pages enregistrées dans {os.path.join(FIXTURES_DIR, args.record)}")
+
+
+if __name__ == "__main__":
+    main()
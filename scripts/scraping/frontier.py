@@ -0,0 +1,282 @@
+"""
+Frontière de crawl durable, partagée par plusieurs processus (ou machines).
+
+- Une table `frontier` : une ligne par tâche, clé (source, url)
+  - "listing" : le catalogue d'une source (url vide), parcouru par un seul
+    worker à la fois ; chaque lien trouvé y est ajouté comme fiche
+  - "detail"  : une fiche, avec le film du listing ({"title", "url"} ou url)
+- Les workers réservent des tâches par bail (claim) : `lease` secondes au nom
+  du worker. Un worker tué ne rend pas ses tâches, mais son bail expire et
+  elles repartent au prochain claim d'un autre worker
+- Une tâche en erreur est remise en attente, jusqu'à `max_attempts`
+  réservations ; au-delà elle reste "failed" (une fiche qui fait tomber le
+  worker à chaque fois ne bloque pas le crawl)
+- Une tâche rendue sans avoir été tentée (hôte suspendu par le disjoncteur :
+  release) ne compte pas de tentative ; elle n'est réservable qu'après un
+  délai
+- Débit : lancer d'autres workers sur la même frontière suffit
+
+Stockage :
+- SQLite (défaut, scripts/.cache/frontier.sqlite) : plusieurs processus sur
+  la même machine
+- Postgres (DSN postgresql://...) : workers sur plusieurs machines ; la
+  réservation utilise FOR UPDATE SKIP LOCKED. Les baux sont datés par
+  l'horloge des workers : garder les machines à l'heure (NTP)
+
+Dépendances (Postgres uniquement) : pip install "psycopg[binary]"
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_FRONTIER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     ".cache", "frontier.sqlite")
+DEFAULT_LEASE = 300.0  # secondes
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_POLL = 2.0  # secondes entre deux claims quand la frontière est vide
+
+LISTING, DETAIL = "listing", "detail"
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    film TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    UNIQUE (source, url)
+);
+CREATE INDEX IF NOT EXISTS frontier_claim ON frontier (source, state);
+"""
+
+_POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id BIGSERIAL PRIMARY KEY,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    film TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until DOUBLE PRECISION,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at DOUBLE PRECISION NOT NULL,
+    UNIQUE (source, url)
+);
+CREATE INDEX IF NOT EXISTS frontier_claim ON frontier (source, state);
+"""
+
+# Tâches réservables : en attente (passé le délai d'une tâche rendue), ou bail expiré.
+# Le listing passe en premier.
+_CLAIM_SQL = """
+UPDATE frontier SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1,
+                    updated_at = ?
+WHERE id IN (
+    SELECT id FROM frontier
+    WHERE source = ? AND state IN ('pending', 'leased') AND COALESCE(lease_until, 0) < ?
+    ORDER BY kind = 'listing' DESC, id
+    LIMIT ?{lock}
+)
+RETURNING source, kind, url, film, attempts
+"""
+
+# Une tâche réservée : `film` est le film du listing (None pour le listing)
+Task = namedtuple("Task", ["source", "kind", "url", "film", "attempts"])
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def worker_id():
+    """Nom du worker dans la frontière : machine et PID."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def is_dsn(target):
+    return target.startswith(("postgres://", "postgresql://"))
+
+
+class Frontier:
+    """
+    File de tâches à baux, sur SQLite (`target` : chemin) ou Postgres (`target` : DSN).
+    Sûre entre threads (une connexion, un verrou) et entre processus (la base).
+    """
+
+    def __init__(self, target=DEFAULT_FRONTIER_PATH, lease=DEFAULT_LEASE,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, worker=None):
+        self.target = target
+        self.lease = lease
+        self.max_attempts = max(1, max_attempts)
+        self.worker = worker or worker_id()
+        self.postgres = is_dsn(target)
+        self._lock = threading.Lock()
+        if self.postgres:
+            # Import ici : psycopg n'est chargé que pour une frontière partagée
+            import psycopg
+            self._db = psycopg.connect(target, autocommit=True)
+            schema = _POSTGRES_SCHEMA
+        else:
+            directory = os.path.dirname(target)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # timeout : attente du verrou d'écriture tenu par un autre processus
+            self._db = sqlite3.connect(target, check_same_thread=False, isolation_level=None,
+                                       timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            schema = _SQLITE_SCHEMA
+        for statement in filter(str.strip, schema.split(";")):
+            self._db.execute(statement)
+        self._claim_sql = _CLAIM_SQL.format(lock=" FOR UPDATE SKIP LOCKED" if self.postgres else "")
+
+    def _execute(self, query, params=()):
+        if self.postgres:
+            query = query.replace("?", "%s")
+        with self._lock:
+            cursor = self._db.execute(query, params)
+            return cursor.fetchall() if cursor.description else cursor.rowcount
+
+    def seed(self, source):
+        """Ajoute le listing de `source` s'il n'est pas déjà dans la frontière."""
+        return self._add(source, LISTING, "", None)
+
+    def add(self, source, url, film=None):
+        """Ajoute une fiche ; False si elle y est déjà (quel que soit son état)."""
+        return self._add(source, DETAIL, url, film)
+
+    def _add(self, source, kind, url, film):
+        return self._execute(
+            "INSERT INTO frontier (source, kind, url, film, updated_at) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (source, url) DO NOTHING",
+            (source, kind, url, None if film is None else json.dumps(film, ensure_ascii=False),
+             time.time()),
+        ) == 1
+
+    def claim(self, source, limit=1):
+        """Réserve jusqu'à `limit` tâches de `source` pour `lease` secondes (liste de Task)."""
+        now = time.time()
+        # Bail expiré et plus de tentative : abandon (la tâche fait tomber les workers)
+        self._execute(
+            "UPDATE frontier SET state = 'failed', updated_at = ?"
+            " WHERE source = ? AND state = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, source, now, self.max_attempts),
+        )
+        rows = self._execute(self._claim_sql, (self.worker, now + self.lease, now, source, now,
+                                               max(1, limit)))
+        tasks = [Task(s, kind, url, json.loads(film) if film else None, attempts)
+                 for s, kind, url, film, attempts in rows]
+        # RETURNING ne garantit pas l'ordre : listing d'abord, puis ordre d'ajout
+        return sorted(tasks, key=lambda t: t.kind != LISTING)
+
+    def renew(self, source, url):
+        """Prolonge le bail d'une tâche de ce worker ; False s'il l'a perdu (expiré et repris)."""
+        now = time.time()
+        return self._execute(
+            "UPDATE frontier SET lease_until = ?, updated_at = ?"
+            " WHERE source = ? AND url = ? AND state = 'leased' AND worker = ?",
+            (now + self.lease, now, source, url, self.worker),
+        ) == 1
+
+    def complete(self, source, url):
+        """Tâche terminée (même si un autre worker l'a reprise entre-temps)."""
+        self._execute(
+            "UPDATE frontier SET state = 'done', lease_until = NULL, updated_at = ?"
+            " WHERE source = ? AND url = ? AND state <> 'done'",
+            (time.time(), source, url),
+        )
+
+    def fail(self, source, url):
+        """Tâche en erreur : remise en attente, ou "failed" après `max_attempts` réservations."""
+        self._execute(
+            "UPDATE frontier SET lease_until = NULL, updated_at = ?,"
+            " state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END"
+            " WHERE source = ? AND url = ? AND state = 'leased' AND worker = ?",
+            (time.time(), self.max_attempts, source, url, self.worker),
+        )
+
+    def release(self, source, url, delay=0.0):
+        """
+        Tâche rendue sans avoir été tentée (hôte suspendu) : remise en attente
+        sans compter la réservation, et réservable seulement dans `delay` secondes.
+        """
+        now = time.time()
+        self._execute(
+            "UPDATE frontier SET state = 'pending', worker = NULL, lease_until = ?,"
+            " attempts = attempts - 1, updated_at = ?"
+            " WHERE source = ? AND url = ? AND state = 'leased' AND worker = ?",
+            (now + max(0.0, delay), now, source, url, self.worker),
+        )
+
+    def remaining(self, source):
+        """Tâches de `source` en attente ou réservées (par n'importe quel worker)."""
+        return self._execute(
+            "SELECT COUNT(*) FROM frontier WHERE source = ? AND state IN ('pending', 'leased')",
+            (source,),
+        )[0][0]
+
+    def reset(self, source):
+        """Vide la frontière de `source` (nouveau crawl) ; renvoie le nombre de tâches retirées."""
+        return self._execute("DELETE FROM frontier WHERE source = ?", (source,))
+
+    def counts(self, source):
+        rows = self._execute("SELECT state, COUNT(*) FROM frontier WHERE source = ?"
+                             " GROUP BY state", (source,))
+        return {state: n for state, n in rows}
+
+    def stats(self, source):
+        counts = self.counts(source)
+        return (f"Frontière {source} : {counts.get(DONE, 0)} faites, {counts.get(FAILED, 0)} en échec, "
+                f"{counts.get(PENDING, 0) + counts.get(LEASED, 0)} restantes.")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def add_frontier_arguments(parser):
+    """Options de la frontière partagée (--frontier, --lease, --max-attempts, --frontier-reset)."""
+    parser.add_argument("--frontier", nargs="?", const=DEFAULT_FRONTIER_PATH, default=None,
+                        metavar="PATH_OU_DSN",
+                        help="Répartit le crawl entre plusieurs workers via une frontière durable : "
+                             "fichier SQLite (défaut si l'option est seule : scripts/.cache/frontier.sqlite) "
+                             "ou DSN Postgres pour des workers sur plusieurs machines.")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help=f"Durée d'un bail en secondes ; une tâche d'un worker tué repart "
+                             f"après ce délai (défaut : {DEFAULT_LEASE:.0f}).")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Réservations maximum d'une tâche avant abandon (défaut : {DEFAULT_MAX_ATTEMPTS}).")
+    parser.add_argument("--frontier-reset", action="store_true",
+                        help="Vide la frontière des sources lancées avant de démarrer (nouveau crawl ; "
+                             "à ne passer qu'au premier worker).")
+    return parser
+
+
+def check_frontier_arguments(parser, args):
+    """
+    Avec --frontier, chaque worker doit écrire sa propre sortie : sur une même
+    machine, deux workers avec la --output par défaut écraseraient le JSONL et
+    le JSON l'un de l'autre (parser.error).
+    """
+    if args.frontier and args.output == parser.get_default("output"):
+        parser.error("--frontier demande une --output propre à chaque worker (ex : --output w1.json)")
+
+
+def open_frontier(args):
+    """Frontier configurée depuis les options de add_frontier_arguments() (None si désactivée)."""
+    if not args.frontier:
+        return None
+    frontier = Frontier(args.frontier, args.lease, args.max_attempts)
+    where = "Postgres" if frontier.postgres else args.frontier
+    log(f"Frontière partagée : {where}, worker {frontier.worker}.")
+    return frontier
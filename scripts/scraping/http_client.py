@@ -0,0 +1,177 @@
+"""
+Client HTTP partagé pour les scripts à base de requests.
+
+- Une Session requests : connexions keep-alive réutilisées (pas de nouvelle
+  poignée de main TCP/TLS à chaque page)
+- Timeouts explicites (connexion, lecture) sur chaque requête
+- Fan-out en threads avec un plafond de requêtes simultanées par hôte
+- Passe par le cache disque (scraping.cache) si fourni
+- Rythme et disjoncteur par hôte (scraping.backoff) si fourni : un hôte qui
+  échoue est ralenti, puis suspendu (HostUnavailable) sans freiner les autres
+
+Dépendances : pip install requests
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scraping.backoff import classify
+from scraping.cache import fetch_text
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 20
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko)"
+    " Chrome/124.0.0.0 Safari/537.36"
+)
+
+_END = object()
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def make_session(pool_size=DEFAULT_WORKERS, user_agent=DEFAULT_USER_AGENT):
+    """
+    Session requests avec un pool de connexions dimensionné pour `pool_size`
+    threads et quelques retries automatiques sur les erreurs serveur transitoires.
+    """
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                  allowed_methods=("GET", "HEAD"))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+class HttpClient:
+    """
+    GET texte via une Session partagée, avec cache et limite par hôte.
+    `map()` répartit un traitement sur un pool de threads.
+    """
+
+    def __init__(self, cache=None, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 user_agent=DEFAULT_USER_AGENT, scheduler=None):
+        self.cache = cache
+        self.scheduler = scheduler
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = make_session(self.workers, user_agent)
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def _request(self, send, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if self.scheduler is None:
+            with self._host_slot(url):
+                return send(url, **kwargs)
+        wait_s = self.scheduler.reserve(url)
+        try:
+            if wait_s:
+                time.sleep(wait_s)
+            with self._host_slot(url):
+                response = send(url, **kwargs)
+        except requests.RequestException as e:
+            self.scheduler.record(url, classify(e))
+            raise
+        except BaseException:
+            # Pas de résultat pour l'hôte (Ctrl-C, erreur locale) : requête d'essai rendue
+            self.scheduler.release(url)
+            raise
+        self.scheduler.record_response(url, response)
+        return response
+
+    def get(self, url, **kwargs):
+        """Session.get avec timeout par défaut, plafond et rythme par hôte."""
+        return self._request(self.session.get, url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """Session.head avec timeout par défaut, plafond et rythme par hôte."""
+        return self._request(self.session.head, url, **kwargs)
+
+    def get_text(self, url):
+        """Corps de la page (depuis le cache si frais / inchangé)."""
+        return fetch_text(url, self.cache, self.get)
+
+    def map(self, fn, items, max_pending=None):
+        """
+        Applique `fn(item)` sur `workers` threads. Génère (item, résultat, erreur)
+        au fil des fins de traitement ; `erreur` vaut None en cas de succès.
+        `items` est consommé au fur et à mesure (au plus `max_pending` tâches en
+        attente, 2 x workers par défaut) : un générateur de listing paginé peut
+        charger sa page suivante pendant que les fiches déjà trouvées sont traitées.
+        Le contexte de l'appelant (ex : source courante des métriques) suit chaque tâche.
+        """
+        max_pending = max_pending or 2 * self.workers
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(futures) < max_pending:
+                    item = next(items, _END)
+                    if item is _END:
+                        exhausted = True
+                        break
+                    futures[executor.submit(contextvars.copy_context().run, fn, item)] = item
+                if not futures:
+                    return
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = futures.pop(future)
+                    try:
+                        yield item, future.result(), None
+                    except Exception as e:
+                        yield item, None, e
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def add_http_arguments(parser):
+    """Options réseau communes (--workers, --per-host, timeouts)."""
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Requêtes en parallèle (défaut : {DEFAULT_WORKERS}).")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"Requêtes simultanées maximum par hôte (défaut : {DEFAULT_PER_HOST}).")
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help=f"Timeout de connexion en secondes (défaut : {DEFAULT_CONNECT_TIMEOUT}).")
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                        help=f"Timeout de lecture en secondes (défaut : {DEFAULT_READ_TIMEOUT}).")
+    return parser
+
+
+def open_client(args, cache=None, scheduler=None):
+    """HttpClient configuré depuis les options de add_http_arguments()."""
+    return HttpClient(cache, workers=args.workers, per_host=args.per_host,
+                      connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                      scheduler=scheduler)
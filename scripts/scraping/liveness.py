@@ -0,0 +1,161 @@
+"""
+Vérification des video_url extraites (lien vivant ou mort), avec cache SQLite.
+
+Pour chaque URL :
+- HEAD (redirections suivies) ; si le serveur refuse HEAD (403/405/501...),
+  GET avec "Range: bytes=0-0" : un seul octet est demandé, la connexion est
+  fermée sans lire le flux
+- on garde le code HTTP, le Content-Type, la taille (Content-Length ou total
+  du Content-Range), la latence et l'URL finale
+- statut : "alive" (2xx), "dead" (404/410, hôte inexistant), "error" (autre
+  code, timeout... : à revérifier, jamais écarté)
+Les liens magnet: ne sont pas vérifiables en HTTP ("skipped").
+
+Les résultats "alive" / "dead" sont gardés dans scripts/.cache/links.sqlite
+pendant `ttl` secondes : les URLs inchangées ne sont pas re-sondées à chaque run.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+DEFAULT_LINKS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  ".cache", "links.sqlite")
+DEFAULT_TTL = 12 * 3600  # secondes
+
+ALIVE, DEAD, ERROR, SKIPPED = "alive", "dead", "error", "skipped"
+
+# Codes pour lesquels on retente en GET avec Range (HEAD non supporté ou filtré)
+_HEAD_FALLBACK = {400, 403, 405, 406, 501}
+_DEAD_CODES = {404, 410}
+_DNS_ERRORS = ("Failed to resolve", "Name or service not known", "nodename nor servname",
+               "getaddrinfo failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    http_status INTEGER,
+    content_type TEXT,
+    size INTEGER,
+    latency_ms REAL,
+    final_url TEXT,
+    checked_at REAL NOT NULL
+);
+"""
+
+_FIELDS = ("status", "http_status", "content_type", "size", "latency_ms", "final_url", "checked_at")
+
+
+def is_dead(record):
+    """Vrai si check_links.py a marqué le lien du film comme mort."""
+    return record.get("_link", {}).get("status") == DEAD
+
+
+def _size(response):
+    """Taille de la ressource : total du Content-Range (réponse 206) ou Content-Length."""
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() and response.status_code != 206 else None
+
+
+def _status_for(code):
+    if 200 <= code < 300:
+        return ALIVE
+    return DEAD if code in _DEAD_CODES else ERROR
+
+
+def _is_unknown_host(error):
+    """Erreur de résolution DNS (domaine de l'hébergeur disparu)."""
+    return isinstance(error, requests.ConnectionError) and any(m in str(error) for m in _DNS_ERRORS)
+
+
+def probe(client, url):
+    """Sonde une URL avec `client` (scraping.http_client.HttpClient). Renvoie un dict résultat."""
+    if not url.startswith(("http://", "https://")):
+        return {"status": SKIPPED, "http_status": None, "content_type": None, "size": None,
+                "latency_ms": None, "final_url": None, "checked_at": time.time()}
+    start = time.monotonic()
+    try:
+        response = client.head(url, allow_redirects=True)
+        if response.status_code in _HEAD_FALLBACK:
+            response = client.get(url, headers={"Range": "bytes=0-0"}, stream=True,
+                                  allow_redirects=True)
+            response.close()
+        result = {
+            "status": _status_for(response.status_code),
+            "http_status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "size": _size(response),
+            "final_url": response.url,
+        }
+    except requests.RequestException as e:
+        result = {"status": DEAD if _is_unknown_host(e) else ERROR, "http_status": None,
+                  "content_type": None, "size": None, "final_url": None, "error": str(e)}
+    result["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+    result["checked_at"] = time.time()
+    return result
+
+
+class LinkCache:
+    """Derniers résultats de vérification par URL. Sûr entre threads."""
+
+    def __init__(self, path=DEFAULT_LINKS_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, url):
+        """Résultat encore valide pour `url`, sinon None."""
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(_FIELDS)} FROM links WHERE url = ?",
+                                   (url,)).fetchone()
+        if not row:
+            return None
+        result = dict(zip(_FIELDS, row))
+        return result if time.time() - result["checked_at"] < self.ttl else None
+
+    def put(self, url, result):
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO links (url, {', '.join(_FIELDS)}) VALUES (?{', ?' * len(_FIELDS)})",
+                (url, *(result.get(f) for f in _FIELDS)),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def check_urls(client, urls, cache=None):
+    """
+    Vérifie les `urls` en parallèle (threads et plafond par hôte du client).
+    Génère (url, résultat, depuis_le_cache) au fil de l'eau.
+    """
+    todo = []
+    for url in dict.fromkeys(urls):
+        cached = cache.get(url) if cache is not None else None
+        if cached:
+            yield url, cached, True
+        else:
+            todo.append(url)
+    for url, result, error in client.map(lambda u: probe(client, u), todo):
+        if error is not None:
+            result = {"status": ERROR, "error": str(error), "checked_at": time.time()}
+        # Les erreurs (timeouts...) sont transitoires : revérifiées au prochain run
+        if cache is not None and result["status"] in (ALIVE, DEAD):
+            cache.put(url, result)
+        yield url, result, False
@@ -0,0 +1,146 @@
+"""
+Surveillance mémoire des longs runs Playwright (RSS Python et navigateur).
+
+- rss_mb() : RSS courant du processus Python et de ses enfants (Chromium,
+  driver Playwright), en Mo
+- Watchdog : relevé toutes les `interval` secondes, écrit dans le log du run
+  (valeur courante et pic) ; au-delà de `max_rss` Mo (Python + navigateur), il
+  demande le recyclage des contextes : chaque page du pool est remplacée par
+  une page neuve dans un contexte neuf à sa prochaine utilisation (voir
+  engine.PagePool). Une seule demande par dépassement : le watchdog ne se
+  réarme qu'une fois la mémoire redescendue sous REARM_RATIO x `max_rss`
+  (sinon chaque relevé pendant le recyclage en relancerait un autre)
+
+Le RSS des processus enfants demande psutil (optionnel) : sans lui, seul le
+processus Python est suivi et le seuil ne porte que sur lui.
+
+Dépendances (optionnel) : pip install psutil
+"""
+
+import asyncio
+import os
+import resource
+import time
+
+DEFAULT_RECYCLE_AFTER = 200  # navigations par contexte
+DEFAULT_MAX_RSS = 0  # Mo, 0 = pas de seuil
+DEFAULT_INTERVAL = 30.0  # secondes entre deux relevés
+REARM_RATIO = 0.9  # part du seuil sous laquelle un nouveau dépassement redéclenche le recyclage
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def _python_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Pic plutôt que valeur courante ; ru_maxrss est en Ko sous Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _children_bytes():
+    if psutil is None:
+        return None
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def rss_mb():
+    """(Python, navigateur) en Mo ; navigateur vaut None sans psutil."""
+    children = _children_bytes()
+    return _python_bytes() / 1024 / 1024, None if children is None else children / 1024 / 1024
+
+
+class Watchdog:
+    """
+    Relevés mémoire périodiques. `generation` augmente quand le total passe
+    au-dessus de `max_rss` (une fois par dépassement) : les pages créées avant
+    sont à recycler.
+    """
+
+    def __init__(self, max_rss=DEFAULT_MAX_RSS, interval=DEFAULT_INTERVAL):
+        self.max_rss = max_rss
+        self.interval = interval
+        self.generation = 0
+        self.peak_python = 0.0
+        self.peak_browser = 0.0
+        self._armed = True
+        self._task = None
+
+    def sample(self):
+        python, browser = rss_mb()
+        self.peak_python = max(self.peak_python, python)
+        self.peak_browser = max(self.peak_browser, browser or 0.0)
+        total = python + (browser or 0.0)
+        over = bool(self.max_rss) and total > self.max_rss
+        note = ""
+        if over and self._armed:
+            self.generation += 1
+            self._armed = False
+            note = f" > {self.max_rss} Mo, recyclage des contextes"
+        elif over:
+            note = f" > {self.max_rss} Mo, recyclage déjà demandé"
+        elif self.max_rss and total < self.max_rss * REARM_RATIO:
+            self._armed = True
+        browser_text = f"{browser:.0f} Mo" if browser is not None else "? (psutil absent)"
+        log(f"Mémoire : Python {python:.0f} Mo, navigateur {browser_text}{note}")
+        return python, browser
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample()
+
+    def start(self):
+        """Lance les relevés périodiques sur la boucle asyncio courante."""
+        self.sample()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.sample()
+        log(self.stats())
+
+    def stats(self):
+        browser = f"{self.peak_browser:.0f} Mo" if psutil is not None else "?"
+        return (f"Mémoire (pic) : Python {self.peak_python:.0f} Mo, navigateur {browser}, "
+                f"{self.generation} recyclage(s) sur seuil.")
+
+
+def add_memory_arguments(parser):
+    """Options de recyclage des contextes (--recycle-after, --max-rss, --memory-interval)."""
+    parser.add_argument("--recycle-after", type=int, default=DEFAULT_RECYCLE_AFTER,
+                        help=f"Navigations avant de remplacer le contexte d'une page (défaut : {DEFAULT_RECYCLE_AFTER}, 0 = jamais).")
+    parser.add_argument("--max-rss", type=int, default=DEFAULT_MAX_RSS,
+                        help="Seuil mémoire en Mo (Python + navigateur) qui déclenche le recyclage "
+                             "de tous les contextes (défaut : aucun).")
+    parser.add_argument("--memory-interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Secondes entre deux relevés mémoire dans le log (défaut : {DEFAULT_INTERVAL:.0f}).")
+    return parser
+
+
+def open_watchdog(args):
+    """Watchdog configuré depuis les options de add_memory_arguments()."""
+    return Watchdog(args.max_rss, args.memory_interval)
@@ -0,0 +1,185 @@
+"""
+Instrumentation des runs d'ingestion : durée par étape et compteurs par source.
+
+    from scraping import metrics
+
+    with metrics.span("goto"):
+        await page.goto(url)
+    metrics.incr("retries")
+
+Étapes utilisées : listing, detail (fiche complète), http (voie HTTP directe),
+goto, wait, extract, write, finalize (compaction de fin de run). Compteurs : success, failure, timeout, retries,
+skipped (fiches d'un hôte suspendu par scraping.backoff), recycled (contextes
+navigateur remplacés).
+
+Sorties :
+- JSONL (--metrics) : une ligne par span / compteur, écrite au fil de l'eau
+- textfile Prometheus (--prom) : pour le node_exporter (collector textfile)
+- résumé p50/p95 par étape dans le log en fin de run
+Le module garde une instance par processus (configure() / get()), partagée
+entre coroutines et threads. Quand plusieurs sources tournent dans le même
+processus (ingest.py), set_source() étiquette les mesures de la tâche courante.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Source de la tâche asyncio / du thread courant (prioritaire sur Metrics.source)
+_source = contextvars.ContextVar("metrics_source", default=None)
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def percentile(values, pct):
+    """Percentile `pct` (0-100) de `values`, au rang le plus proche ; 0.0 si vide."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Metrics:
+    def __init__(self, source="run", jsonl_path=None, prom_path=None):
+        self.source = source
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.durations = {}  # (source, étape) -> [secondes]
+        self.counters = {}   # (source, compteur) -> int
+        self._lock = threading.Lock()
+        self._file = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+
+    def _emit(self, event):
+        if self._file:
+            event["ts"] = round(time.time(), 3)
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def observe(self, stage, seconds, ok=True, source=None):
+        source = source or _source.get() or self.source
+        with self._lock:
+            self.durations.setdefault((source, stage), []).append(seconds)
+            self._emit({"source": source, "stage": stage, "seconds": round(seconds, 4), "ok": ok})
+
+    def incr(self, counter, n=1, source=None):
+        source = source or _source.get() or self.source
+        with self._lock:
+            key = (source, counter)
+            self.counters[key] = self.counters.get(key, 0) + n
+            self._emit({"source": source, "counter": counter, "value": self.counters[key]})
+
+    @contextmanager
+    def span(self, stage, source=None):
+        """Mesure la durée du bloc (utilisable aussi autour de `await`)."""
+        start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe(stage, time.monotonic() - start, ok, source)
+
+    def summary_lines(self):
+        lines = []
+        for (source, stage), values in sorted(self.durations.items()):
+            lines.append(f"{source:<20} {stage:<8} n={len(values):<5} "
+                         f"p50={percentile(values, 50):.2f}s p95={percentile(values, 95):.2f}s "
+                         f"total={sum(values):.1f}s")
+        for (source, counter), value in sorted(self.counters.items()):
+            lines.append(f"{source:<20} {counter:<8} {value}")
+        return lines
+
+    def log_summary(self):
+        log("Résumé du run (durées par étape, compteurs) :")
+        for line in self.summary_lines():
+            log(f"  {line}")
+
+    def write_prometheus(self, path=None):
+        """Écrit un textfile Prometheus (écriture atomique : tmp + rename)."""
+        path = path or self.prom_path
+        if not path:
+            return
+        out = [
+            "# HELP scraper_stage_seconds Durée des étapes d'ingestion.",
+            "# TYPE scraper_stage_seconds summary",
+        ]
+        with self._lock:
+            durations = dict(self.durations)
+            counters = dict(self.counters)
+        for (source, stage), values in sorted(durations.items()):
+            labels = f'source="{source}",stage="{stage}"'
+            for q in (0.5, 0.95):
+                out.append(f'scraper_stage_seconds{{{labels},quantile="{q}"}} {percentile(values, q * 100):.6f}')
+            out.append(f"scraper_stage_seconds_sum{{{labels}}} {sum(values):.6f}")
+            out.append(f"scraper_stage_seconds_count{{{labels}}} {len(values)}")
+        out.append("# HELP scraper_events_total Succès, échecs et retries par source.")
+        out.append("# TYPE scraper_events_total counter")
+        for (source, counter), value in sorted(counters.items()):
+            out.append(f'scraper_events_total{{source="{source}",event="{counter}"}} {value}')
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(out) + "\n")
+        os.replace(tmp, path)
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+_current = Metrics()
+
+
+def configure(source, jsonl_path=None, prom_path=None):
+    """Remplace l'instance du processus (appelé une fois par main())."""
+    global _current
+    _current.close()
+    _current = Metrics(source, jsonl_path, prom_path)
+    return _current
+
+
+def get():
+    return _current
+
+
+def set_source(name):
+    """Étiquette les mesures suivantes du contexte courant (tâche asyncio ou thread)."""
+    _source.set(name)
+
+
+def current_source():
+    """Source du contexte courant (set_source()), sinon celle du run."""
+    return _source.get() or _current.source
+
+
+def span(stage, source=None):
+    return _current.span(stage, source)
+
+
+def observe(stage, seconds, ok=True, source=None):
+    _current.observe(stage, seconds, ok, source)
+
+
+def incr(counter, n=1, source=None):
+    _current.incr(counter, n, source)
+
+
+def finish():
+    """Fin de run : résumé dans le log, textfile Prometheus, fermeture du JSONL."""
+    _current.log_summary()
+    _current.write_prometheus()
+    _current.close()
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Fichier JSONL des mesures (une ligne par étape/compteur).")
+    parser.add_argument("--prom", metavar="PATH",
+                        help="Textfile Prometheus écrit en fin de run (ex : /var/lib/node_exporter/scraper.prom).")
+    return parser
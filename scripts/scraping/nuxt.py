@@ -0,0 +1,207 @@
+"""
+Décodeur du payload __NUXT_DATA__ (Nuxt 3, format "devalue").
+
+Le script contient un tableau plat : l'élément 0 est la racine, et dans les
+objets/tableaux chaque valeur est l'INDEX d'un autre élément du tableau.
+Parcourir le JSON brut renvoie donc des index au lieu des valeurs :
+
+    [{"movie": 1}, {"title": 2, "videoAddress": 3}, "Dune", "https://.../dune.mp4"]
+
+Les tableaux dont le premier élément est une chaîne sont des types spéciaux :
+["Reactive", i], ["ShallowRef", i], ["Date", "..."], ["Set", i, ...],
+["Map", k, v, ...], ["null", "clé", i, ...], etc. Les index négatifs codent
+undefined (-1), un trou (-2), NaN (-3), +/-Infinity (-4/-5) et -0 (-6).
+
+NuxtPayload résout les références à la demande avec mémoïsation, et
+find_values() récupère plusieurs clés en UN SEUL parcours (chaque élément du
+tableau est visité au plus une fois), avec le chemin de chaque valeur.
+Un JSON imbriqué classique (ancien window.__NUXT__) est aussi accepté.
+"""
+
+import json
+import math
+
+_NEGATIVE = {-1: None, -2: None, -3: math.nan, -4: math.inf, -5: -math.inf, -6: -0.0}
+
+# Types devalue/Nuxt qui enveloppent une seule valeur (transparents pour les chemins)
+_WRAPPERS = {"Reactive", "ShallowReactive", "Ref", "ShallowRef", "Object", "NuxtError", "Island"}
+
+
+def _is_devalue(data):
+    return isinstance(data, list) and bool(data) and isinstance(data[0], (dict, list))
+
+
+def _truthy(value):
+    return bool(value)
+
+
+class NuxtPayload:
+    def __init__(self, data):
+        self.data = data
+        self.flat = _is_devalue(data)
+        self._memo = {}
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(json.loads(text))
+
+    # --- Résolution (hydratation paresseuse) ---------------------------------
+
+    def resolve(self, index=0):
+        """Valeur Python complète de l'élément `index` (mémoïsée, cycles gérés)."""
+        if not self.flat:
+            return self.data
+        return self._hydrate(index)
+
+    def _hydrate(self, index):
+        if index < 0:
+            return _NEGATIVE.get(index)
+        if index in self._memo:
+            return self._memo[index]
+        raw = self.data[index]
+        if isinstance(raw, dict):
+            value = {}
+            self._memo[index] = value
+            for k, i in raw.items():
+                value[k] = self._hydrate(i)
+        elif isinstance(raw, list):
+            if raw and isinstance(raw[0], str):
+                value = self._hydrate_special(index, raw)
+            else:
+                value = []
+                self._memo[index] = value
+                value.extend(self._hydrate(i) for i in raw)
+        else:
+            value = raw
+        self._memo[index] = value
+        return value
+
+    def _hydrate_special(self, index, raw):
+        kind, args = raw[0], raw[1:]
+        if kind in _WRAPPERS:
+            return self._hydrate(args[0]) if args else None
+        if kind in ("EmptyRef", "EmptyShallowRef"):
+            text = self._hydrate(args[0]) if args else "_"
+            if text == "_" or not isinstance(text, str):
+                return None
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                return text
+        if kind in ("Date", "RegExp"):
+            return args[0] if args else None
+        if kind == "BigInt":
+            return int(args[0])
+        if kind == "Set":
+            value = []
+            self._memo[index] = value
+            value.extend(self._hydrate(i) for i in args)
+            return value
+        if kind == "Map":
+            value = {}
+            self._memo[index] = value
+            for k, v in zip(args[::2], args[1::2]):
+                key = self._hydrate(k)
+                value[key if isinstance(key, (str, int, float)) else json.dumps(key)] = self._hydrate(v)
+            return value
+        if kind == "null":
+            value = {}
+            self._memo[index] = value
+            for k, v in zip(args[::2], args[1::2]):
+                value[k] = self._hydrate(v)
+            return value
+        # Reducer inconnu : on garde la valeur enveloppée
+        return self._hydrate(args[0]) if args and isinstance(args[0], int) else list(raw)
+
+    # --- Parcours unique -------------------------------------------------------
+
+    def _children(self, node):
+        """
+        (clé, enfant) d'un nœud. En mode devalue, `node` est un index et les
+        enfants aussi ; les enveloppes (Reactive, Ref...) ont la clé None.
+        """
+        if not self.flat:
+            if isinstance(node, dict):
+                return list(node.items())
+            if isinstance(node, list):
+                return list(enumerate(node))
+            return []
+        if node < 0:
+            return []
+        raw = self.data[node]
+        if isinstance(raw, dict):
+            return list(raw.items())
+        if not isinstance(raw, list):
+            return []
+        if not raw or not isinstance(raw[0], str):
+            return list(enumerate(raw))
+        kind, args = raw[0], raw[1:]
+        if kind in _WRAPPERS or kind in ("EmptyRef", "EmptyShallowRef"):
+            return [(None, args[0])] if args and isinstance(args[0], int) else []
+        if kind == "Set":
+            return list(enumerate(args))
+        if kind == "Map":
+            return [(i, v) for i, v in enumerate(args[1::2])]
+        if kind == "null":
+            return list(zip(args[::2], args[1::2]))
+        return []
+
+    def _value(self, node):
+        return self._hydrate(node) if self.flat else node
+
+    def _node_at(self, path):
+        """Nœud au chemin `path` ("a.b.0", comme rendu par find_values), ou None."""
+        node = 0 if self.flat else self.data
+        for part in path.split(".") if path else ():
+            # Les enveloppes (clé None) sont transparentes, comme dans les chemins
+            children = self._children(node)
+            while len(children) == 1 and children[0][0] is None:
+                node = children[0][1]
+                children = self._children(node)
+            node = next((child for key, child in children if str(key) == part), None)
+            if node is None:
+                return None
+        return node
+
+    def find_values(self, keys, accept=None, within=None):
+        """
+        Première valeur acceptée pour chacune des `keys`, en un seul parcours en
+        profondeur (même ordre que l'ancien find_value récursif).
+        `accept` : {clé: prédicat(valeur) -> bool} ; par défaut valeur "vraie".
+        `within` : chemin d'un nœud (ex : le parent d'un "title" trouvé) ; seul
+        ce sous-arbre est parcouru.
+        Renvoie {clé: (valeur, chemin)} pour les clés trouvées ; chemin = "a.b.0.c"
+        (depuis la racine du document, même avec `within`).
+        """
+        accept = accept or {}
+        pending = set(keys)
+        found = {}
+        root = self._node_at(within) if within else (0 if self.flat else self.data)
+        if root is None:
+            return found
+        visited = {root} if self.flat else set()
+        base = tuple(within.split(".")) if within else ()
+        # Pile d'itérateurs sur les enfants : parcours préfixe, dans l'ordre du document
+        stack = [(iter(self._children(root)), base)]
+        while stack and pending:
+            children, path = stack[-1]
+            entry = next(children, None)
+            if entry is None:
+                stack.pop()
+                continue
+            key, child = entry
+            child_path = path if key is None else path + (key,)
+            if key in pending:
+                value = self._value(child)
+                if accept.get(key, _truthy)(value):
+                    found[key] = (value, ".".join(str(p) for p in child_path))
+                    pending.discard(key)
+            if self.flat:
+                # Une valeur partagée (même index) n'est parcourue qu'une fois
+                if child in visited:
+                    continue
+                visited.add(child)
+            elif not isinstance(child, (dict, list)):
+                continue
+            stack.append((iter(self._children(child)), child_path))
+        return found
@@ -0,0 +1,241 @@
+"""
+Sortie en streaming JSONL avec reprise (--resume).
+
+- Chaque film exploitable est ajouté immédiatement comme une ligne JSON
+  (flush à chaque ligne, fsync toutes les `fsync_every` lignes)
+- --resume relit le JSONL existant et saute les URLs déjà traitées
+- En fin de run, compaction du JSONL vers import_films.json (tableau JSON
+  indenté, le format attendu par l'import admin) et, avec --parquet, export
+  colonnaire import_films.parquet (scraping.catalog)
+
+Les clés commençant par "_" (ex : "_url", l'URL de la fiche) servent à la
+reprise et sont retirées lors de la compaction.
+"""
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_JSON_PATH = "import_films.json"
+DEFAULT_FSYNC_EVERY = 10
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+def jsonl_path_for(json_path):
+    """import_films.json -> import_films.jsonl"""
+    root, _ = os.path.splitext(json_path)
+    return root + ".jsonl"
+
+
+def parquet_path_for(json_path):
+    """import_films.json -> import_films.parquet"""
+    root, _ = os.path.splitext(json_path)
+    return root + ".parquet"
+
+
+def iter_jsonl(path):
+    """
+    Lit un fichier JSONL ligne par ligne. Les lignes illisibles (ex : dernière
+    ligne tronquée par un crash) sont ignorées.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                log(f"Ligne JSONL illisible ignorée dans {path}")
+
+
+def load_done_urls(path):
+    """URLs de fiches déjà présentes dans le JSONL (pour --resume)."""
+    return {record["_url"] for record in iter_jsonl(path) if record.get("_url")}
+
+
+class JsonlWriter:
+    """
+    Ajoute un enregistrement par ligne. Utilisable comme context manager.
+    `done_urls` contient les URLs déjà écrites (run précédent inclus si resume=True).
+    write() peut être appelé depuis plusieurs threads (sources HTTP d'ingest.py).
+    """
+
+    def __init__(self, path, resume=False, fsync_every=DEFAULT_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.done_urls = load_done_urls(path) if resume else set()
+        self.count = 0
+        self._pending = 0
+        self._file = None
+        self._mode = "a" if resume else "w"
+        self._lock = threading.Lock()
+
+    def open(self):
+        needs_newline = False
+        if self._mode == "a" and os.path.exists(self.path) and os.path.getsize(self.path):
+            # Un crash a pu laisser une dernière ligne tronquée : on repart sur une ligne neuve
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(self.path, self._mode, encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+        return self
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if record.get("_url"):
+                self.done_urls.add(record["_url"])
+            self.count += 1
+            self._pending += 1
+            if self._pending >= self.fsync_every:
+                self.sync()
+
+    def sync(self):
+        if self._file and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        if self._file:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TaggedSink:
+    """
+    Vue sur un JsonlWriter partagé qui ajoute "source" à chaque enregistrement
+    (sortie fusionnée d'ingest.py). `count` ne compte que les films de cette source.
+    """
+
+    def __init__(self, writer, source):
+        self.writer = writer
+        self.source = source
+        self.count = 0
+
+    @property
+    def done_urls(self):
+        return self.writer.done_urls
+
+    def write(self, record):
+        record.setdefault("source", self.source)
+        self.writer.write(record)
+        self.count += 1
+
+
+def rewrite_jsonl(path, update):
+    """
+    Réécrit le JSONL en passant chaque enregistrement à `update(record)` (qui le
+    modifie sur place). Fichier temporaire puis rename : un crash laisse
+    l'ancien fichier intact.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        for record in iter_jsonl(path):
+            update(record)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+def public_fields(record):
+    return {k: v for k, v in record.items() if not k.startswith("_")}
+
+
+def iter_unique(jsonl_path, keep=None):
+    """
+    Enregistrements du JSONL sans doublons d'URL de fiche (première occurrence
+    gardée), ni ceux refusés par `keep(record)` si fourni.
+    """
+    seen = set()
+    for record in iter_jsonl(jsonl_path):
+        if keep is not None and not keep(record):
+            continue
+        url = record.get("_url")
+        if url:
+            if url in seen:
+                continue
+            seen.add(url)
+        yield record
+
+
+def compact(jsonl_path, json_path, keep=None):
+    """
+    Réécrit le JSONL en tableau JSON pour l'import admin, sans charger tout le
+    fichier en mémoire. Les doublons d'URL sont écartés (voir iter_unique),
+    ainsi que les enregistrements refusés par `keep(record)` si fourni.
+    Renvoie le nombre de films écrits.
+    """
+    count = 0
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write("[")
+        for record in iter_unique(jsonl_path, keep):
+            out.write(",\n  " if count else "\n  ")
+            body = json.dumps(public_fields(record), ensure_ascii=False, indent=2)
+            out.write(body.replace("\n", "\n  "))
+            count += 1
+        out.write("\n]" if count else "]")
+    os.replace(tmp_path, json_path)
+    return count
+
+
+def add_output_arguments(parser):
+    """Options de sortie communes (--output, --resume, --fsync-every)."""
+    parser.add_argument("--output", default=DEFAULT_JSON_PATH,
+                        help=f"Fichier JSON final (défaut : {DEFAULT_JSON_PATH}). "
+                             "Le JSONL de travail est écrit à côté (.jsonl).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprend un run interrompu : saute les fiches déjà présentes dans le JSONL.")
+    parser.add_argument("--fsync-every", type=int, default=DEFAULT_FSYNC_EVERY,
+                        help=f"fsync du JSONL toutes les N fiches (défaut : {DEFAULT_FSYNC_EVERY}).")
+    parser.add_argument("--parquet", nargs="?", const="", default=None, metavar="PATH",
+                        help="Exporte aussi le catalogue en Parquet (défaut si l'option est seule : "
+                             "à côté du JSON, .parquet ; demande pyarrow).")
+    return parser
+
+
+def open_writer(args):
+    """JsonlWriter configuré depuis les options de add_output_arguments()."""
+    path = jsonl_path_for(args.output)
+    writer = JsonlWriter(path, resume=args.resume, fsync_every=args.fsync_every)
+    if args.resume:
+        log(f"Reprise : {len(writer.done_urls)} fiches déjà traitées dans {path}")
+    return writer
+
+
+def finalize(args, dedup=None, source=None):
+    """
+    Compaction du JSONL vers le fichier JSON final (et l'export Parquet avec --parquet).
+    Les films du fichier final sont ensuite ajoutés à `dedup` (scraping.dedup.DedupIndex),
+    avec `source` pour ceux qui n'ont pas de champ "source".
+    """
+    jsonl_path = jsonl_path_for(args.output)
+    count = compact(jsonl_path, args.output)
+    log(f"{count} films exploitables.")
+    log(f"Fichier {args.output} généré !")
+    if dedup is not None:
+        log(f"Index des films ingérés : {dedup.add_records(iter_unique(jsonl_path), source)} films enregistrés.")
+    if args.parquet is not None:
+        # Import ici : pyarrow n'est chargé qu'avec --parquet
+        from scraping import catalog
+        path = args.parquet or parquet_path_for(args.output)
+        written, rejected = catalog.export(iter_unique(jsonl_path), path)
+        log(f"Catalogue {path} généré : {written} films, {rejected} écartés.")
+    return count
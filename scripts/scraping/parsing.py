@@ -0,0 +1,143 @@
+"""
+Extraction HTML ciblée avec backend interchangeable.
+
+Backends, du plus rapide au plus lent (le premier disponible est pris par défaut) :
+- "selectolax" : pip install selectolax (parseur lexbor)
+- "lxml"       : pip install lxml cssselect
+- "bs4"        : BeautifulSoup + html.parser, avec SoupStrainer pour ne
+                 construire que les balises utiles (toujours disponible)
+
+Les scripts décrivent ce qu'ils veulent lire avec des Field, et extract()
+fait un seul parsing par page :
+
+    extract(html, {
+        "title": Field("h1"),
+        "magnet": Field('a[href^="magnet:"]', attr="href"),
+    })
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+# selector : sélecteur CSS ; attr : attribut à lire (None = texte) ; many : tous les éléments
+Field = namedtuple("Field", ["selector", "attr", "many"], defaults=(None, False))
+
+_TAG_RE = re.compile(r"^\s*([a-zA-Z][a-zA-Z0-9]*)")
+
+
+def _selectolax(html, fields):
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html)
+    out = {}
+    for name, field in fields.items():
+        nodes = tree.css(field.selector) if field.many else [tree.css_first(field.selector)]
+        values = []
+        for node in nodes:
+            if node is None:
+                continue
+            value = node.text().strip() if field.attr is None else node.attributes.get(field.attr)
+            if value:
+                values.append(value)
+        out[name] = values if field.many else (values[0] if values else None)
+    return out
+
+
+@lru_cache(maxsize=64)
+def _lxml_selector(selector):
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(selector)
+
+
+def _lxml(html, fields):
+    import lxml.html
+    tree = lxml.html.fromstring(html)
+    out = {}
+    for name, field in fields.items():
+        nodes = _lxml_selector(field.selector)(tree)
+        if not field.many:
+            nodes = nodes[:1]
+        values = []
+        for node in nodes:
+            value = node.text_content().strip() if field.attr is None else node.get(field.attr)
+            if value:
+                values.append(value)
+        out[name] = values if field.many else (values[0] if values else None)
+    return out
+
+
+def _bs4(html, fields):
+    from bs4 import BeautifulSoup, SoupStrainer
+    tags = {_tag_name(field.selector) for field in fields.values()}
+    # Ne construit l'arbre que pour les balises visées (ex : "a", "h1") si on les connaît
+    strainer = SoupStrainer(list(tags)) if None not in tags else None
+    soup = BeautifulSoup(html, "html.parser", parse_only=strainer)
+    out = {}
+    for name, field in fields.items():
+        nodes = soup.select(field.selector) if field.many else [soup.select_one(field.selector)]
+        values = []
+        for node in nodes:
+            if node is None:
+                continue
+            value = node.get_text().strip() if field.attr is None else node.get(field.attr)
+            if value:
+                values.append(value)
+        out[name] = values if field.many else (values[0] if values else None)
+    return out
+
+
+_EXTRACTORS = {"selectolax": _selectolax, "lxml": _lxml, "bs4": _bs4}
+
+
+def _tag_name(selector):
+    """Balise de tête d'un sélecteur simple ("a[href^=...]" -> "a"), sinon None."""
+    if "," in selector or " " in selector.strip() or ">" in selector:
+        return None
+    match = _TAG_RE.match(selector)
+    return match.group(1).lower() if match else None
+
+
+def available_backends():
+    found = []
+    for name in BACKENDS:
+        try:
+            if name == "selectolax":
+                import selectolax.lexbor  # noqa: F401
+            elif name == "lxml":
+                import lxml.html  # noqa: F401
+                import lxml.cssselect  # noqa: F401
+            else:
+                import bs4  # noqa: F401
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+_default_backend = None
+
+
+def default_backend():
+    global _default_backend
+    if _default_backend is None:
+        backends = available_backends()
+        if not backends:
+            raise ImportError("Aucun parseur HTML : pip install selectolax (ou lxml cssselect, ou beautifulsoup4)")
+        _default_backend = backends[0]
+    return _default_backend
+
+
+def extract(html, fields, backend=None):
+    """
+    Parse `html` une seule fois et renvoie {nom: valeur} pour chaque Field.
+    Valeur : str ou None, ou liste de str si Field(many=True).
+    """
+    return _EXTRACTORS[backend or default_backend()](html, fields)
+
+
+def add_parser_arguments(parser):
+    parser.add_argument("--parser", choices=BACKENDS, default=None,
+                        help="Backend HTML (défaut : le plus rapide installé).")
+    return parser
@@ -0,0 +1,262 @@
+"""
+Profilage des runs d'ingestion (--profile).
+
+- Échantillonnage (défaut) : un thread relève toutes les `interval` secondes
+  la pile Python de chaque thread (sys._current_frames). Les threads au repos
+  (boucle asyncio en attente d'I/O, threads du pool sans tâche) ne sont pas
+  comptés. Sortie au format "folded" (une pile par ligne suivie du nombre
+  d'échantillons), lue par flamegraph.pl, inferno ou speedscope :
+      flamegraph.pl mirror66.folded > mirror66.svg
+  Un fichier par source : un échantillon va à la source dont le module est
+  dans la pile (get_film_links, process_film, voie HTTP, ingest HTTP) ; le
+  reste (moteur, boucle asyncio, Playwright, écriture JSONL) va dans
+  commun.folded
+- cProfile (--profiler cprofile) : profil déterministe du thread principal
+  dans run.prof (snakeviz, pstats, flameprof) ; plus lent, sans découpage
+  par source ni threads
+- Appels Playwright, dans les deux modes : chaque message envoyé au
+  navigateur est compté par source et par méthode ("ElementHandle.getAttribute"...)
+  et rapporté au nombre de navigations (goto) de la source : calls.json et
+  résumé dans le log. Un getAttribute par élément d'un listing ressort en
+  dizaines d'appels par page, à regrouper en un seul evaluate()
+
+Les fichiers d'un run vont dans <dossier>/<nom>-<date>/.
+Le comptage Playwright passe par une API interne (Connection) : si elle
+change, il est désactivé avec un message et le profil est écrit quand même.
+"""
+
+import collections
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+from scraping import metrics
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   ".cache", "profiles")
+DEFAULT_INTERVAL = 0.005  # secondes entre deux échantillons
+SHARED = "commun"
+
+# Dernière fonction Python d'un thread qui attend sans rien faire
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),   # boucle asyncio sans événement
+    ("thread.py", "_worker"),     # thread de ThreadPoolExecutor sans tâche
+    ("threading.py", "wait"),     # Event / Condition
+    ("queue.py", "get"),
+    ("pool.py", "worker"),        # multiprocessing.Pool
+}
+
+
+def log(msg):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+
+class PlaywrightCalls:
+    """Compte les messages du protocole Playwright par (source, méthode)."""
+
+    def __init__(self):
+        self.calls = collections.Counter()        # (source, "Type.méthode") -> appels
+        self.navigations = collections.Counter()  # source -> goto
+        self._original = None
+
+    def install(self):
+        try:
+            from playwright._impl._connection import Connection
+        except ImportError:
+            return self
+        original = getattr(Connection, "_send_message_to_server", None)
+        if original is None:
+            log("Profil : comptage des appels Playwright indisponible avec cette version.")
+            return self
+        calls = self
+
+        def send(connection, target, method, *args, **kwargs):
+            calls.record(target, method)
+            return original(connection, target, method, *args, **kwargs)
+
+        self._original = original
+        Connection._send_message_to_server = send
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            from playwright._impl._connection import Connection
+            Connection._send_message_to_server = self._original
+            self._original = None
+
+    def record(self, target, method):
+        # `target` : objet Playwright (Page, Frame, ElementHandle...), ou son guid selon la version
+        kind = target.split("@")[0] if isinstance(target, str) else type(target).__name__
+        source = metrics.current_source()
+        self.calls[(source, f"{kind}.{method}")] += 1
+        if method == "goto":
+            self.navigations[source] += 1
+
+    def summary_lines(self, top=8):
+        by_source = collections.defaultdict(list)
+        for (source, method), n in self.calls.items():
+            by_source[source].append((n, method))
+        lines = []
+        for source, items in sorted(by_source.items()):
+            pages = self.navigations[source]
+            lines.append(f"{source} : {sum(n for n, _ in items)} appels, {pages} navigations")
+            for n, method in sorted(items, reverse=True)[:top]:
+                per_page = f"  {n / pages:.1f}/page" if pages else ""
+                lines.append(f"  {method:<36} {n:>7}{per_page}")
+        return lines
+
+    def to_dict(self):
+        sources = {}
+        for (source, method), n in self.calls.items():
+            sources.setdefault(source, {"navigations": self.navigations[source], "calls": {}})
+            sources[source]["calls"][method] = n
+        return sources
+
+
+class Sampler:
+    """Piles Python de tous les threads, relevées toutes les `interval` secondes."""
+
+    def __init__(self, sources=None, interval=DEFAULT_INTERVAL):
+        # Nom de module -> source, pour attribuer chaque pile
+        self.modules = {module: source for source, module in (sources or {}).items()}
+        self.interval = interval
+        self.stacks = collections.Counter()  # (source, pile) -> échantillons
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label.replace(";", ",")
+        return label
+
+    def sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            source = None
+            labels = []
+            while frame is not None:
+                if source is None:
+                    source = self.modules.get(frame.f_globals.get("__name__"))
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}").replace(";", ","))
+            self.stacks[(source or SHARED, ";".join(reversed(labels)))] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, directory):
+        """Un fichier <source>.folded par source ; renvoie leurs chemins."""
+        by_source = collections.defaultdict(list)
+        for (source, stack), n in self.stacks.items():
+            by_source[source].append(f"{stack} {n}")
+        paths = []
+        for source, lines in sorted(by_source.items()):
+            path = os.path.join(directory, f"{source}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(sorted(lines)) + "\n")
+            paths.append(path)
+        return paths
+
+    def top_lines(self, top=8):
+        """Fonctions le plus souvent en haut de pile (temps propre), toutes sources confondues."""
+        leaves = collections.Counter()
+        for (_, stack), n in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        return [f"{n / self.samples:>6.1%}  {label}" for label, n in leaves.most_common(top)]
+
+
+class Profiler:
+    """
+    Profil d'un run : échantillonnage ("sample") ou cProfile ("cprofile"),
+    plus le comptage des appels Playwright. Fichiers écrits dans `directory`.
+    `sources` : {source: nom du module} pour découper les piles par source.
+    """
+
+    def __init__(self, directory, sources=None, mode="sample", interval=DEFAULT_INTERVAL):
+        self.directory = directory
+        self.mode = mode
+        self.sampler = Sampler(sources, interval) if mode == "sample" else None
+        self.cprofile = cProfile.Profile() if mode == "cprofile" else None
+        self.playwright = PlaywrightCalls()
+        self._start = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.playwright.install()
+        self._start = time.monotonic()
+        if self.sampler is not None:
+            self.sampler.start()
+        else:
+            self.cprofile.enable()
+        return self
+
+    def stop(self):
+        """Arrête le profil, écrit les fichiers et le résumé dans le log."""
+        if self.sampler is not None:
+            self.sampler.stop()
+        else:
+            self.cprofile.disable()
+        self.playwright.uninstall()
+        elapsed = time.monotonic() - self._start
+        if self.sampler is not None:
+            paths = self.sampler.write(self.directory)
+            log(f"Profil : {self.sampler.samples} échantillons en {elapsed:.0f}s -> "
+                f"{', '.join(os.path.basename(p) for p in paths) or 'aucun'} dans {self.directory}")
+            for line in self.sampler.top_lines():
+                log(f"  {line}")
+        else:
+            path = os.path.join(self.directory, "run.prof")
+            self.cprofile.dump_stats(path)
+            log(f"Profil cProfile : {path} ({elapsed:.0f}s)")
+        if self.playwright.calls:
+            with open(os.path.join(self.directory, "calls.json"), "w", encoding="utf-8") as f:
+                json.dump(self.playwright.to_dict(), f, ensure_ascii=False, indent=2)
+            log("Appels Playwright par source (méthodes les plus appelées) :")
+            for line in self.playwright.summary_lines():
+                log(f"  {line}")
+
+
+def add_profile_arguments(parser):
+    """Options de profilage (--profile, --profiler, --profile-interval)."""
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, default=None, metavar="DIR",
+                        help="Profile le run : piles par source au format flamegraph et appels "
+                             "Playwright par page (défaut si l'option est seule : scripts/.cache/profiles).")
+    parser.add_argument("--profiler", choices=("sample", "cprofile"), default="sample",
+                        help="Échantillonnage de tous les threads (défaut) ou cProfile du thread principal.")
+    parser.add_argument("--profile-interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Secondes entre deux échantillons (défaut : {DEFAULT_INTERVAL}).")
+    return parser
+
+
+def open_profiler(args, name, sources=None):
+    """Profiler configuré depuis les options de add_profile_arguments() (None sans --profile)."""
+    if not args.profile:
+        return None
+    directory = os.path.join(args.profile, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    return Profiler(directory, sources, args.profiler, args.profile_interval)
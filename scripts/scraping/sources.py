@@ -0,0 +1,37 @@
+"""
+Registre des sources d'ingestion utilisées par ingest.py.
+
+Chaque script existant est un adaptateur :
+- "browser" : le module expose SOURCE (engine.Source), traité par engine.run_source
+  sur le navigateur partagé du run
+- "http"    : le module expose ingest(client, sink, backend), exécuté dans un
+  thread avec le HttpClient partagé
+
+Les modules ne sont importés qu'à la demande (load()) : Playwright n'est
+chargé que si une source "browser" est sélectionnée.
+"""
+
+import importlib
+from collections import namedtuple
+
+SourceSpec = namedtuple("SourceSpec", ["module", "kind", "description"])
+
+SOURCES = {
+    "torrent9": SourceSpec("fetch_torrent9_titles_and_magnets", "http",
+                           "Torrent9 : titre + magnet (requests)"),
+    "moviebox_nuxt": SourceSpec("fetch_moviebox_nuxt", "browser",
+                                "MovieBox : titre + vidéo depuis __NUXT_DATA__ (HTTP, navigateur en repli)"),
+    "moviebox_downloads": SourceSpec("fetch_moviebox_downloads", "browser",
+                                     "MovieBox : lien de téléchargement de <video>"),
+    "mirror66": SourceSpec("fetch_mirror66_minimal", "browser",
+                           "Mirror66 : iframes des onglets de lecteurs"),
+}
+
+
+def load(name):
+    """Module adaptateur de la source `name` (importé à ce moment-là)."""
+    return importlib.import_module(SOURCES[name].module)
+
+
+def describe():
+    return "\n".join(f"  {name:<20} {spec.description}" for name, spec in SOURCES.items())
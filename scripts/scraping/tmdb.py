@@ -0,0 +1,233 @@
+"""
+Correspondance des titres scrapés avec TMDB (/search/movie), avec cache SQLite.
+
+- Titres nettoyés (étiquettes de release "FRENCH", "1080p", "WEBRIP"... retirées)
+  puis normalisés comme l'index de dédoublonnage (scraping.dedup) : une seule
+  recherche par couple (titre normalisé, année) pour tout le fichier
+- Recherches en parallèle sur les threads de HttpClient, au rythme maximal de
+  `rate` requêtes/s (scraping.backoff, qui suit aussi les 429 / Retry-After)
+- Cache persistant scripts/.cache/tmdb.sqlite indexé par (titre normalisé, année) :
+  un titre déjà cherché ne coûte aucune requête ; une absence de résultat n'est
+  gardée que `miss_ttl` secondes (le film peut être ajouté à TMDB plus tard)
+- Choix du résultat : titre ou titre original le plus proche (difflib, 1.0 si
+  identique une fois normalisé), année à un an près si elle est connue ; en
+  dessous de `min_score`, pas de correspondance
+
+Les champs rendus reprennent ceux de l'ajout manuel dans l'admin
+(components/admin/films/FilmModal.tsx) : tmdb_id, year, release_date,
+description, poster, backdrop, vote_average, vote_count, popularity, language.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from difflib import SequenceMatcher
+
+import requests
+
+from scraping.dedup import normalize_title, split_year
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+POSTER_URL = "https://image.tmdb.org/t/p/w500"
+BACKDROP_URL = "https://image.tmdb.org/t/p/w780"
+
+DEFAULT_TMDB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 ".cache", "tmdb.sqlite")
+DEFAULT_MISS_TTL = 7 * 24 * 3600  # secondes
+DEFAULT_MIN_SCORE = 0.85
+DEFAULT_LANGUAGE = "fr-FR"
+
+# Début des étiquettes de release : tout ce qui suit est ignoré pour la recherche
+_RELEASE_TAG_RE = re.compile(
+    r"\b(?:true)?french\b|\b(?:vff|vfq|vf2?|vostfr|multi|subfrench|4k|uhd|hdr|hdlight|hdrip|"
+    r"webrip|web[- ]?dl|bluray|brrip|bdrip|dvdrip|hdtv|remux|x26[45]|h\.?26[45]|hevc|"
+    r"(?:480|720|1080|2160)p)\b",
+    re.IGNORECASE,
+)
+_YEAR_RE = re.compile(r"\b((?:19|20)\d{2})\b")
+# Clé v3 dans l'URL d'une requête (messages d'erreur de requests)
+_API_KEY_RE = re.compile(r"(api_key=)[^&\s'\"]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    title_key TEXT NOT NULL,
+    year INTEGER NOT NULL,  -- 0 : année inconnue
+    tmdb_id INTEGER,        -- NULL : pas de correspondance
+    data TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (title_key, year)
+);
+"""
+
+
+def search_key(title):
+    """
+    (texte à chercher, titre normalisé, année) d'un titre scrapé, ou None.
+    "Dune Part Two FRENCH WEBRIP 1080p 2024" -> ("Dune Part Two", "dune part two", 2024)
+    """
+    if not title:
+        return None
+    year = None
+    tag = _RELEASE_TAG_RE.search(title)
+    if tag and tag.start() > 0:
+        tail_year = _YEAR_RE.search(title, tag.start())
+        year = int(tail_year.group(1)) if tail_year else None
+        title = title[:tag.start()]
+    query, suffix_year = split_year(title.strip(" -.[("))
+    title_key, _ = normalize_title(query)
+    if not title_key:
+        return None
+    return query.strip(), title_key, suffix_year or year
+
+
+def _year_of(result):
+    date = result.get("release_date") or ""
+    return int(date[:4]) if date[:4].isdigit() else None
+
+
+def score(result, title_key, year=None):
+    """Proximité entre un résultat TMDB et le titre cherché (0 si l'année est trop loin)."""
+    result_year = _year_of(result)
+    if year and result_year and abs(result_year - year) > 1:
+        return 0.0
+    keys = {normalize_title(result.get(f))[0] for f in ("title", "original_title")} - {None}
+    best = max((SequenceMatcher(None, title_key, k).ratio() for k in keys), default=0.0)
+    # À titre égal, l'année exacte départage (remakes)
+    return best + (0.01 if year and result_year == year else 0.0)
+
+
+def best_match(results, title_key, year=None, min_score=DEFAULT_MIN_SCORE):
+    """(résultat, score) le plus proche, dans l'ordre TMDB à score égal ; (None, 0) sinon."""
+    best, best_score = None, 0.0
+    for result in results:
+        s = score(result, title_key, year)
+        if s > best_score:
+            best, best_score = result, s
+    return (best, best_score) if best_score >= min_score else (None, best_score)
+
+
+def film_fields(result):
+    """Champs de la table films tirés d'un résultat de /search/movie."""
+    fields = {
+        "tmdb_id": result["id"],
+        "year": _year_of(result),
+        "release_date": result.get("release_date") or None,
+        "description": result.get("overview") or None,
+        "poster": POSTER_URL + result["poster_path"] if result.get("poster_path") else None,
+        "backdrop": BACKDROP_URL + result["backdrop_path"] if result.get("backdrop_path") else None,
+        "vote_average": result.get("vote_average"),
+        "vote_count": result.get("vote_count"),
+        "popularity": result.get("popularity"),
+        "language": result.get("original_language"),
+    }
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+class TmdbCache:
+    """Correspondances déjà cherchées, par (titre normalisé, année). Sûr entre threads."""
+
+    def __init__(self, path=DEFAULT_TMDB_PATH, miss_ttl=DEFAULT_MISS_TTL):
+        self.path = path
+        self.miss_ttl = miss_ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, title_key, year):
+        """(trouvé dans le cache, correspondance ou None)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tmdb_id, data, fetched_at FROM matches WHERE title_key = ? AND year = ?",
+                (title_key, year or 0),
+            ).fetchone()
+        if not row:
+            return False, None
+        tmdb_id, data, fetched_at = row
+        if tmdb_id is None:
+            return time.time() - fetched_at < self.miss_ttl, None
+        return True, json.loads(data)
+
+    def put(self, title_key, year, match):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO matches (title_key, year, tmdb_id, data, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (title_key, year or 0, match["tmdb_id"] if match else None,
+                 json.dumps(match, ensure_ascii=False) if match else None, time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _auth(api_key):
+    """(paramètres, en-têtes) : jeton de lecture v4 (JWT "eyJ...") en Bearer, clé v3 en api_key."""
+    if api_key.startswith("eyJ"):
+        return {}, {"Authorization": f"Bearer {api_key}"}
+    return {"api_key": api_key}, {}
+
+
+def redact(text, api_key=None):
+    """`text` sans la clé API (paramètre api_key des URLs, et la clé elle-même si fournie)."""
+    text = _API_KEY_RE.sub(r"\1***", str(text))
+    return text.replace(api_key, "***") if api_key else text
+
+
+def search(client, query, api_key, base_url=TMDB_BASE_URL, language=DEFAULT_LANGUAGE):
+    """
+    Résultats bruts de /search/movie pour `query` (client : scraping.http_client.HttpClient).
+    Les erreurs requests sont relancées avec la clé API masquée dans le message.
+    """
+    params, headers = _auth(api_key)
+    params.update(query=query, language=language, include_adult="false")
+    try:
+        response = client.get(f"{base_url.rstrip('/')}/search/movie", params=params, headers=headers)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        # Même type (classify, 429...) et même réponse ; "from None" : l'original garde l'URL
+        raise type(e)(redact(e, api_key), response=e.response, request=e.request) from None
+    return response.json().get("results") or []
+
+
+def lookup(client, key, api_key, base_url=TMDB_BASE_URL, language=DEFAULT_LANGUAGE,
+           min_score=DEFAULT_MIN_SCORE):
+    """
+    Correspondance pour `key` (voir search_key) : champs de film_fields() plus
+    "_tmdb" (titre TMDB et score, pour contrôle), ou None.
+    """
+    query, title_key, year = key
+    result, best = best_match(search(client, query, api_key, base_url, language),
+                              title_key, year, min_score)
+    if result is None:
+        return None
+    match = film_fields(result)
+    match["_tmdb"] = {"title": result.get("title"), "score": round(min(best, 1.0), 3)}
+    return match
+
+
+def match_keys(client, keys, cache=None, refresh=False, **kwargs):
+    """
+    Cherche les `keys` (voir search_key) absentes du cache (toutes si `refresh`),
+    en parallèle. Génère (clé, correspondance ou None, depuis_le_cache, erreur)
+    au fil de l'eau. Les erreurs (réseau, quota) ne sont pas mises en cache.
+    """
+    todo = []
+    # Une recherche par (titre normalisé, année), avec le premier texte rencontré
+    for key in {key[1:]: key for key in reversed(list(keys))}.values():
+        found, match = cache.get(key[1], key[2]) if cache is not None and not refresh else (False, None)
+        if found:
+            yield key, match, True, None
+        else:
+            todo.append(key)
+    for key, match, error in client.map(lambda k: lookup(client, k, **kwargs), todo):
+        if error is None and cache is not None:
+            cache.put(key[1], key[2], match)
+        yield key, match, False, error
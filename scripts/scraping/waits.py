@@ -0,0 +1,126 @@
+"""
+Attentes événementielles pour les extracteurs Playwright.
+
+Remplacent les time.sleep fixes : chaque attente rend la main dès que la
+condition est vraie, avec un timeout, et renvoie le temps réellement attendu.
+Toutes les fonctions renvoient un tuple (valeur, secondes_attendues) ;
+la valeur vaut None si le timeout est atteint. La durée est aussi
+enregistrée dans scraping.metrics (étape "wait").
+"""
+
+import time
+
+from playwright.async_api import TimeoutError as PWTimeout
+
+from scraping import metrics
+from scraping.engine import log
+
+DEFAULT_TIMEOUT = 10000  # ms, comme Playwright
+
+# Src de la première iframe http(s) de la page, ou null
+_IFRAME_SRC_JS = """
+() => {
+    const src = [...document.querySelectorAll('iframe')]
+        .map(f => f.getAttribute('src'))
+        .find(src => src && src.startsWith('http'));
+    return src || null;
+}
+"""
+
+
+async def wait_for_function(page, expression, arg=None, timeout=DEFAULT_TIMEOUT, label="condition"):
+    """
+    Attend que `expression` (fonction JS) renvoie une valeur non nulle.
+    Renvoie (valeur, secondes_attendues).
+    """
+    start = time.monotonic()
+    try:
+        handle = await page.wait_for_function(expression, arg=arg, timeout=timeout)
+        value = await handle.json_value()
+    except PWTimeout:
+        value = None
+    elapsed = time.monotonic() - start
+    metrics.observe("wait", elapsed, ok=value is not None)
+    if value is None:
+        log(f"    ~ {label} : timeout après {elapsed:.2f}s")
+    else:
+        log(f"    ~ {label} : {elapsed:.2f}s")
+    return value, elapsed
+
+
+async def wait_for_selector(page, selector, timeout=DEFAULT_TIMEOUT, state="attached"):
+    """Attend qu'un élément correspondant à `selector` existe. Renvoie (element, secondes)."""
+    start = time.monotonic()
+    try:
+        element = await page.wait_for_selector(selector, timeout=timeout, state=state)
+    except PWTimeout:
+        element = None
+    elapsed = time.monotonic() - start
+    metrics.observe("wait", elapsed, ok=element is not None)
+    if element is None:
+        log(f"    ~ {selector} : timeout après {elapsed:.2f}s")
+    else:
+        log(f"    ~ {selector} : {elapsed:.2f}s")
+    return element, elapsed
+
+
+async def current_iframe_src(page):
+    return await page.evaluate(_IFRAME_SRC_JS)
+
+
+async def wait_for_iframe_src_change(page, previous_src, timeout=DEFAULT_TIMEOUT):
+    """Attend que le src de l'iframe du lecteur soit une URL http différente de `previous_src`."""
+    return await wait_for_function(
+        page,
+        f"previous => {{ const src = ({_IFRAME_SRC_JS})(); return src && src !== previous ? src : null; }}",
+        arg=previous_src,
+        timeout=timeout,
+        label="iframe src",
+    )
+
+
+async def wait_for_video_src(page, selector="video.art-video", timeout=DEFAULT_TIMEOUT):
+    """Attend que la balise <video> ait un src http. Renvoie (src, secondes)."""
+    return await wait_for_function(
+        page,
+        """selector => {
+            const video = document.querySelector(selector);
+            const src = video && (video.getAttribute('src') || video.currentSrc);
+            return src && src.startsWith('http') ? src : null;
+        }""",
+        arg=selector,
+        timeout=timeout,
+        label=f"{selector} src",
+    )
+
+
+async def wait_for_nuxt_data(page, timeout=DEFAULT_TIMEOUT):
+    """Attend le script __NUXT_DATA__ et renvoie son contenu texte brut (ou None)."""
+    return await wait_for_function(
+        page,
+        """() => {
+            const script = document.querySelector('script#__NUXT_DATA__');
+            return script && script.textContent ? script.textContent : null;
+        }""",
+        timeout=timeout,
+        label="__NUXT_DATA__",
+    )
+
+
+async def scroll_for_more(page, selector, previous_count, timeout=DEFAULT_TIMEOUT):
+    """
+    Défilement infini : descend en bas de page et attend que `selector` compte
+    plus de `previous_count` éléments. Renvoie (nouveau_compte, secondes) ;
+    None si rien de nouveau n'est apparu (fin du catalogue).
+    """
+    await page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+    return await wait_for_function(
+        page,
+        """([selector, previous]) => {
+            const count = document.querySelectorAll(selector).length;
+            return count > previous ? count : null;
+        }""",
+        arg=[selector, previous_count],
+        timeout=timeout,
+        label="défilement",
+    )
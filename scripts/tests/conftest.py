@@ -0,0 +1,13 @@
+"""
+Tests des scripts d'ingestion : cd scripts && python -m pytest
+
+Les scripts s'importent comme depuis scripts/ (from scraping import ...).
+Les tests Postgres utilisent $TEST_DATABASE_URL et sont sautés sans lui.
+"""
+
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
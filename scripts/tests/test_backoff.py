@@ -0,0 +1,150 @@
+import pytest
+import requests
+
+from scraping import backoff
+from scraping.backoff import HostScheduler, HostUnavailable
+
+URL = "https://hote.example/film/1"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(backoff.time, "monotonic", clock)
+    return clock
+
+
+def trip(scheduler, n):
+    for _ in range(n):
+        scheduler.reserve(URL)
+        scheduler.record(URL, backoff.SERVER)
+
+
+@pytest.mark.parametrize("status, kind", [
+    (200, backoff.OK), (304, backoff.OK), (404, backoff.NOT_FOUND), (410, backoff.NOT_FOUND),
+    (400, backoff.CLIENT), (403, backoff.BLOCKED), (429, backoff.BLOCKED), (503, backoff.SERVER),
+])
+def test_classify_status(status, kind):
+    assert backoff.classify(status=status) == kind
+
+
+def test_classify_errors():
+    assert backoff.classify(requests.ReadTimeout()) == backoff.TIMEOUT
+    assert backoff.classify(requests.ConnectionError("Connection refused")) == backoff.NETWORK
+    assert backoff.classify(ValueError("sélecteur")) == backoff.CLIENT
+
+
+def test_slowdown_and_recovery(clock):
+    scheduler = HostScheduler(max_failures=10, min_interval=0.0)
+    assert scheduler.reserve(URL) == 0
+    scheduler.record(URL, backoff.BLOCKED, retry_after=5)
+    assert scheduler.reserve(URL) == 5          # Retry-After respecté
+    assert scheduler.reserve(URL) == 5.5        # intervalle : premier palier
+    scheduler.record(URL, backoff.OK)
+    assert scheduler.reserve("https://autre.example/") == 0  # les autres hôtes ne sont pas freinés
+    assert scheduler._hosts["hote.example"].interval == 0.0  # un succès sous le palier : rythme normal
+    assert "ralentis" not in scheduler.stats()
+
+
+def test_breaker_open_half_open_closed(clock):
+    scheduler = HostScheduler(max_failures=2, cooldown=60, max_interval=0)
+    trip(scheduler, 2)
+    with pytest.raises(HostUnavailable):
+        scheduler.reserve(URL)
+    clock.now += 61
+    scheduler.reserve(URL)                      # requête d'essai
+    with pytest.raises(HostUnavailable):
+        scheduler.reserve(URL)                  # une seule à la fois
+    scheduler.record(URL, backoff.OK)
+    scheduler.reserve(URL)                      # disjoncteur refermé
+    assert scheduler.refused == 2
+
+
+def test_failed_probe_reopens_for_longer_then_gives_up(clock):
+    scheduler = HostScheduler(max_failures=1, cooldown=10, max_trips=3, max_interval=0)
+    trip(scheduler, 1)
+    clock.now += 11
+    trip(scheduler, 1)                          # essai raté : 20 s
+    clock.now += 11
+    with pytest.raises(HostUnavailable, match="coupé") as refused:
+        scheduler.reserve(URL)
+    assert refused.value.retry_in == pytest.approx(9)   # réouverture dans 9 s
+    clock.now += 10
+    trip(scheduler, 1)                          # troisième ouverture : abandon
+    clock.now += 1000
+    with pytest.raises(HostUnavailable, match="abandonné") as refused:
+        scheduler.reserve(URL)
+    assert refused.value.retry_in is None
+    assert "abandonnés : hote.example" in scheduler.stats()
+
+
+def test_released_probe_lets_another_one_go(clock):
+    scheduler = HostScheduler(max_failures=1, cooldown=10, max_interval=0)
+    trip(scheduler, 1)
+    clock.now += 11
+    scheduler.reserve(URL)
+    scheduler.release(URL)                      # essai annulé : ni succès ni échec
+    scheduler.reserve(URL)
+    scheduler.record(URL, backoff.SERVER)       # ce deuxième essai échoue : rouvert
+    with pytest.raises(HostUnavailable):
+        scheduler.reserve(URL)
+
+
+def test_unreported_probe_expires(clock):
+    scheduler = HostScheduler(max_failures=1, cooldown=10, max_interval=0, probe_timeout=30)
+    trip(scheduler, 1)
+    clock.now += 11
+    scheduler.reserve(URL)                      # essai jamais rapporté (tâche tuée)
+    clock.now += 29
+    with pytest.raises(HostUnavailable):
+        scheduler.reserve(URL)
+    clock.now += 2
+    scheduler.reserve(URL)
+
+
+def test_client_releases_probe_on_interrupt(clock):
+    from scraping.http_client import HttpClient
+
+    scheduler = HostScheduler(max_failures=1, cooldown=10, max_interval=0)
+    trip(scheduler, 1)
+    clock.now += 11
+    client = HttpClient(scheduler=scheduler)
+
+    def interrupted(url, **kwargs):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        client._request(interrupted, URL)
+    scheduler.reserve(URL)                      # l'essai interrompu a été rendu
+    client.close()
+
+
+def test_engine_releases_probe_on_cancel(clock):
+    import asyncio
+
+    from scraping import engine
+
+    class Pool:
+        async def acquire(self):
+            return "page"
+
+        def release(self, page):
+            pass
+
+    async def cancelled(page, film):
+        raise asyncio.CancelledError
+
+    scheduler = HostScheduler(max_failures=1, cooldown=10, max_interval=0)
+    trip(scheduler, 1)
+    clock.now += 11
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(engine._browse(Pool(), engine.HostLimiter(1), cancelled, {"url": URL}, URL, scheduler))
+    scheduler.reserve(URL)
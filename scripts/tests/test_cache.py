@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from scraping import cache as cache_mod
+from scraping.cache import PageCache, fetch_text
+
+
+class Response:
+    def __init__(self, status, text="", headers=None):
+        self.status_code = status
+        self.text = text
+        self.headers = headers or {}
+
+
+class Get:
+    """requests.get factice : renvoie les réponses dans l'ordre et garde les en-têtes envoyés."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def __call__(self, url, headers=None, **kwargs):
+        self.sent.append(headers)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_fresh_hit_and_conditional_revalidation(cache):
+    get = Get(Response(200, "<h1>Dune</h1>", {"ETag": '"v1"'}), Response(304))
+    assert fetch_text("https://site/dune", cache, get) == "<h1>Dune</h1>"
+    assert fetch_text("https://site/dune", cache, get) == "<h1>Dune</h1>"
+    assert len(get.sent) == 1 and cache.hits == 1
+
+    cache.ttl = 0
+    assert fetch_text("https://site/dune", cache, get) == "<h1>Dune</h1>"
+    assert get.sent[1] == {"If-None-Match": '"v1"'}
+    assert cache.revalidated == 1
+
+
+@pytest.mark.parametrize("status", [204, 206, 404, 429, 500, 503])
+def test_only_complete_2xx_are_cached(cache, status):
+    get = Get(Response(status, "Erreur"), Response(200, "Contenu"))
+    assert fetch_text("https://site/page", cache, get) == "Erreur"
+    assert cache.get("https://site/page") is None
+    assert fetch_text("https://site/page", cache, get) == "Contenu"
+    assert cache.get("https://site/page").text == "Contenu"
+
+
+def test_offline_serves_stale_and_refuses_misses(cache):
+    cache.put("https://site/vieux", "ancien")
+    cache.ttl, cache.offline = 0, True
+    assert fetch_text("https://site/vieux", cache, Get()) == "ancien"
+    with pytest.raises(LookupError):
+        fetch_text("https://site/absent", cache, Get())
+
+
+def test_eviction_keeps_running_total(tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path / "pages.sqlite"), max_bytes=10**9)
+    sums = []
+    original = cache._total_bytes
+    monkeypatch.setattr(cache, "_total_bytes", lambda: sums.append(1) or original())
+    pages = {f"https://site/{i}": "x" * 1000 + str(i) for i in range(20)}
+    for url, text in pages.items():
+        cache.put(url, text)
+    cache.put("https://site/0", "remplacée")
+    assert not sums  # pas de SUM(size) à chaque écriture
+    assert cache._total == original()
+
+    cache.get("https://site/0")  # récemment lue : gardée
+    cache.max_bytes = cache._total // 2
+    cache.put("https://site/nouvelle", "y")
+    assert sums and cache._total == original() <= cache.max_bytes
+    assert cache.get("https://site/0") is not None
+    assert cache.get("https://site/1") is None  # la moins récemment lue
+    cache.close()
+
+
+def test_running_total_resyncs_with_other_writers(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "RESYNC_EVERY", 5)
+    path = str(tmp_path / "pages.sqlite")
+    a, b = PageCache(path), PageCache(path)
+    for i in range(3):
+        b.put(f"https://site/b{i}", "b" * 100)
+    for i in range(5):
+        a.put(f"https://site/a{i}", "a" * 100)
+    assert a._total == a._total_bytes()
+    a.close()
+    b.close()
+
+
+def test_serve_document_falls_back_when_fetch_fails(cache):
+    from scraping import engine
+
+    class Request:
+        url = "https://site/dune"
+        headers = {}
+
+    class Route:
+        request = Request()
+        calls = []
+
+        async def fetch(self, headers=None):
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+
+        async def continue_(self):
+            self.calls.append("continue")
+
+        async def fulfill(self, **kwargs):
+            self.calls.append("fulfill")
+
+    route = Route()
+    asyncio.run(engine._serve_document(route, cache))
+    assert route.calls == ["continue"]
+    assert cache.get("https://site/dune") is None
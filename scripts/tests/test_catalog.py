@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from scraping import catalog  # noqa: E402 (demande pyarrow)
+from scraping.catalog import FilmRecord, Player  # noqa: E402
+
+DUNE = {
+    "title": "Dune : Deuxième partie", "video_url": "https://supervideo.example/e/dune",
+    "source": "mirror66", "_url": "https://mirror66.example/film/dune",
+    "_link": {"status": "alive", "http_status": 200},
+    "all_sources": {"PREMIUM": "https://supervideo.example/e/dune", "VOE": "https://voe.example/e/1", "DOOD": ""},
+    "tmdb_id": 693134, "year": 2024, "release_date": "2024-02-27", "vote_average": 8.5,
+    "vote_count": "5400", "language": "en",
+}
+MAGNET = {"title": "Anatomie d'une chute", "video_url": "magnet:?xt=urn:btih:abc", "source": "torrent9"}
+
+
+def test_from_dict_types_and_players():
+    film = FilmRecord.from_dict(DUNE)
+    assert film.host == "supervideo.example" and film.page_url == DUNE["_url"]
+    assert film.link_status == "alive" and film.vote_count == 5400
+    assert film.release_date == datetime.date(2024, 2, 27)
+    # Lecteurs sans URL ignorés
+    assert film.players == (Player("PREMIUM", "supervideo.example", "https://supervideo.example/e/dune"),
+                            Player("VOE", "voe.example", "https://voe.example/e/1"))
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"title": "  "}, "title vide"),
+    ({"title": None}, "title manquant"),
+    ({"video_url": "javascript:alert(1)"}, "URL http"),
+    ({"year": 1500}, "year hors bornes"),
+    ({"year": True}, "year : nombre attendu"),
+    ({"release_date": "27/02/2024"}, "release_date"),
+    ({"vote_average": 11}, "vote_average hors bornes"),
+    ({"all_sources": ["https://voe.example/e/1"]}, "all_sources"),
+    ({"all_sources": {"VOE": "ftp://voe.example/1"}}, "all_sources.VOE"),
+])
+def test_from_dict_rejects_invalid_record(change, message):
+    with pytest.raises(ValueError, match=message):
+        FilmRecord.from_dict({**DUNE, **change})
+
+
+def test_export_scan_roundtrip(tmp_path):
+    path = str(tmp_path / "catalogue.parquet")
+    invalid = {**DUNE, "video_url": "pas une url"}
+    # batch_size=1 : un row group par film
+    assert catalog.export([DUNE, invalid, MAGNET], path, batch_size=1) == (2, 1)
+    assert not (tmp_path / "catalogue.parquet.tmp").exists()
+
+    films = list(catalog.read_films(path))
+    assert films == [FilmRecord.from_dict(DUNE), FilmRecord.from_dict(MAGNET)]
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+
+    table = pq.read_table(path)
+    assert table.schema.equals(catalog.SCHEMA)
+    for column in ("host", "source", "link_status", "language"):
+        assert pa.types.is_dictionary(table.schema.field(column).type)
+    player = table.schema.field("players").type.value_type
+    assert pa.types.is_dictionary(player.field("host").type)
+
+
+def test_scan_filters_and_columns(tmp_path):
+    path = str(tmp_path / "catalogue.parquet")
+    catalog.export([DUNE, MAGNET], path)
+    films = list(catalog.read_films(path, columns=["title", "source"], source="torrent9"))
+    assert films == [FilmRecord.from_row({"title": MAGNET["title"], "source": "torrent9"})]
+    assert catalog.count_by(path, "source") == {"mirror66": 1, "torrent9": 1}
+    assert catalog.count_by(path, "host", host=["supervideo.example"]) == {"supervideo.example": 1}
+
+
+def test_diff(tmp_path):
+    old, new = str(tmp_path / "old.parquet"), str(tmp_path / "new.parquet")
+    other = {**MAGNET, "video_url": "https://voe.example/e/2", "title": "Le Règne animal"}
+    catalog.export([DUNE, MAGNET], old)
+    catalog.export([DUNE, other], new)
+    added, removed = catalog.diff(old, new)
+    assert added.column("title").to_pylist() == ["Le Règne animal"]
+    assert removed.column("video_url").to_pylist() == [MAGNET["video_url"]]
+
+
+def test_interrupted_export_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "catalogue.parquet")
+    catalog.export([DUNE], path)
+
+    def records():
+        yield MAGNET
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        catalog.export(records(), path)
+    assert [film.title for film in catalog.read_films(path)] == [DUNE["title"]]
+    assert not (tmp_path / "catalogue.parquet.tmp").exists()
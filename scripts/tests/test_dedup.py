@@ -0,0 +1,77 @@
+import argparse
+import json
+
+import pytest
+
+from scraping import output
+from scraping.dedup import DedupIndex, normalize_title, normalize_url
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Le Comte de Monte-Cristo (2024)", ("le comte de monte cristo", 2024)),
+    ("Anatomie d'une chute", ("anatomie d une chute", None)),
+    ("Oppenheimer [2023]", ("oppenheimer", 2023)),
+    ("Dune - 2021", ("dune", 2021)),
+    ("Blade Runner 2049", ("blade runner 2049", None)),
+    ("2001", ("2001", None)),
+    ("  ÉTÉ 85  ", ("ete 85", None)),
+    ("", (None, None)),
+    (None, (None, None)),
+    ("?!", (None, None)),
+])
+def test_normalize_title(title, expected):
+    assert normalize_title(title) == expected
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Site.COM/film/dune/", "https://site.com/film/dune"),
+    ("https://site.com/film?b=2&a=1", "https://site.com/film?a=1&b=2"),
+    ("https://site.com/film?utm_source=x&id=3&UTM_medium=y", "https://site.com/film?id=3"),
+    ("https://site.com/film#player", "https://site.com/film"),
+    ("https://site.com", "https://site.com/"),
+    ("  https://site.com/Film  ", "https://site.com/Film"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DedupIndex(str(tmp_path / "seen.sqlite"))
+    yield index
+    index.close()
+
+
+def test_filter_by_url_and_title(index):
+    index.add("https://site.com/film/dune/", "Dune (2021)", "mirror66")
+    films = [
+        {"title": "autre titre", "url": "https://SITE.com/film/dune?utm_source=rss"},  # même URL
+        {"title": "DUNE", "url": "https://site.com/dune-2"},                           # titre, année absente
+        {"title": "Dune (1984)", "url": "https://site.com/dune-1984"},                 # autre année
+        {"title": "Premier Contact", "url": "https://site.com/premier-contact"},
+        {"title": "Dune (1984)", "url": "https://site.com/dune-1984/"},                # doublon du listing
+    ]
+    assert index.filter(films, "mirror66") == [films[2], films[3]]
+    assert index.filter(["https://ailleurs.com/dune"], "autre") == ["https://ailleurs.com/dune"]
+    assert index.skipped == 3
+
+
+def test_crashed_run_is_not_recorded(index, tmp_path):
+    """Un run interrompu avant finalize() ne marque pas ses films comme ingérés."""
+    args = argparse.Namespace(output=str(tmp_path / "import_films.json"), resume=False,
+                              fsync_every=1, parquet=None)
+    film = {"title": "Dune", "video_url": "https://cdn/dune.mp4", "_url": "https://site.com/dune"}
+
+    with output.open_writer(args) as writer:
+        writer.write(film)
+    # crash : pas de finalize, le run suivant (sans --resume) retraite la fiche
+    assert index.filter([film["_url"]], "mirror66") == [film["_url"]]
+
+    with output.open_writer(args) as writer:
+        writer.write(film)
+    output.finalize(args, index, "mirror66")
+    with open(args.output, encoding="utf-8") as f:
+        assert json.load(f) == [{"title": "Dune", "video_url": "https://cdn/dune.mp4"}]
+    assert len(index) == 1
+    assert index.filter([film["_url"]], "mirror66") == []
+    assert index.filter([{"title": "Dune", "url": "https://site.com/dune-bis"}], "mirror66") == []
@@ -0,0 +1,258 @@
+import asyncio
+import os
+
+import pytest
+
+from scraping import frontier as frontier_mod
+from scraping.frontier import DETAIL, LISTING, Frontier
+
+DSN = os.environ.get("TEST_DATABASE_URL")
+SOURCE = "test_frontier"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(frontier_mod.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def target(request, tmp_path):
+    if request.param == "sqlite":
+        return str(tmp_path / "frontier.sqlite")
+    if not DSN:
+        pytest.skip("TEST_DATABASE_URL non défini (base Postgres de test)")
+    return DSN
+
+
+@pytest.fixture
+def workers(target):
+    opened = []
+
+    def open_worker(name, **kwargs):
+        worker = Frontier(target, worker=name, **kwargs)
+        opened.append(worker)
+        return worker
+
+    yield open_worker
+    opened[0].reset(SOURCE)
+    for worker in opened:
+        worker.close()
+
+
+def test_listing_first_and_no_duplicates(workers):
+    a = workers("a")
+    assert a.seed(SOURCE) and not a.seed(SOURCE)
+    assert a.add(SOURCE, "https://site/1", {"title": "Un", "url": "https://site/1"})
+    assert not a.add(SOURCE, "https://site/1")
+    a.add(SOURCE, "https://site/2")
+    tasks = a.claim(SOURCE, limit=3)
+    assert [t.kind for t in tasks] == [LISTING, DETAIL, DETAIL]
+    assert tasks[1].film == {"title": "Un", "url": "https://site/1"} and tasks[2].film is None
+    assert a.claim(SOURCE) == []
+    assert a.remaining(SOURCE) == 3
+
+
+def test_expired_lease_is_reclaimed(workers, clock):
+    a, b = workers("a", lease=60), workers("b", lease=60)
+    a.add(SOURCE, "https://site/1")
+    assert [t.url for t in a.claim(SOURCE)] == ["https://site/1"]
+    assert b.claim(SOURCE) == []
+
+    clock.now += 50
+    assert a.renew(SOURCE, "https://site/1")    # bail prolongé de 60 s
+    clock.now += 50
+    assert b.claim(SOURCE) == []
+
+    clock.now += 11                             # a est mort : son bail expire
+    task, = b.claim(SOURCE)
+    assert task.url == "https://site/1" and task.attempts == 2
+    assert not a.renew(SOURCE, "https://site/1")  # a a perdu la tâche
+    a.fail(SOURCE, "https://site/1")              # sans effet sur la tâche de b
+    assert a.counts(SOURCE) == {frontier_mod.LEASED: 1}
+    b.complete(SOURCE, "https://site/1")
+    assert a.counts(SOURCE) == {frontier_mod.DONE: 1} and a.remaining(SOURCE) == 0
+
+
+def test_task_that_keeps_killing_workers_is_abandoned(workers, clock):
+    a = workers("a", lease=10, max_attempts=2)
+    a.add(SOURCE, "https://site/poison")
+    for _ in range(2):
+        assert len(a.claim(SOURCE)) == 1
+        clock.now += 11
+    assert a.claim(SOURCE) == []
+    assert a.counts(SOURCE) == {frontier_mod.FAILED: 1}
+
+
+def test_failed_task_is_retried_then_failed(workers):
+    a = workers("a", max_attempts=2)
+    a.add(SOURCE, "https://site/1")
+    a.claim(SOURCE)
+    a.fail(SOURCE, "https://site/1")
+    assert a.counts(SOURCE) == {frontier_mod.PENDING: 1}
+    a.claim(SOURCE)
+    a.fail(SOURCE, "https://site/1")
+    assert a.counts(SOURCE) == {frontier_mod.FAILED: 1}
+    assert a.stats(SOURCE) == f"Frontière {SOURCE} : 0 faites, 1 en échec, 0 restantes."
+
+
+def test_listing_lease_renewed_without_new_links(tmp_path):
+    """Un listing lent qui ne trouve que des fiches connues garde son bail."""
+    from scraping import engine
+
+    path = str(tmp_path / "frontier.sqlite")
+    a, b = Frontier(path, lease=0.3, worker="a"), Frontier(path, lease=0.3, worker="b")
+
+    class Pool:
+        async def acquire(self):
+            return "page"
+
+        def release(self, page):
+            pass
+
+    async def get_film_links(page):
+        for i in range(8):
+            await asyncio.sleep(0.1)
+            yield "https://site/1"  # même lien : ajouté une fois, puis écarté par _new_links
+
+    async def run():
+        a.seed(SOURCE)
+        assert a.claim(SOURCE)[0].kind == LISTING
+        listing = asyncio.create_task(engine._frontier_listing(
+            Pool(), engine.Source(SOURCE, get_film_links, None), a))
+        await asyncio.sleep(0.6)
+        claimed = b.claim(SOURCE, limit=2)
+        await listing
+        return claimed
+
+    try:
+        # b ne récupère que la fiche : le bail du listing de a est toujours valide
+        assert [t.kind for t in asyncio.run(run())] == [DETAIL]
+        assert a.counts(SOURCE) == {frontier_mod.DONE: 1, frontier_mod.LEASED: 1}
+    finally:
+        a.close()
+        b.close()
+
+
+def test_released_task_waits_and_keeps_its_attempts(workers, clock):
+    a, b = workers("a", max_attempts=1), workers("b", max_attempts=1)
+    a.add(SOURCE, "https://site/1")
+    for _ in range(3):
+        assert len(a.claim(SOURCE)) == 1
+        a.release(SOURCE, "https://site/1", delay=60)   # hôte suspendu : pas de tentative
+        assert a.counts(SOURCE) == {frontier_mod.PENDING: 1} and a.remaining(SOURCE) == 1
+        assert b.claim(SOURCE) == []                     # pas avant la fin de la suspension
+        clock.now += 61
+    task, = b.claim(SOURCE)
+    assert task.attempts == 1
+
+
+class FakePool:
+    size = 2
+
+    async def acquire(self):
+        return "page"
+
+    def release(self, page):
+        pass
+
+    def last_status(self, page):
+        return 200
+
+
+def test_films_skipped_by_breaker_are_not_failed(tmp_path):
+    """Un hôte suspendu ne fait pas passer les fiches de la frontière en échec."""
+    from scraping import backoff, engine
+
+    path = str(tmp_path / "frontier.sqlite")
+    a = Frontier(path, max_attempts=2, worker="a")
+    urls = [f"https://site/{i}" for i in range(3)]
+    for url in urls:
+        a.add(SOURCE, url, url)
+    scheduler = backoff.HostScheduler(max_failures=1, cooldown=0.3)
+    scheduler.record(urls[0], backoff.SERVER)  # disjoncteur ouvert dès le départ
+
+    async def process_film(page, film):
+        return {"title": engine.film_url(film), "video_url": "https://video"}
+
+    async def run():
+        source = engine.Source(SOURCE, None, process_film)
+        links = engine._frontier_films(FakePool(), source, a, 2, poll=0.05)
+        return await engine.process_films(FakePool(), links, process_film, workers=2,
+                                          scheduler=scheduler, ack=engine._frontier_ack(a, SOURCE))
+
+    try:
+        records = asyncio.run(run())
+        assert sorted(r["title"] for r in records) == urls
+        assert a.counts(SOURCE) == {frontier_mod.DONE: 3}
+    finally:
+        a.reset(SOURCE)
+        a.close()
+
+
+def test_frontier_needs_one_output_per_worker(tmp_path):
+    import ingest
+
+    parser = ingest.build_arg_parser()
+    path = str(tmp_path / "frontier.sqlite")
+    with pytest.raises(SystemExit):
+        frontier_mod.check_frontier_arguments(parser, parser.parse_args(["--frontier", path]))
+    for argv in (["--frontier", path, "--output", "w1.json"], []):
+        frontier_mod.check_frontier_arguments(parser, parser.parse_args(argv))
+
+
+def test_failed_ack_does_not_stop_the_workers():
+    from scraping import engine
+
+    acked = []
+
+    async def process_film(page, film):
+        return {"title": film, "video_url": "https://video"}
+
+    async def ack(film, ok, retry_in=None):
+        acked.append(film)
+        raise RuntimeError("database is locked")
+
+    films = [f"https://site/{i}" for i in range(5)]
+    records = asyncio.run(asyncio.wait_for(
+        engine.process_films(FakePool(), films, process_film, workers=2, ack=ack), 5))
+    assert [r["title"] for r in records] == films and sorted(acked) == films
+
+
+def test_detail_lease_renewed_while_film_is_processed(tmp_path):
+    """Une fiche plus longue que le bail n'est pas reprise par un autre worker."""
+    from scraping import engine
+
+    path = str(tmp_path / "frontier.sqlite")
+    a, b = Frontier(path, lease=0.3, worker="a"), Frontier(path, lease=0.3, worker="b")
+    a.add(SOURCE, "https://site/1", "https://site/1")
+
+    async def process_film(page, film):
+        await asyncio.sleep(0.6)
+        return {"title": film, "video_url": "https://video"}
+
+    async def run():
+        film, = [t.film for t in a.claim(SOURCE)]
+        processing = asyncio.create_task(engine.process_films(
+            FakePool(), [film], process_film, ack=engine._frontier_ack(a, SOURCE),
+            renew=lambda film: engine._renew_lease(a, SOURCE, film)))
+        await asyncio.sleep(0.45)
+        claimed = b.claim(SOURCE)
+        await processing
+        return claimed
+
+    try:
+        assert asyncio.run(run()) == []
+        assert a.counts(SOURCE) == {frontier_mod.DONE: 1}
+    finally:
+        a.close()
+        b.close()
@@ -0,0 +1,132 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from scraping import liveness
+from scraping.http_client import HttpClient
+
+
+class StubHost(BaseHTTPRequestHandler):
+    """
+    /video.mp4 : vivant en HEAD ; /no-head.mp4 : HEAD refusé (405), GET avec Range
+    en 206 ; /gone.mp4 et /removed.mp4 : 404 et 410.
+    """
+
+    requests = []
+
+    def _reply(self):
+        type(self).requests.append((self.command, self.path, self.headers.get("Range")))
+        if self.path == "/video.mp4":
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", "1234")
+        elif self.path == "/no-head.mp4" and self.command == "HEAD":
+            self.send_response(405)
+            self.send_header("Content-Length", "0")
+        elif self.path == "/no-head.mp4" and self.headers.get("Range") == "bytes=0-0":
+            self.send_response(206)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Range", "bytes 0-0/5000")
+            self.send_header("Content-Length", "1")
+            self.end_headers()
+            self.wfile.write(b"\0")
+            return
+        else:
+            self.send_response(410 if self.path == "/removed.mp4" else 404)
+            self.send_header("Content-Length", "0")
+        self.end_headers()
+        if self.command == "GET" and self.path == "/video.mp4":
+            self.wfile.write(b"\0" * 1234)
+
+    do_GET = do_HEAD = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    StubHost.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHost)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    with HttpClient(workers=2) as client:
+        yield client
+
+
+def test_alive_with_head(client, base_url):
+    result = liveness.probe(client, base_url + "/video.mp4")
+    assert result["status"] == liveness.ALIVE and result["http_status"] == 200
+    assert result["content_type"] == "video/mp4" and result["size"] == 1234
+    assert [command for command, _, _ in StubHost.requests] == ["HEAD"]
+
+
+def test_head_refused_falls_back_to_ranged_get(client, base_url):
+    result = liveness.probe(client, base_url + "/no-head.mp4")
+    assert result["status"] == liveness.ALIVE and result["http_status"] == 206
+    assert result["size"] == 5000  # total du Content-Range, pas l'octet reçu
+    assert StubHost.requests == [("HEAD", "/no-head.mp4", None), ("GET", "/no-head.mp4", "bytes=0-0")]
+
+
+@pytest.mark.parametrize("path, code", [("/gone.mp4", 404), ("/removed.mp4", 410)])
+def test_not_found_is_dead(client, base_url, path, code):
+    result = liveness.probe(client, base_url + path)
+    assert result["status"] == liveness.DEAD and result["http_status"] == code
+    assert liveness.is_dead({"_link": result})
+
+
+def test_unknown_host_is_dead_other_errors_are_not():
+    class Client:
+        def __init__(self, error):
+            self.error = error
+
+        def head(self, url, **kwargs):
+            raise self.error
+
+    dns = requests.ConnectionError("HTTPSConnectionPool(host='hebergeur.invalid', port=443): "
+                                   "Failed to resolve 'hebergeur.invalid' ([Errno -2] Name or service not known)")
+    assert liveness.probe(Client(dns), "https://hebergeur.invalid/v.mp4")["status"] == liveness.DEAD
+    timeout = requests.ConnectTimeout("Connection to hebergeur.example timed out")
+    assert liveness.probe(Client(timeout), "https://hebergeur.example/v.mp4")["status"] == liveness.ERROR
+
+
+def test_magnet_is_skipped(client):
+    assert liveness.probe(client, "magnet:?xt=urn:btih:abc")["status"] == liveness.SKIPPED
+
+
+def test_cached_result_served_within_ttl(client, base_url, tmp_path):
+    urls = [base_url + "/video.mp4", base_url + "/gone.mp4"]
+    cache = liveness.LinkCache(str(tmp_path / "links.sqlite"), ttl=3600)
+    try:
+        first = {url: (result["status"], cached) for url, result, cached in
+                 liveness.check_urls(client, urls + urls, cache)}
+        assert first == {urls[0]: (liveness.ALIVE, False), urls[1]: (liveness.DEAD, False)}
+        assert len(StubHost.requests) == 2  # URLs en double sondées une fois
+
+        second = {url: (result["status"], cached) for url, result, cached in
+                  liveness.check_urls(client, urls, cache)}
+        assert second == {urls[0]: (liveness.ALIVE, True), urls[1]: (liveness.DEAD, True)}
+        assert len(StubHost.requests) == 2
+    finally:
+        cache.close()
+
+
+def test_expired_result_is_probed_again(client, base_url, tmp_path):
+    url = base_url + "/video.mp4"
+    cache = liveness.LinkCache(str(tmp_path / "links.sqlite"), ttl=0)
+    try:
+        for _ in range(2):
+            (_, result, cached), = liveness.check_urls(client, [url], cache)
+            assert result["status"] == liveness.ALIVE and not cached
+        assert len(StubHost.requests) == 2
+    finally:
+        cache.close()
@@ -0,0 +1,123 @@
+import json
+import os
+import uuid
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+from psycopg import sql  # noqa: E402
+
+import load_films  # noqa: E402
+
+DSN = os.environ.get("TEST_DATABASE_URL")
+
+
+def test_insert_query_upsert():
+    query = load_films._insert_query("public.films", ["title", "video_url", "year"], "video_url",
+                                     upsert=True, update=True).as_string()
+    assert query == (
+        'INSERT INTO "public"."films" ("title", "video_url", "year")'
+        ' SELECT DISTINCT ON (s."video_url") s."title", s."video_url", s."year" FROM films_stage s'
+        ' ON CONFLICT ("video_url") DO UPDATE SET'
+        ' "title" = COALESCE(EXCLUDED."title", "films"."title"),'
+        ' "year" = COALESCE(EXCLUDED."year", "films"."year") RETURNING (xmax = 0)'
+    )
+
+
+def test_insert_query_without_unique_index():
+    query = load_films._insert_query("films", ["title", "video_url"], "video_url",
+                                     upsert=False, update=True).as_string()
+    assert query.endswith(
+        ' FROM films_stage s WHERE NOT EXISTS (SELECT 1 FROM "films" f'
+        ' WHERE f."video_url" = s."video_url") RETURNING true'
+    )
+    assert "ON CONFLICT" not in query
+
+
+def test_read_films_drops_private_and_dead(tmp_path):
+    path = tmp_path / "import_films.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in [
+        {"title": "A", "video_url": "https://cdn/a.mp4", "_url": "https://site/a"},
+        {"title": "B", "video_url": "https://cdn/b.mp4", "_link": {"status": "dead"}},
+    ]) + "\n", encoding="utf-8")
+    assert list(load_films.read_films(str(path))) == [{"title": "A", "video_url": "https://cdn/a.mp4"}]
+
+
+@pytest.fixture
+def conn():
+    if not DSN:
+        pytest.skip("TEST_DATABASE_URL non défini (base Postgres de test)")
+    schema = f"test_load_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(DSN, autocommit=True) as conn:
+        conn.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema)))
+        conn.schema = schema
+        try:
+            yield conn
+        finally:
+            conn.execute(sql.SQL("DROP SCHEMA {} CASCADE").format(sql.Identifier(schema)))
+
+
+def create_table(conn, unique=True):
+    table = f"{conn.schema}.films"
+    query = load_films.CREATE_TABLE_SQL if unique else load_films.CREATE_TABLE_SQL.replace(" UNIQUE", "")
+    conn.execute(sql.SQL(query).format(table=sql.Identifier(conn.schema, "films")))
+    return table
+
+
+def rows(conn, table):
+    return conn.execute(sql.SQL("SELECT title, video_url, year, all_sources FROM {} ORDER BY video_url").format(
+        sql.Identifier(*table.split(".")))).fetchall()
+
+
+def test_load_chunk_copy_and_upsert(conn):
+    table = create_table(conn)
+    types = load_films.table_columns(conn, table)
+    assert load_films.has_unique_index(conn, table, "video_url")
+    chunk = [
+        {"title": "Dune", "video_url": "https://cdn/dune.mp4", "year": 2021,
+         "all_sources": {"Uqload": "https://uqload.net/e/1"}, "inconnue": "ignorée"},
+        {"title": "Dune (doublon du lot)", "video_url": "https://cdn/dune.mp4"},
+        {"title": "Tab\tet\nsaut", "video_url": "https://cdn/tab.mp4"},
+        {"title": "", "video_url": "https://cdn/sans-titre.mp4"},
+        {"title": "Sans lien"},
+    ]
+    assert load_films.load_chunk(conn, table, types, chunk, "video_url", True, False) == (2, 0, 3)
+    loaded = rows(conn, table)
+    assert [r[1] for r in loaded] == ["https://cdn/dune.mp4", "https://cdn/tab.mp4"]
+    assert loaded[1][0] == "Tab\tet\nsaut"  # échappement COPY
+    assert loaded[0][3] == {"Uqload": "https://uqload.net/e/1"}  # jsonb
+
+    # Déjà présent : ignoré sans --update
+    again = [{"title": "Dune 2", "video_url": "https://cdn/dune.mp4"}]
+    assert load_films.load_chunk(conn, table, types, again, "video_url", True, False) == (0, 0, 1)
+    assert rows(conn, table)[0][0] in ("Dune", "Dune (doublon du lot)")
+
+    # --update : une clé absente ne remplace pas la valeur en base
+    assert load_films.load_chunk(conn, table, types, again, "video_url", True, True) == (0, 1, 0)
+    assert rows(conn, table)[0][:3] == ("Dune 2", "https://cdn/dune.mp4", 2021)
+    # La table temporaire ne survit pas au lot
+    assert load_films.load_chunk(conn, table, types, again, "video_url", True, True) == (0, 1, 0)
+
+
+def test_load_chunk_without_unique_index(conn):
+    table = create_table(conn, unique=False)
+    types = load_films.table_columns(conn, table)
+    assert not load_films.has_unique_index(conn, table, "video_url")
+    chunk = [{"title": "A", "video_url": "https://cdn/a.mp4"}, {"title": "A bis", "video_url": "https://cdn/a.mp4"}]
+    assert load_films.load_chunk(conn, table, types, chunk, "video_url", False, False) == (1, 0, 1)
+    assert load_films.load_chunk(conn, table, types, chunk, "video_url", False, False) == (0, 0, 2)
+    assert len(rows(conn, table)) == 1
+
+
+def test_load_counts_failed_chunks(conn, tmp_path):
+    table = create_table(conn)
+    path = tmp_path / "import_films.json"
+    path.write_text(json.dumps([
+        {"title": "A", "video_url": "https://cdn/a.mp4", "year": 2020},
+        {"title": "B", "video_url": "https://cdn/b.mp4", "year": 2021},
+        {"title": "C", "video_url": "https://cdn/c.mp4", "year": "pas une année"},
+        {"title": "D", "video_url": "https://cdn/d.mp4"},
+    ]), encoding="utf-8")
+    # Lots de 2 : le second échoue en entier (année invalide), le premier reste chargé
+    assert load_films.load(conn, [str(path)], table, chunk_size=2) == (2, 0, 0, 2)
+    assert [r[0] for r in rows(conn, table)] == ["A", "B"]
@@ -0,0 +1,24 @@
+from scraping import memory
+from scraping.memory import Watchdog
+
+
+def test_recycles_once_per_crossing(monkeypatch):
+    samples = iter([500, 1200, 1300, 1100, 950, 850, 1050, 1100])
+    monkeypatch.setattr(memory, "rss_mb", lambda: (next(samples), None))
+    watchdog = Watchdog(max_rss=1000)
+    generations = []
+    for _ in range(8):
+        watchdog.sample()
+        generations.append(watchdog.generation)
+    # Au-dessus du seuil pendant plusieurs relevés : un seul recyclage ;
+    # 950 n'est pas assez bas pour réarmer (seuil x 0.9), 850 l'est
+    assert generations == [0, 1, 1, 1, 1, 1, 2, 2]
+    assert watchdog.peak_python == 1300
+    assert "2 recyclage(s)" in watchdog.stats()
+
+
+def test_no_threshold(monkeypatch):
+    monkeypatch.setattr(memory, "rss_mb", lambda: (5000, 5000))
+    watchdog = Watchdog(max_rss=0)
+    watchdog.sample()
+    assert watchdog.generation == 0 and watchdog.peak_browser == 5000
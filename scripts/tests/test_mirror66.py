@@ -0,0 +1,60 @@
+import asyncio
+
+import fetch_mirror66_minimal as mirror66
+
+
+class FakeTab:
+    def __init__(self, page, src):
+        self.page = page
+        self.src = src
+
+    async def click(self):
+        self.page.iframe = self.src
+        self.page.selected = self
+
+    async def evaluate(self, script):
+        return self.page.selected is self
+
+
+class FakePage:
+    """Onglet -> URL de son lecteur ; l'iframe affichée est celle du dernier onglet cliqué."""
+
+    def __init__(self, players, active):
+        self.tabs = {name: FakeTab(self, src) for name, src in players.items()}
+        self.selected = self.tabs[active]
+        self.iframe = self.selected.src
+
+    async def query_selector(self, selector):
+        return self.tabs.get(selector[len('text="'):-1])
+
+
+def click(monkeypatch, players, active):
+    page = FakePage(players, active)
+
+    async def current_iframe_src(page):
+        return page.iframe
+
+    async def wait_for_iframe_src_change(page, previous, timeout=None):
+        return (page.iframe, 0.0) if page.iframe != previous else (None, timeout)
+
+    monkeypatch.setattr(mirror66.waits, "current_iframe_src", current_iframe_src)
+    monkeypatch.setattr(mirror66.waits, "wait_for_iframe_src_change", wait_for_iframe_src_change)
+    return asyncio.run(mirror66.click_player_tabs(page, list(players), active))
+
+
+def test_each_tab_keeps_its_url(monkeypatch):
+    players = {"PREMIUM": "https://a.example/1", "VIDZY": "https://b.example/1",
+               "DOOD": "https://c.example/1"}
+    assert click(monkeypatch, players, "PREMIUM") == players
+
+
+def test_tabs_sharing_a_url_are_all_kept(monkeypatch):
+    players = {"PREMIUM": "https://a.example/1", "VIDZY": "https://a.example/1",
+               "DOOD": "https://c.example/1", "VOE": "https://c.example/1"}
+    assert click(monkeypatch, players, "PREMIUM") == players
+
+
+def test_tab_without_player_is_skipped(monkeypatch):
+    # Onglet sans lecteur : l'iframe disparaît, l'URL de l'onglet précédent n'est pas reprise
+    players = {"PREMIUM": "https://a.example/1", "VIDZY": None}
+    assert click(monkeypatch, players, "PREMIUM") == {"PREMIUM": "https://a.example/1"}
@@ -0,0 +1,44 @@
+import re
+
+import pytest
+
+from fetch_moviebox_nuxt import parse_title_video
+from scraping.fixtures import Fixture
+
+NUXT_RE = re.compile(r'id="__NUXT_DATA__">(.*?)</script>', re.S)
+
+
+def nuxt_data(fixture, url):
+    with open(fixture.path_for(url), encoding="utf-8") as f:
+        return NUXT_RE.search(f.read()).group(1)
+
+
+def test_fixtures_match_expected():
+    fixture = Fixture("moviebox_nuxt")
+    got = []
+    for url in fixture.pages:
+        if url == fixture.list_url:
+            continue
+        title, video = parse_title_video(nuxt_data(fixture, url))
+        if title and video:
+            got.append({"title": title, "video_url": video})
+    assert sorted(got, key=str) == sorted(fixture.expected, key=str)
+
+
+@pytest.mark.parametrize("slug", ["le-comte-de-monte-cristo-2024-1002", "la-zone-d-interet-2023-1004"])
+def test_related_film_video_is_never_used(slug):
+    # Fiche sans vidéo (bande-annonce .m3u8) : la .mp4 d'un film "related" ne doit pas être prise
+    fixture = Fixture("moviebox_nuxt")
+    title, video = parse_title_video(nuxt_data(fixture, f"https://moviebox.ng/fr/movies/{slug}"))
+    assert title and video is None
+
+
+def test_video_address_preferred_over_url():
+    raw = ('[{"subject": 1}, {"title": 2, "resource": 3}, "Dune", {"url": 4, "videoAddress": 5},'
+           ' "https://cdn/trailer.mp4", "https://cdn/film.mp4"]')
+    assert parse_title_video(raw) == ("Dune", "https://cdn/film.mp4")
+
+
+def test_plain_nested_json():
+    raw = '{"subject": {"title": "Dune", "resource": {"url": "https://cdn/dune.mp4"}}, "related": []}'
+    assert parse_title_video(raw) == ("Dune", "https://cdn/dune.mp4")
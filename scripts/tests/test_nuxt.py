@@ -0,0 +1,91 @@
+import json
+import math
+import re
+
+import pytest
+
+from scraping.fixtures import Fixture
+from scraping.nuxt import NuxtPayload
+
+NUXT_RE = re.compile(r'id="__NUXT_DATA__">(.*?)</script>', re.S)
+
+
+def fixture_payloads():
+    fixture = Fixture("moviebox_nuxt")
+    for url in fixture.pages:
+        if url != fixture.list_url:
+            with open(fixture.path_for(url), encoding="utf-8") as f:
+                yield url, NuxtPayload.from_json(NUXT_RE.search(f.read()).group(1))
+
+
+@pytest.mark.parametrize("url, payload", list(fixture_payloads()))
+def test_fixture_resolves_subject(url, payload):
+    root = payload.resolve()
+    subject = root["data"]["subject"]
+    assert subject["id"] == int(url.rsplit("-", 1)[1])
+    assert isinstance(subject["title"], str) and subject["title"]
+    assert set(subject["resource"]) <= {"videoAddress", "url"}
+    # Les enveloppes (ShallowReactive...) disparaissent, les références sont résolues
+    assert all(isinstance(film["title"], str) for film in root["data"]["related"])
+
+
+def test_find_values_paths_and_within():
+    payload = NuxtPayload.from_json(
+        '[["ShallowReactive", 1], {"data": 2}, {"subject": 3, "related": 6},'
+        ' {"title": 4, "resource": 5}, "Dune", {"videoAddress": -1, "url": 8},'
+        ' [7], {"title": 9, "resource": 10}, "https://cdn/trailer.m3u8", "Autre",'
+        ' {"videoAddress": 11}, "https://cdn/autre.mp4"]')
+    found = payload.find_values(("title", "videoAddress", "url"))
+    assert found["title"] == ("Dune", "data.subject.title")
+    assert found["url"] == ("https://cdn/trailer.m3u8", "data.subject.resource.url")
+    # videoAddress vide dans le sujet : la première valeur "vraie" est celle du film lié
+    assert found["videoAddress"] == ("https://cdn/autre.mp4", "data.related.0.resource.videoAddress")
+    # Limité au sujet, le film lié n'est jamais atteint
+    within = payload.find_values(("videoAddress", "url"), within="data.subject")
+    assert within == {"url": ("https://cdn/trailer.m3u8", "data.subject.resource.url")}
+    assert payload.find_values(("title",), within="data.absent") == {}
+
+
+def test_find_values_accept_and_shared_nodes():
+    # L'élément 2 est partagé par "a" et "b" : parcouru une seule fois
+    payload = NuxtPayload.from_json('[{"a": 1, "b": 1, "c": 3}, {"title": 2}, "", {"title": 4}, "Oui"]')
+    assert payload.find_values(("title",)) == {"title": ("Oui", "c.title")}
+    found = payload.find_values(("title",), accept={"title": lambda v: isinstance(v, str)})
+    assert found == {"title": ("", "a.title")}
+
+
+def test_special_types():
+    payload = NuxtPayload.from_json(json.dumps([
+        {"date": 1, "set": 2, "map": 3, "nul": 6, "neg": 12, "big": 8,
+         "ref": 9, "empty": 10, "self": 0},
+        ["Date", "2024-02-27T00:00:00.000Z"],
+        ["Set", 7, 7],
+        ["Map", 4, 5],
+        "clé", 42,
+        ["null", "x", 5],
+        "élément",
+        ["BigInt", "12345678901234567890"],
+        ["Ref", 7],
+        ["EmptyRef", 11],
+        '{"a": 1}',
+        [-1, -3, -4, -5, -6],
+    ]))
+    root = payload.resolve()
+    assert root["date"] == "2024-02-27T00:00:00.000Z"
+    assert root["set"] == ["élément", "élément"]
+    assert root["map"] == {"clé": 42}
+    assert root["nul"] == {"x": 42}
+    undefined, nan, inf, ninf, zero = root["neg"]
+    assert undefined is None and math.isnan(nan) and inf == math.inf and ninf == -math.inf
+    assert zero == 0 and math.copysign(1, zero) == -1
+    assert root["big"] == 12345678901234567890
+    assert root["ref"] == "élément"
+    assert root["empty"] == {"a": 1}
+    assert root["self"] is root  # cycle
+
+
+def test_plain_json_payload():
+    payload = NuxtPayload({"data": [{"movie": {"title": "Dune", "videoAddress": "https://cdn/d.mp4"}}]})
+    assert not payload.flat
+    assert payload.find_values(("videoAddress",)) == {"videoAddress": ("https://cdn/d.mp4", "data.0.movie.videoAddress")}
+    assert payload.find_values(("title",), within="data.0.movie") == {"title": ("Dune", "data.0.movie.title")}
@@ -0,0 +1,132 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from scraping import tmdb
+from scraping.backoff import HostScheduler
+from scraping.http_client import HttpClient
+
+API_KEY = "0123456789abcdef"
+DUNE = {"id": 693134, "title": "Dune : Deuxième partie", "original_title": "Dune: Part Two",
+        "release_date": "2024-02-27", "overview": "Paul...", "poster_path": "/p.jpg",
+        "vote_average": 8.2, "original_language": "en"}
+
+
+class StubTmdb(BaseHTTPRequestHandler):
+    """/3/search/movie : Dune trouvé, "Quota" en 429 tant que `quota` > 0, le reste sans résultat."""
+
+    requests = []
+    quota = 0
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        type(self).requests.append((params, self.headers.get("Authorization")))
+        if params.get("query") == "Quota" and type(self).quota > 0:
+            type(self).quota -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        results = [DUNE] if params.get("query", "").startswith("Dune") else []
+        body = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    StubTmdb.requests = []
+    StubTmdb.quota = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTmdb)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/3"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = tmdb.TmdbCache(str(tmp_path / "tmdb.sqlite"))
+    yield cache
+    cache.close()
+
+
+def run(keys, cache, base_url, api_key=API_KEY, **kwargs):
+    titles = [tmdb.search_key(title) for title in keys]
+    with HttpClient(workers=2, scheduler=HostScheduler()) as client:
+        return {key[0]: (match, from_cache, error) for key, match, from_cache, error in
+                tmdb.match_keys(client, titles, cache, api_key=api_key, base_url=base_url, **kwargs)}
+
+
+def test_search_key():
+    assert tmdb.search_key("Dune Part Two FRENCH WEBRIP 1080p 2024") == ("Dune Part Two", "dune part two", 2024)
+    assert tmdb.search_key("Anatomie d'une chute (2023)") == ("Anatomie d'une chute", "anatomie d une chute", 2023)
+    assert tmdb.search_key("") is None
+
+
+def test_cache_miss_then_hit(cache, base_url):
+    results = run(["Dune Part Two (2024)", "Dune: Part Two - 2024", "Film Inconnu"], cache, base_url)
+    assert len(StubTmdb.requests) == 2  # une recherche par (titre normalisé, année)
+    match, from_cache, error = results["Dune Part Two"]
+    assert error is None and not from_cache
+    assert match["tmdb_id"] == 693134 and match["year"] == 2024
+    assert match["poster"] == tmdb.POSTER_URL + "/p.jpg"
+    assert results["Film Inconnu"] == (None, False, None)
+
+    results = run(["Dune Part Two (2024)", "Film Inconnu"], cache, base_url)
+    assert len(StubTmdb.requests) == 2  # tout vient du cache, absence comprise
+    assert results["Dune Part Two"][:2] == (match, True)
+    assert results["Film Inconnu"] == (None, True, None)
+
+    run(["Dune Part Two (2024)"], cache, base_url, refresh=True)
+    assert len(StubTmdb.requests) == 3
+
+
+def test_expired_miss_is_searched_again(tmp_path, base_url):
+    cache = tmdb.TmdbCache(str(tmp_path / "tmdb.sqlite"), miss_ttl=0)
+    try:
+        run(["Film Inconnu"], cache, base_url)
+        run(["Film Inconnu"], cache, base_url)
+    finally:
+        cache.close()
+    assert len(StubTmdb.requests) == 2
+
+
+def test_429_with_retry_after_is_retried(cache, base_url):
+    StubTmdb.quota = 1
+    assert run(["Quota"], cache, base_url)["Quota"] == (None, False, None)
+    assert len(StubTmdb.requests) == 2
+
+
+def test_persistent_429_is_reported_not_cached_and_redacted(cache, base_url):
+    StubTmdb.quota = 10
+    match, from_cache, error = run(["Quota"], cache, base_url)["Quota"]
+    assert match is None and not from_cache
+    assert isinstance(error, requests.RequestException)
+    assert API_KEY not in str(error) and "api_key=***" in str(error)
+    assert error.__cause__ is None and error.__suppress_context__
+    sent = len(StubTmdb.requests)
+
+    # Erreur non mise en cache : le run suivant cherche à nouveau
+    StubTmdb.quota = 0
+    assert run(["Quota"], cache, base_url)["Quota"] == (None, False, None)
+    assert len(StubTmdb.requests) == sent + 1
+
+
+def test_v4_token_sent_as_bearer(cache, base_url):
+    token = "eyJhbGciOiJIUzI1NiJ9.jeton.signature"
+    run(["Dune Part Two"], cache, base_url, api_key=token)
+    params, authorization = StubTmdb.requests[0]
+    assert authorization == f"Bearer {token}"
+    assert "api_key" not in params